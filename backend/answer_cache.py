@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from models import ParsedCV, StylePreferences, GenerateAnswerResponse
+from cache import create_cache
+import metrics
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMS = 512
+
+
+def normalize_question(question: str) -> str:
+    """
+    Lowercase, drop punctuation and collapse whitespace so trivially different
+    phrasings ("Why us?" / "why us") share a cache entry.
+    """
+    text = re.sub(r"[^\w\s]", " ", question.lower())
+    return " ".join(text.split())
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def fingerprint_cv(cv_data: ParsedCV) -> str:
+    return _digest(cv_data.model_dump_json())
+
+
+def fingerprint_style(style: StylePreferences) -> str:
+    return f"{style.voice_tone}:{style.length}:{style.personality}"
+
+
+def fingerprint_job(job_context: Optional[str]) -> str:
+    return _digest(job_context or "")
+
+
+def answer_keys(
+    question: str,
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    job_context: Optional[str] = None,
+    cv_fingerprint: Optional[str] = None,
+    field_key: str = ""
+) -> Tuple[str, str, str]:
+    """
+    (normalized question, scope, key) for an answer. The scope covers the CV,
+    style, job and, when known, the form field (see model_routing.FieldSpec);
+    the key adds the normalized question.
+    """
+    normalized = normalize_question(question)
+    cv_fingerprint = cv_fingerprint or fingerprint_cv(cv_data)
+    scope = f"{cv_fingerprint}|{fingerprint_style(style)}|{fingerprint_job(job_context)}"
+    scope = _digest(f"{scope}|{field_key}" if field_key else scope)
+    return normalized, scope, _digest(f"{scope}|{normalized}")
+
+
+def embed(text: str) -> List[float]:
+    """
+    Cheap local embedding: signed feature hashing of words and character
+    trigrams into a fixed-size, L2-normalized vector. Good enough to match
+    near-identical questions without a model or network call.
+    """
+    vector = [0.0] * EMBEDDING_DIMS
+    words = text.split()
+    padded = f" {text} "
+    features = words + [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        vector[h % EMBEDDING_DIMS] += 1.0 if (h >> 63) & 1 else -1.0
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm:
+        vector = [v / norm for v in vector]
+    return vector
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class AnswerCache:
+    """
+    Cache for generated answers.
+
+    Exact lookups are keyed on the normalized question plus fingerprints of the
+    CV, style preferences and job context. Callers holding a precomputed CV
+    fingerprint (e.g. a CV session version) can pass it to skip rehashing.
+    With similarity enabled, a miss falls back to the closest previously
+    answered question for the same CV/style/job whose embedding similarity
+    clears the threshold.
+    """
+
+    def __init__(self, store, similarity_threshold: Optional[float] = None, max_similar_entries: int = 1024):
+        self.store = store
+        self.similarity_threshold = similarity_threshold
+        self.max_similar_entries = max_similar_entries
+        self.similar_hits = 0
+        # scope -> {cache key: embedding}, oldest scopes evicted first
+        self._index: "OrderedDict[str, OrderedDict[str, List[float]]]" = OrderedDict()
+        self._index_size = 0
+        self._lock = threading.Lock()
+
+    def lookup(
+        self,
+        question: str,
+        cv_data: ParsedCV,
+        style: StylePreferences,
+        job_context: Optional[str] = None,
+        cv_fingerprint: Optional[str] = None,
+        field_key: str = ""
+    ) -> Optional[GenerateAnswerResponse]:
+        normalized, scope, key = answer_keys(question, cv_data, style, job_context, cv_fingerprint, field_key)
+
+        cached = self.store.get(key)
+        if cached is not None:
+            metrics.CACHE_REQUESTS.inc(cache="answers", result="hit")
+            return GenerateAnswerResponse.model_validate_json(cached)
+
+        similar_key = None
+        if self.similarity_threshold is not None:
+            similar_key = self._find_similar(scope, embed(normalized))
+        cached = self.store.get(similar_key) if similar_key is not None else None
+        if cached is None:
+            metrics.CACHE_REQUESTS.inc(cache="answers", result="miss")
+            return None
+
+        self.similar_hits += 1
+        metrics.CACHE_REQUESTS.inc(cache="answers", result="similar_hit")
+        logger.debug("Similar answer cache hit | question=%s", question)
+        return GenerateAnswerResponse.model_validate_json(cached)
+
+    def save(
+        self,
+        question: str,
+        cv_data: ParsedCV,
+        style: StylePreferences,
+        job_context: Optional[str],
+        response: GenerateAnswerResponse,
+        cv_fingerprint: Optional[str] = None,
+        field_key: str = ""
+    ) -> None:
+        normalized, scope, key = answer_keys(question, cv_data, style, job_context, cv_fingerprint, field_key)
+        self.store.set(key, response.model_dump_json())
+
+        if self.similarity_threshold is not None:
+            self._add_to_index(scope, key, embed(normalized))
+
+    def _find_similar(self, scope: str, vector: List[float]) -> Optional[str]:
+        with self._lock:
+            entries = self._index.get(scope)
+            if not entries:
+                return None
+            self._index.move_to_end(scope)
+
+            best_key, best_score = None, self.similarity_threshold
+            for key, candidate in entries.items():
+                score = _cosine(vector, candidate)
+                if score >= best_score:
+                    best_key, best_score = key, score
+            return best_key
+
+    def _add_to_index(self, scope: str, key: str, vector: List[float]) -> None:
+        with self._lock:
+            entries = self._index.setdefault(scope, OrderedDict())
+            self._index.move_to_end(scope)
+            if key not in entries:
+                self._index_size += 1
+            entries[key] = vector
+
+            while self._index_size > self.max_similar_entries:
+                oldest_scope, oldest_entries = next(iter(self._index.items()))
+                oldest_entries.popitem(last=False)
+                self._index_size -= 1
+                if not oldest_entries:
+                    del self._index[oldest_scope]
+
+    def stats(self) -> dict:
+        stats = self.store.stats()
+        stats["similarity_threshold"] = self.similarity_threshold
+        stats["similar_hits"] = self.similar_hits
+        return stats
+
+
+def create_answer_cache() -> Optional[AnswerCache]:
+    """
+    Build the answer cache from ANSWER_CACHE_* settings.
+    ANSWER_CACHE_SIMILARITY (0-1) enables similarity lookups above that cosine score.
+    """
+    store = create_cache("ANSWER_CACHE", default_max_entries=2048, default_ttl=24 * 3600)
+    if store is None:
+        return None
+
+    threshold = os.getenv("ANSWER_CACHE_SIMILARITY")
+    return AnswerCache(
+        store,
+        similarity_threshold=float(threshold) if threshold else None,
+        max_similar_entries=store.max_entries
+    )
@@ -1,122 +1,50 @@
+import asyncio
+import json
 import logging
 import os
-import re
-from typing import Optional, List
-from openai import OpenAI
-from models import ParsedCV, StylePreferences, GenerateAnswerResponse
-from dotenv import load_dotenv
+from typing import AsyncIterator, Optional, List
+from models import ParsedCV, StylePreferences, GenerateAnswerResponse, BatchAnswerItem
+from llm_client import create_chat_completion, scheduler, stream_chat_completion
+from answer_cache import answer_keys, create_answer_cache
+from cv_retrieval import CVIndex, render_cv_context
+from question_router import route_question
+from cv_fields import extract_field
+from model_routing import FieldSpec, fit_to_length, length_instructions, max_tokens_for, select_tier
+from single_flight import SingleFlight
+from scheduler import BATCH, INTERACTIVE, PREFETCH, SchedulerBusy, work_tag
+import metrics
 
 logger = logging.getLogger(__name__)
 
-load_dotenv()
+# Per-call upper bound for a single answer completion (seconds)
+ANSWER_TIMEOUT = float(os.getenv('ANSWER_TIMEOUT', '30'))
 
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable not set")
+answer_cache = create_answer_cache()
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Concurrent requests for the same answer share one completion
+answer_flights = SingleFlight()
 
 
 def classify_question(question: str) -> str:
     """
     Classify the type of question being asked.
     """
-    question_lower = question.lower()
-
-    if any(word in question_lower for word in ["why", "motivation", "interested", "want to join"]):
-        return "motivation"
-    elif any(word in question_lower for word in ["project", "experience", "worked on", "tell us about"]):
-        return "experience"
-    elif any(word in question_lower for word in ["skill", "knowledge", "proficient", "familiar with"]):
-        return "skills"
-    elif any(word in question_lower for word in ["challenge", "conflict", "difficult", "problem", "situation"]):
-        return "behavioral"
-    else:
-        return "general"
-
-
-def _derive_name_parts(cv_data: ParsedCV) -> tuple[Optional[str], Optional[str]]:
-    """
-    Get first and last name from the parsed CV without inventing new values.
-    """
-    if getattr(cv_data, "first_name", None) or getattr(cv_data, "last_name", None):
-        return cv_data.first_name, cv_data.last_name
-
-    if cv_data.name:
-        parts = cv_data.name.strip().split()
-        if parts:
-            first = parts[0]
-            last = parts[-1] if len(parts) > 1 else None
-            return first, last
-
-    return None, None
+    return route_question(question).question_type
 
 
 def answer_basic_field(question: str, cv_data: ParsedCV) -> Optional[GenerateAnswerResponse]:
     """
-    For simple identity/contact questions, respond directly with CV data
-    without using the LLM.
+    For short form fields (identity, contact, current role, experience,
+    education, skills...), respond directly with CV data without using the LLM.
     """
-    q = question.lower()
-    first_name, last_name = _derive_name_parts(cv_data)
-
-    field_value = None
-    options: List[str] = []
-
-    def _extract_options(raw_question: str) -> List[str]:
-        """
-        Try to extract dropdown options from the question text, e.g.:
-        - "Options: USA, Canada, UK"
-        - "[USA, Canada, UK]"
-        """
-        raw_lower = raw_question.lower()
-        collected = []
-
-        bracketed = re.findall(r"\[([^\]]+)\]", raw_question)
-        for group in bracketed:
-            collected.extend(group.split(","))
-
-        options_match = re.search(r"options?:\s*(.+)", raw_question, flags=re.IGNORECASE)
-        if options_match:
-            collected.extend(options_match.group(1).split(","))
-
-        # Normalize and dedupe
-        normalized = []
-        seen = set()
-        for opt in collected:
-            clean = opt.strip()
-            if clean and clean.lower() not in seen:
-                seen.add(clean.lower())
-                normalized.append(clean)
-
-        return normalized
-    if "first name" in q:
-        field_value = first_name
-    elif "last name" in q or "surname" in q or "family name" in q:
-        field_value = last_name
-    elif "full name" in q or ("your name" in q) or q.strip() in {"name", "what is your name"}:
-        field_value = cv_data.name
-    elif "email" in q or "e-mail" in q:
-        field_value = cv_data.email
-    elif "phone" in q or "phone number" in q or "mobile" in q or "contact number" in q:
-        field_value = cv_data.phone
-    elif "linkedin" in q:
-        field_value = cv_data.linkedin_url
-    elif "website" in q or "portfolio" in q or "site" in q:
-        # If website not present in CV, return empty answer
-        field_value = cv_data.website or ""
-    elif "country" in q or "location" in q:
-        options = _extract_options(question)
-        if options and cv_data.country:
-            match = next((opt for opt in options if opt.lower() == cv_data.country.lower()), None)
-            if not match:
-                match = next((opt for opt in options if cv_data.country.lower() in opt.lower() or opt.lower() in cv_data.country.lower()), None)
-            field_value = match or ""
-        elif cv_data.country:
-            field_value = cv_data.country
+    route = route_question(question)
+    if not route.direct:
+        return None
 
+    field_value = extract_field(route.field, question, cv_data)
     if field_value:
-        return GenerateAnswerResponse(answer=str(field_value), question_type="basic_info")
+        metrics.FAST_PATH.inc(field=route.field)
+        return GenerateAnswerResponse(answer=field_value, question_type="basic_info")
 
     return None
 
@@ -125,42 +53,7 @@ def build_cv_context(cv_data: ParsedCV) -> str:
     """
     Convert structured CV data into a narrative context for the LLM.
     """
-    context = f"Candidate Name: {cv_data.name}\n\n"
-
-    if cv_data.country:
-        context += f"Location/Country: {cv_data.country}\n\n"
-
-    if cv_data.summary:
-        context += f"Professional Summary:\n{cv_data.summary}\n\n"
-
-    if cv_data.experience:
-        context += "Work Experience:\n"
-        for exp in cv_data.experience:
-            context += f"- {exp.role} at {exp.company}"
-            if exp.duration:
-                context += f" ({exp.duration})"
-            context += "\n"
-            for achievement in exp.achievements:
-                context += f"  • {achievement}\n"
-        context += "\n"
-
-    if cv_data.skills:
-        context += f"Skills: {', '.join(cv_data.skills)}\n\n"
-
-    if cv_data.projects:
-        context += "Projects:\n"
-        for project in cv_data.projects:
-            context += f"- {project.name}: {project.description}\n"
-            if project.technologies:
-                context += f"  Technologies: {', '.join(project.technologies)}\n"
-        context += "\n"
-
-    if cv_data.education:
-        context += f"Education:\n"
-        for edu in cv_data.education:
-            context += f"- {edu}\n"
-
-    return context
+    return render_cv_context(cv_data)
 
 
 def get_style_instructions(style: StylePreferences) -> str:
@@ -197,29 +90,10 @@ def get_style_instructions(style: StylePreferences) -> str:
     return " ".join(instructions)
 
 
-async def generate_answer(
-    question: str,
-    cv_data: ParsedCV,
-    style: StylePreferences,
-    job_description: Optional[str] = None
-) -> GenerateAnswerResponse:
+def build_company_context(job_description: Optional[str]) -> str:
     """
-    Generate a tailored answer to an application question.
+    Turn the page context sent by the extension (JSON or raw text) into prompt text.
     """
-    logger.info("Generating answer | question=%s", question)
-
-    # Return direct CV fields for simple identity/contact questions
-    direct_response = answer_basic_field(question, cv_data)
-    if direct_response:
-        logger.info("Direct basic info response | question=%s | answer=%s", question, direct_response.answer)
-        return direct_response
-
-    question_type = classify_question(question)
-    cv_context = build_cv_context(cv_data)
-    style_instructions = get_style_instructions(style)
-
-    # Parse job context from job_description parameter
-    import json
     company_context = ""
     try:
         if job_description:
@@ -237,8 +111,12 @@ async def generate_answer(
         if job_description:
             company_context = f"Job Context:\n{job_description}\n"
 
-    # Build enhanced prompt
-    system_prompt = f"""You are an expert career advisor and recruiter helping a job candidate craft compelling, authentic application responses.
+    return company_context
+
+
+# Everything that never changes between requests. It always comes first so the
+# provider's prompt cache can reuse it across every user, CV and job.
+STATIC_INSTRUCTIONS = """You are an expert career advisor and recruiter helping a job candidate craft compelling, authentic application responses.
 
 YOUR MISSION:
 Analyze the candidate's background strategically and select the MOST RELEVANT experiences that align with the target role. Think like a recruiter matching candidates to positions.
@@ -261,17 +139,7 @@ When selecting which experiences to mention, consider:
 
 For each experience on the CV, ask yourself: "How does this relate to what they're looking for?" Then emphasize the most relevant ones.
 
-{company_context if company_context else "Note: No company information provided. Focus solely on the candidate's qualifications."}
-
-Style Instructions: {style_instructions}
-
-Candidate's CV:
-{cv_context}
-"""
-
-    user_prompt = f"""Question: {question}
-
-STRATEGIC ANSWERING APPROACH:
+STRATEGIC ANSWERING APPROACH (apply to every question):
 
 Step 1 - ANALYZE RELEVANCE:
 Look at the job description and company context. What are they looking for? What industry? What skills? Remote or onsite?
@@ -295,23 +163,123 @@ Write a compelling answer that:
 Example thought process:
 "They're looking for a backend engineer at a cyber company. The candidate worked at a cyber startup doing backend work. PERFECT - I'll lead with that experience and explain how it directly prepares them for this role."
 
-Now generate your answer following this strategic approach."""
+The candidate's CV, their style preferences, the target job and finally the question follow. For a long CV, the work experience and projects most relevant to the question are given with the question instead of in the CV."""
+
+NO_COMPANY_CONTEXT = "Note: No company information provided. Focus solely on the candidate's qualifications."
+
+
+def build_candidate_prompt(cv_context: str, style_instructions: str) -> str:
+    """
+    Per-candidate block: identical for every question and job of the same CV
+    and style. Holds the full CV, or for long CVs only the part that does not
+    depend on the question (see CVIndex.split_context_for).
+    """
+    return f"""Candidate's CV:
+{cv_context}
+Style Instructions: {style_instructions}"""
+
 
-    completion = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.7,
-        max_tokens=500
+def build_job_prompt(company_context: str) -> str:
+    """
+    Per-job block: identical for every question on the same application page.
+    """
+    return f"""Target Job:
+{company_context if company_context else NO_COMPANY_CONTEXT}"""
+
+
+def build_user_prompt(question: str, field: FieldSpec = FieldSpec(), cv_entries: str = "") -> str:
+    """
+    Build the per-question user prompt: the CV entries ranked for this
+    question (long CVs only), the question and the limits of the form field
+    the answer goes into.
+    """
+    prompt = f"Most Relevant CV Entries:\n{cv_entries}\n" if cv_entries else ""
+    prompt += f"Question: {question}\n"
+    limits = length_instructions(field)
+    if limits:
+        prompt += f"{limits}\n"
+    return prompt + "\nNow generate your answer following the strategic approach."
+
+
+def build_prompt_messages(
+    question: str,
+    cv_context: str,
+    style_instructions: str,
+    company_context: str,
+    field: FieldSpec = FieldSpec(),
+    cv_entries: str = ""
+) -> List[dict]:
+    """
+    Assemble the chat messages from the most to the least stable content:
+    static instructions, then the candidate, then the job, then the question
+    with the CV entries ranked for it. Each block is rendered
+    deterministically, so consecutive requests share the longest possible
+    byte-identical prefix for upstream prompt caching.
+    """
+    return [
+        {"role": "system", "content": STATIC_INSTRUCTIONS},
+        {"role": "system", "content": build_candidate_prompt(cv_context, style_instructions)},
+        {"role": "system", "content": build_job_prompt(company_context)},
+        {"role": "user", "content": build_user_prompt(question, field, cv_entries)}
+    ]
+
+
+def _build_answer_messages(
+    question: str,
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    company_context: str,
+    cv_index: Optional[CVIndex],
+    style_instructions: Optional[str] = None,
+    field: FieldSpec = FieldSpec()
+) -> List[dict]:
+    """
+    Retrieve the CV context relevant to the question and assemble the prompt.
+    """
+    with metrics.stage("context_build"):
+        index = cv_index or CVIndex(cv_data)
+        cv_context, cv_entries = index.split_context_for(f"{question}\n{company_context}")
+    with metrics.stage("prompt_build"):
+        return build_prompt_messages(
+            question=question,
+            cv_context=cv_context,
+            style_instructions=style_instructions or get_style_instructions(style),
+            company_context=company_context,
+            field=field,
+            cv_entries=cv_entries
+        )
+
+
+async def _complete_answer(
+    question: str,
+    messages: List[dict],
+    field: FieldSpec = FieldSpec(),
+    priority: int = INTERACTIVE
+) -> GenerateAnswerResponse:
+    """
+    Run the LLM completion for a single question against prebuilt prompt messages,
+    on the model tier chosen for its question type and form field.
+    """
+    question_type = classify_question(question)
+    tier = select_tier(question_type, field)
+    metrics.set_question_type(question_type)
+    metrics.set_model_tier(tier.name)
+
+    completion = await create_chat_completion(
+        model=tier.model,
+        messages=messages,
+        temperature=tier.temperature,
+        max_tokens=max_tokens_for(tier, field),
+        timeout=ANSWER_TIMEOUT,
+        priority=priority
     )
 
-    answer = completion.choices[0].message.content.strip()
+    answer = fit_to_length(completion.choices[0].message.content.strip(), field.max_length)
 
-    logger.info(
-        "LLM answer generated | question_type=%s | question=%s | answer_preview=%s",
+    logger.debug(
+        "LLM answer generated | question_type=%s | tier=%s | question=%s | answer_preview=%s",
         question_type,
+        tier.name,
         question,
         answer[:300]
     )
@@ -320,3 +288,253 @@ Now generate your answer following this strategic approach."""
         answer=answer,
         question_type=question_type
     )
+
+
+async def _generate_shared(
+    question: str,
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    company_context: str,
+    cv_index: Optional[CVIndex],
+    cv_fingerprint: Optional[str],
+    style_instructions: Optional[str] = None,
+    field: FieldSpec = FieldSpec(),
+    priority: int = INTERACTIVE
+) -> GenerateAnswerResponse:
+    """
+    Complete and cache an answer, coalescing with any identical generation
+    already in flight (same answer cache key). Prefetched generations are
+    dropped when their caller goes away, unless someone else joined them.
+    """
+    async def complete() -> GenerateAnswerResponse:
+        work_tag.set(key)
+        messages = _build_answer_messages(
+            question, cv_data, style, company_context, cv_index, style_instructions, field
+        )
+        response = await _complete_answer(question, messages, field, priority)
+        if answer_cache is not None:
+            await asyncio.to_thread(
+                answer_cache.save, question, cv_data, style, company_context, response, cv_fingerprint, field.key
+            )
+        return response
+
+    _, _, key = answer_keys(question, cv_data, style, company_context, cv_fingerprint, field.key)
+    if priority != PREFETCH:
+        # Someone is waiting on this answer now: a queued prefetch of it moves up
+        scheduler.promote(key, priority)
+    return await answer_flights.run(key, complete, abandonable=priority == PREFETCH)
+
+
+async def generate_answer(
+    question: str,
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    job_description: Optional[str] = None,
+    regenerate: bool = False,
+    cv_index: Optional[CVIndex] = None,
+    cv_fingerprint: Optional[str] = None,
+    company_context: Optional[str] = None,
+    field: FieldSpec = FieldSpec()
+) -> GenerateAnswerResponse:
+    """
+    Generate a tailored answer to an application question.
+    Set regenerate to skip the answer cache and force a fresh completion.
+    cv_index/cv_fingerprint let callers with a CV session reuse the
+    precomputed retrieval index and CV hash; company_context replaces
+    job_description for callers holding a precompiled job context. field
+    describes the input the answer goes into and selects the model tier.
+    """
+    logger.debug("Generating answer | question=%s", question)
+    if company_context is None:
+        company_context = build_company_context(job_description)
+
+    # Return direct CV fields for simple identity/contact questions
+    direct_response = answer_basic_field(question, cv_data)
+    if direct_response:
+        logger.debug("Direct basic info response | question=%s | answer=%s", question, direct_response.answer)
+        return direct_response
+
+    if answer_cache is not None and not regenerate:
+        cached = answer_cache.lookup(question, cv_data, style, company_context, cv_fingerprint, field.key)
+        if cached:
+            logger.debug("Answer cache hit | question=%s", question)
+            return cached
+
+    return await _generate_shared(question, cv_data, style, company_context, cv_index, cv_fingerprint, field=field)
+
+
+async def stream_answer(
+    question: str,
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    job_description: Optional[str] = None,
+    regenerate: bool = False,
+    cv_index: Optional[CVIndex] = None,
+    cv_fingerprint: Optional[str] = None,
+    company_context: Optional[str] = None,
+    field: FieldSpec = FieldSpec()
+) -> AsyncIterator[dict]:
+    """
+    Streaming variant of generate_answer.
+    Yields {"type": "token", "content": ...} events as the completion arrives,
+    then a final {"type": "done", "answer": ..., "question_type": ...} event.
+    The final answer is the one to keep: it is cut to the field's max_length
+    if the streamed tokens overflowed it.
+    """
+    logger.debug("Streaming answer | question=%s", question)
+    if company_context is None:
+        company_context = build_company_context(job_description)
+
+    direct_response = answer_basic_field(question, cv_data)
+    if direct_response is None and answer_cache is not None and not regenerate:
+        direct_response = answer_cache.lookup(question, cv_data, style, company_context, cv_fingerprint, field.key)
+
+    if direct_response:
+        yield {"type": "token", "content": direct_response.answer}
+        yield {"type": "done", "answer": direct_response.answer, "question_type": direct_response.question_type}
+        return
+
+    deltas: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    async def produce() -> GenerateAnswerResponse:
+        parts: List[str] = []
+        # The sentinel is queued however this ends, so the relaying request
+        # always stops waiting and sees any failure through the flight
+        try:
+            work_tag.set(key)
+            question_type = classify_question(question)
+            tier = select_tier(question_type, field)
+            metrics.set_question_type(question_type)
+            metrics.set_model_tier(tier.name)
+            messages = _build_answer_messages(question, cv_data, style, company_context, cv_index, field=field)
+
+            async for delta in stream_chat_completion(
+                model=tier.model,
+                messages=messages,
+                temperature=tier.temperature,
+                max_tokens=max_tokens_for(tier, field),
+                timeout=ANSWER_TIMEOUT
+            ):
+                parts.append(delta)
+                deltas.put_nowait(delta)
+        finally:
+            deltas.put_nowait(None)
+
+        answer = fit_to_length("".join(parts).strip(), field.max_length)
+
+        logger.debug(
+            "LLM answer streamed | question_type=%s | tier=%s | question=%s | answer_preview=%s",
+            question_type,
+            tier.name,
+            question,
+            answer[:300]
+        )
+
+        response = GenerateAnswerResponse(answer=answer, question_type=question_type)
+        if answer_cache is not None:
+            await asyncio.to_thread(
+                answer_cache.save, question, cv_data, style, company_context, response, cv_fingerprint, field.key
+            )
+        return response
+
+    # The completion runs as a shared task: this request relays its tokens,
+    # identical requests arriving meanwhile receive the finished answer.
+    _, _, key = answer_keys(question, cv_data, style, company_context, cv_fingerprint, field.key)
+    scheduler.promote(key, INTERACTIVE)
+    flight, leader = answer_flights.claim(key, produce)
+
+    if leader:
+        while (delta := await deltas.get()) is not None:
+            yield {"type": "token", "content": delta}
+
+    response = await asyncio.shield(flight)
+    if not leader:
+        yield {"type": "token", "content": response.answer}
+    yield {"type": "done", "answer": response.answer, "question_type": response.question_type}
+
+
+async def generate_answers(
+    questions: List[str],
+    cv_data: ParsedCV,
+    style: StylePreferences,
+    job_description: Optional[str] = None,
+    regenerate: bool = False,
+    cv_index: Optional[CVIndex] = None,
+    cv_fingerprint: Optional[str] = None,
+    company_context: Optional[str] = None,
+    fields: Optional[List[FieldSpec]] = None,
+    priority: int = BATCH
+) -> List[BatchAnswerItem]:
+    """
+    Answer every question of a form in one pass.
+    Basic fields and cached answers are resolved locally; the remaining questions
+    share the job context and CV index and are sent to the LLM concurrently. Results keep the input order,
+    and a failed question does not fail the rest of the batch. fields, when
+    given, holds the form field of each question (same order). Speculative
+    batches pass priority=PREFETCH: they queue behind all other work and are
+    cancelled with the calling task.
+    """
+    logger.info("Generating batch answers | questions=%d", len(questions))
+    if company_context is None:
+        company_context = build_company_context(job_description)
+    fields = fields or [FieldSpec()] * len(questions)
+
+    results: List[Optional[BatchAnswerItem]] = [None] * len(questions)
+    pending: List[int] = []
+
+    for index, question in enumerate(questions):
+        direct_response = answer_basic_field(question, cv_data)
+        if direct_response is None and answer_cache is not None and not regenerate:
+            direct_response = answer_cache.lookup(
+                question, cv_data, style, company_context, cv_fingerprint, fields[index].key
+            )
+
+        if direct_response:
+            results[index] = BatchAnswerItem(
+                question=question,
+                answer=direct_response.answer,
+                question_type=direct_response.question_type
+            )
+        else:
+            pending.append(index)
+
+    if pending:
+        style_instructions = get_style_instructions(style)
+        cv_index = cv_index or CVIndex(cv_data)
+
+        # Repeated questions within the batch coalesce onto one completion
+        completed = await asyncio.gather(
+            *(
+                _generate_shared(
+                    questions[index], cv_data, style, company_context, cv_index, cv_fingerprint,
+                    style_instructions, fields[index], priority=priority
+                )
+                for index in pending
+            ),
+            return_exceptions=True
+        )
+
+        # A full upstream queue fails the whole batch with 429; answers that did
+        # complete are cached, so the client's retry only redoes the rest
+        busy = next((outcome for outcome in completed if isinstance(outcome, SchedulerBusy)), None)
+        if busy is not None:
+            raise busy
+
+        for index, outcome in zip(pending, completed):
+            question = questions[index]
+            if isinstance(outcome, Exception):
+                logger.error("Batch answer failed | index=%d | error=%s", index, outcome)
+                results[index] = BatchAnswerItem(
+                    question=question,
+                    question_type=classify_question(question),
+                    error="Failed to generate answer"
+                )
+            else:
+                results[index] = BatchAnswerItem(
+                    question=question,
+                    answer=outcome.answer,
+                    question_type=outcome.question_type
+                )
+
+    logger.info("Batch answers done | local=%d | llm=%d", len(questions) - len(pending), len(pending))
+    return results
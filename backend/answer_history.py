@@ -0,0 +1,253 @@
+"""
+Per-CV history of generated answers, searchable for reuse.
+
+Every answer generated for a CV session is stored with its question, question
+type and the company and position it was written for. POST /suggest_answers
+looks up the best previous answers to a new question through an SQLite FTS5
+index (BM25 over question and answer text, porter-stemmed), so a "tell us
+about yourself" essay written for one application can be offered again in a
+few milliseconds instead of a fresh completion.
+"""
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from cache import SQLITE_BUSY_TIMEOUT, STATE_BACKEND, STATE_PATH
+from cv_retrieval import tokenize
+
+logger = logging.getLogger(__name__)
+
+# sqlite (persistent), memory (per process, lost on restart) or none
+ANSWER_HISTORY_BACKEND = os.getenv('ANSWER_HISTORY_BACKEND', STATE_BACKEND).lower()
+ANSWER_HISTORY_PATH = os.getenv('ANSWER_HISTORY_PATH', STATE_PATH)
+# Newest answers kept per CV; older ones are dropped as new ones arrive
+ANSWER_HISTORY_MAX_PER_CV = int(os.getenv('ANSWER_HISTORY_MAX_PER_CV', '500'))
+# Seconds an answer is kept after it was last generated; 0 keeps it forever
+ANSWER_HISTORY_TTL = float(os.getenv('ANSWER_HISTORY_TTL', str(365 * 24 * 3600))) or None
+# Seconds between sweeps of expired answers, done by the next recording due
+ANSWER_HISTORY_SWEEP_INTERVAL = float(os.getenv('ANSWER_HISTORY_SWEEP_INTERVAL', '3600'))
+# BM25 candidates re-ranked by question similarity per suggestion request
+ANSWER_HISTORY_CANDIDATES = int(os.getenv('ANSWER_HISTORY_CANDIDATES', '20'))
+
+# Answers copied from CV fields (name, email...) are not worth suggesting
+UNRECORDED_TYPES = frozenset({"basic_info"})
+
+# Matches in the question count this much more than matches in the answer
+QUESTION_WEIGHT = 4.0
+
+_COMPANY_RE = re.compile(r"^Company: (.+)$", re.MULTILINE)
+_POSITION_RE = re.compile(r"^Position: (.+)$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class PastAnswer:
+    question: str
+    answer: str
+    question_type: str
+    company: Optional[str]
+    position: Optional[str]
+    created_at: float
+    # Share of content words the two questions have in common (0-1)
+    similarity: float
+
+
+def job_labels(company_context: str) -> tuple:
+    """(company, position) from a rendered company context, where present."""
+    company = _COMPANY_RE.search(company_context)
+    position = _POSITION_RE.search(company_context)
+    return (company.group(1).strip() if company else None, position.group(1).strip() if position else None)
+
+
+def _normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping, so "working" and "work" count as the same word."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def question_similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the (stemmed) content words of two questions."""
+    words_a, words_b = {_stem(word) for word in tokenize(a)}, {_stem(word) for word in tokenize(b)}
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def match_query(cv_id: str, question: str) -> Optional[str]:
+    """
+    FTS5 query for this CV's answers matching any content word of the
+    question, or None if it has none. Matching on the cv_id column lets FTS5
+    skip straight through other CVs' rows instead of filtering them afterwards.
+    """
+    words = dict.fromkeys(word for word in tokenize(question) if word.isalnum())
+    if not words:
+        return None
+    cv_token = cv_id.replace('"', '""')
+    return f'cv_id : "{cv_token}" AND {{question answer}} : (' + " OR ".join(f'"{word}"' for word in words) + ")"
+
+
+class AnswerHistory:
+    """
+    Answers stored in one SQLite table with an external-content FTS5 index
+    (question, answer and cv_id) kept in sync by triggers. An answer is stored
+    once per (cv_id, question, answer); generating it again only refreshes its
+    timestamp.
+
+    Calls block on SQLite; the API runs them in a worker thread.
+    """
+
+    def __init__(self, path: str, max_per_cv: int = 500, ttl: Optional[float] = None):
+        self.path = path
+        self.max_per_cv = max_per_cv
+        self.ttl = ttl
+        self.recorded = 0
+        self.suggestions = 0
+        self.hits = 0
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS answer_history (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                cv_id TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                question_type TEXT NOT NULL,
+                company TEXT,
+                position TEXT,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answer_history_cv ON answer_history (cv_id, created_at);
+            CREATE INDEX IF NOT EXISTS answer_history_created ON answer_history (created_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS answer_history_fts USING fts5(
+                question, answer, cv_id, content='answer_history', content_rowid='id',
+                tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS answer_history_insert AFTER INSERT ON answer_history BEGIN
+                INSERT INTO answer_history_fts (rowid, question, answer, cv_id)
+                VALUES (new.id, new.question, new.answer, new.cv_id);
+            END;
+            CREATE TRIGGER IF NOT EXISTS answer_history_delete AFTER DELETE ON answer_history BEGIN
+                INSERT INTO answer_history_fts (answer_history_fts, rowid, question, answer, cv_id)
+                VALUES ('delete', old.id, old.question, old.answer, old.cv_id);
+            END;
+        """)
+        self._conn.commit()
+
+    def record(
+        self,
+        cv_id: str,
+        question: str,
+        answer: str,
+        question_type: str,
+        company_context: str = "",
+    ) -> None:
+        """
+        Store a generated answer, dropping the CV's oldest ones beyond
+        max_per_cv. Expired answers of all CVs are swept at most once per
+        ANSWER_HISTORY_SWEEP_INTERVAL; until then suggest() skips them.
+        """
+        if not answer.strip() or question_type in UNRECORDED_TYPES:
+            return
+        key = hashlib.sha256(f"{cv_id}\n{_normalize(question)}\n{answer}".encode("utf-8")).hexdigest()
+        company, position = job_labels(company_context)
+        now = time.time()
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE answer_history SET created_at = ? WHERE key = ?", (now, key)
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT INTO answer_history "
+                    "(key, cv_id, question, answer, question_type, company, position, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, cv_id, question, answer, question_type, company, position, now)
+                )
+                self._conn.execute(
+                    "DELETE FROM answer_history WHERE id IN ("
+                    "SELECT id FROM answer_history WHERE cv_id = ? ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (cv_id, self.max_per_cv)
+                )
+            if self.ttl and now - self._last_sweep >= ANSWER_HISTORY_SWEEP_INTERVAL:
+                self._conn.execute("DELETE FROM answer_history WHERE created_at < ?", (now - self.ttl,))
+                self._last_sweep = now
+            self._conn.commit()
+            self.recorded += 1
+
+    def suggest(
+        self,
+        cv_id: str,
+        question: str,
+        limit: int = 3,
+        max_length: Optional[int] = None,
+    ) -> List[PastAnswer]:
+        """
+        The previous answers for this CV that best fit the question: the top
+        BM25 matches, re-ranked by how close their question is to this one.
+        Answers longer than max_length are left out.
+        """
+        query = match_query(cv_id, question)
+        if query is None:
+            return []
+
+        since = time.time() - self.ttl if self.ttl else 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT h.question, h.answer, h.question_type, h.company, h.position, h.created_at "
+                "FROM answer_history_fts JOIN answer_history h ON h.id = answer_history_fts.rowid "
+                "WHERE answer_history_fts MATCH ? AND h.cv_id = ? AND h.created_at >= ? "
+                "AND (? IS NULL OR length(h.answer) <= ?) "
+                "ORDER BY bm25(answer_history_fts, ?, 1.0, 0.0) LIMIT ?",
+                (query, cv_id, since, max_length, max_length, QUESTION_WEIGHT, max(limit, ANSWER_HISTORY_CANDIDATES))
+            ).fetchall()
+            self.suggestions += 1
+            self.hits += bool(rows)
+
+        candidates = [
+            PastAnswer(*row, similarity=round(question_similarity(question, row[0]), 3))
+            for row in rows
+        ]
+        # Stable sort: BM25 order breaks ties
+        candidates.sort(key=lambda past: past.similarity, reverse=True)
+        return candidates[:limit]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM answer_history").fetchone()[0]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory" if self.path == ":memory:" else "sqlite",
+            "size": len(self),
+            "recorded": self.recorded,
+            "suggestions": self.suggestions,
+            "hits": self.hits,
+        }
+
+
+def create_answer_history() -> Optional[AnswerHistory]:
+    """Build the history from ANSWER_HISTORY_* settings; None when disabled."""
+    if ANSWER_HISTORY_BACKEND == "none":
+        return None
+    if ANSWER_HISTORY_BACKEND == "memory":
+        path = ":memory:"
+    elif ANSWER_HISTORY_BACKEND == "sqlite":
+        path = ANSWER_HISTORY_PATH
+        logger.info("Using sqlite answer history | path=%s", path)
+    else:
+        raise ValueError(f"Unknown answer history backend: {ANSWER_HISTORY_BACKEND}")
+    return AnswerHistory(path, max_per_cv=ANSWER_HISTORY_MAX_PER_CV, ttl=ANSWER_HISTORY_TTL)
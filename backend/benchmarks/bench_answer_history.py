@@ -0,0 +1,136 @@
+"""
+Latency of answer history lookups as the history grows.
+
+Runs in process, without a server or upstream. For each history size it fills
+a fresh SQLite answer history with the answers many CVs gave to the
+long-form questions of the corpus, each asked by several companies ("Why do
+you want to work at Acme?", "... at Globex?"), then times:
+
+- record: storing one more answer (FTS index update and pruning included)
+- suggest: the best previous answers to a question for a company the CV has
+  not applied to yet, directly and through POST /suggest_answers
+
+It also reports how often the top suggestion answers the same question for
+another company (reuse found).
+
+Run from the backend directory:
+    python benchmarks/bench_answer_history.py
+    python benchmarks/bench_answer_history.py --sizes 1000 100000 --queries 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+from answer_history import AnswerHistory  # noqa: E402
+from corpus import APPLICATION_FORMS, COMPANIES, DOMAINS, QUESTIONS, TECH, VERBS  # noqa: E402
+from labeled_questions import LABELED_QUESTIONS  # noqa: E402
+
+# Long-form questions; {company} is filled in per application
+TEMPLATES = sorted({
+    question.replace("Globex", "{company}")
+    for question in [
+        *QUESTIONS,
+        *(question for question, field, _ in LABELED_QUESTIONS if field is None),
+        *(question for form in APPLICATION_FORMS for question in form["questions"] if "?" in question or "." in question),
+    ]
+})
+QUERY_COMPANIES = ["Contoso", "Fabrikam", "Northwind"]
+
+
+def answer_text(rng: random.Random, company: str) -> str:
+    sentences = [
+        f"{rng.choice(VERBS)} {rng.choice(DOMAINS)} services in {rng.choice(TECH)} and {rng.choice(TECH)}."
+        for _ in range(rng.randint(3, 8))
+    ]
+    return f"At {company} I would bring my experience. " + " ".join(sentences)
+
+
+def fill(history: AnswerHistory, size: int, per_cv: int, rng: random.Random) -> List[str]:
+    """Record `size` answers, per_cv per CV; returns the CV ids."""
+    cv_ids = [f"cv{index:05d}" for index in range((size + per_cv - 1) // per_cv)]
+    applications = [(template, company) for company in COMPANIES for template in TEMPLATES]
+    for cv_id in cv_ids:
+        for template, company in rng.sample(applications, min(per_cv, len(applications))):
+            history.record(cv_id, template.format(company=company), answer_text(rng, company), "general",
+                           f"Company: {company}\nPosition: Engineer\n")
+    return cv_ids
+
+
+def percentiles(samples: List[float]) -> Tuple[float, float, float]:
+    cuts = statistics.quantiles(samples, n=100)
+    return statistics.median(samples) * 1000, cuts[94] * 1000, cuts[98] * 1000
+
+
+async def suggest_through_app(history: AnswerHistory, queries: List[Tuple[str, str]]) -> List[float]:
+    import main
+
+    main.answer_history = history
+    samples = []
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for cv_id, question in queries:
+            started = time.perf_counter()
+            response = await client.post("/suggest_answers", json={"cv_id": cv_id, "question": question})
+            samples.append(time.perf_counter() - started)
+            response.raise_for_status()
+    return samples
+
+
+def main(args) -> int:
+    rng = random.Random(5)
+    print(f"{len(TEMPLATES)} question templates x {len(COMPANIES)} companies; {args.per_cv} answers per CV")
+    print(f"{'answers':>8}  {'record p50/p99':>16}  {'suggest p50/p95/p99':>22}  {'via API p50/p95/p99':>22}  reuse found")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            history = AnswerHistory(os.path.join(directory, "history.sqlite3"), max_per_cv=args.per_cv)
+            cv_ids = fill(history, size, args.per_cv, rng)
+
+            templates = [rng.choice(TEMPLATES) for _ in range(args.queries)]
+            queries = [
+                (rng.choice(cv_ids), template.format(company=rng.choice(QUERY_COMPANIES)))
+                for template in templates
+            ]
+            suggest_samples, found = [], 0
+            for (cv_id, question), template in zip(queries, templates):
+                started = time.perf_counter()
+                suggestions = history.suggest(cv_id, question)
+                suggest_samples.append(time.perf_counter() - started)
+                if suggestions and suggestions[0].question in {template.format(company=c) for c in COMPANIES}:
+                    found += 1
+
+            record_samples = []
+            for index in range(args.queries):
+                started = time.perf_counter()
+                history.record(rng.choice(cv_ids), f"Extra question {index}?", answer_text(rng, "Contoso"), "general")
+                record_samples.append(time.perf_counter() - started)
+
+            api_samples = asyncio.run(suggest_through_app(history, queries))
+            record_p50, _, record_p99 = percentiles(record_samples)
+            print(
+                f"{len(history):>8}  {record_p50:>7.2f}/{record_p99:<5.2f} ms"
+                f"  {'/'.join(f'{value:.2f}' for value in percentiles(suggest_samples)):>19} ms"
+                f"  {'/'.join(f'{value:.2f}' for value in percentiles(api_samples)):>19} ms"
+                f"  {found / len(queries):>10.0%}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Answers in the history")
+    parser.add_argument("--per-cv", type=int, default=200, help="Answers per CV")
+    parser.add_argument("--queries", type=int, default=300, help="Lookups timed per size")
+    sys.exit(main(parser.parse_args()))
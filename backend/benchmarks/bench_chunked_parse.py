@@ -0,0 +1,138 @@
+"""
+Upload latency of long CVs parsed in one completion and in concurrent chunks.
+
+Starts the fake OpenAI server with prefill and decode costs, then runs the API
+with CV_PARSE_MODE=full and CV_PARSE_MODE=chunked and uploads synthetic
+academic CVs of increasing length as PDFs, with the parsed-CV cache off. For
+each size it reports pages, upload latency, completions and tokens, and
+whether the merged entries match the CV that was rendered (experience,
+projects and publications, skills, education).
+
+Run from the backend directory:
+    python benchmarks/bench_chunked_parse.py
+    python benchmarks/bench_chunked_parse.py --chunk-chars 4000 --tokens-per-second 100
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import cv_lines, publications, senior_cv, write_pdf  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+# (experiences, projects, publications) per synthetic CV
+SIZES = [(6, 4, 10), (15, 10, 60), (30, 20, 150), (60, 30, 300)]
+
+
+def write_corpus(directory: str) -> List[dict]:
+    docs = []
+    for experiences, projects, papers in SIZES:
+        cv = senior_cv(experiences=experiences, projects=projects)
+        lines = cv_lines(cv) + ["", "Publications", *publications(papers)]
+        path = os.path.join(directory, f"cv_{experiences}_{papers}.pdf")
+        pages = write_pdf(lines, path)
+        docs.append({
+            "name": f"{experiences} jobs, {papers} papers",
+            "path": path,
+            "pages": pages,
+            "expected": {
+                "experience": experiences,
+                "projects": projects + papers,
+                "skills": len(cv["skills"]),
+                "education": len(cv["education"]),
+            },
+        })
+    return docs
+
+
+async def upload_corpus(api_url: str, docs: List[dict]) -> List[dict]:
+    results = []
+    async with httpx.AsyncClient(timeout=600) as client:
+        for doc in docs:
+            with open(doc["path"], "rb") as f:
+                content = f.read()
+            before = (await client.get(f"{api_url}/cache/stats")).json()["prompt_cache"]
+            started = time.perf_counter()
+            response = await client.post(f"{api_url}/upload_cv", files={"file": ("cv.pdf", content, "application/pdf")})
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            after = (await client.get(f"{api_url}/cache/stats")).json()["prompt_cache"]
+
+            parsed = response.json()
+            counts = {field: len(parsed[field]) for field in doc["expected"]}
+            results.append({
+                "seconds": elapsed,
+                "complete": counts == doc["expected"],
+                "counts": counts,
+                **{field: after[field] - before[field] for field in ("completions", "prompt_tokens", "completion_tokens")},
+            })
+    return results
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    stub = start_process([
+        "benchmarks/fake_openai.py", "--port", str(args.stub_port),
+        "--latency", str(args.latency),
+        "--prefill-per-1k", str(args.prefill_per_1k),
+        "--tokens-per-second", str(args.tokens_per_second),
+    ])
+    runs: Dict[str, List[dict]] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        docs = write_corpus(directory)
+        try:
+            await wait_until_ready(f"{stub_url}/docs")
+            for mode in ("full", "chunked"):
+                env = dict(os.environ)
+                env.update({
+                    "OPENAI_API_KEY": "stub-key",
+                    "OPENAI_BASE_URL": f"{stub_url}/v1",
+                    "CV_PARSE_MODE": mode,
+                    "CV_PARSE_CHUNK_CHARS": str(args.chunk_chars),
+                    "CV_CACHE_BACKEND": "none",
+                })
+                api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+                try:
+                    await wait_until_ready(f"{api_url}/health")
+                    runs[mode] = await upload_corpus(api_url, docs)
+                finally:
+                    api.terminate()
+                    api.wait()
+        finally:
+            stub.terminate()
+            stub.wait()
+
+    failures = 0
+    print(f"{'CV':<22} {'pages':>5}  {'mode':<8} {'latency':>10}  {'calls':>5}  {'prompt tok':>10}  {'output tok':>10}  entries")
+    for index, doc in enumerate(docs):
+        for mode, results in runs.items():
+            result = results[index]
+            failures += not result["complete"]
+            print(
+                f"{doc['name']:<22} {doc['pages']:>5}  {mode:<8} {result['seconds'] * 1000:>7.0f} ms  {result['completions']:>5}"
+                f"  {result['prompt_tokens']:>10}  {result['completion_tokens']:>10}"
+                f"  {'ok' if result['complete'] else result['counts']}"
+            )
+        speedup = runs["full"][index]["seconds"] / runs["chunked"][index]["seconds"]
+        print(f"{'':<22} {'':>5}  chunked is {speedup:.1f}x the speed of full")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--chunk-chars", type=int, default=6000, help="CV_PARSE_CHUNK_CHARS for the chunked run")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake time to first token")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.1, help="Fake prefill seconds per 1k prompt tokens")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Fake upstream decode rate")
+    sys.exit(asyncio.run(main(parser.parse_args())))
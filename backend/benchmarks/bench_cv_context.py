@@ -0,0 +1,101 @@
+"""
+Compare prompt size and end-to-end latency of the full-CV prompt against the
+relevance-ranked CV context (cv_retrieval) on a long synthetic CV, and how
+much of each prompt is a prefix shared with the previous question's prompt
+(what the provider's prompt cache can reuse; it needs 1024 tokens or more).
+
+The fake OpenAI server is started with a per-prompt-token delay so prompt
+size shows up in latency the way prefill does upstream.
+
+Run from the backend directory:
+    python benchmarks/bench_cv_context.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run(args) -> None:
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.stub_port}/v1"
+    os.environ["ANSWER_CACHE_BACKEND"] = "none"
+
+    import httpx
+    import cv_retrieval
+    from answer_generator import (
+        build_company_context, build_prompt_messages, generate_answer, get_style_instructions,
+    )
+    from cv_retrieval import CVIndex, estimate_tokens
+    from models import ParsedCV, StylePreferences
+    from corpus import JOB_CONTEXT, QUESTIONS, senior_cv
+
+    cv = ParsedCV(**senior_cv(experiences=args.experiences))
+    style = StylePreferences()
+    company_context = build_company_context(JOB_CONTEXT)
+    index = CVIndex(cv)
+
+    stub = subprocess.Popen(
+        [sys.executable, "benchmarks/fake_openai.py", "--port", str(args.stub_port),
+         "--latency", str(args.latency), "--prefill-per-1k", str(args.prefill_per_1k)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient() as probe:
+            for _ in range(100):
+                try:
+                    await probe.get(f"http://127.0.0.1:{args.stub_port}/docs")
+                    break
+                except httpx.TransportError:
+                    await asyncio.sleep(0.1)
+
+        print(f"CV: {len(cv.experience)} experiences, {len(cv.projects)} projects, "
+              f"~{index.full_tokens} tokens rendered in full")
+        print(f"{'mode':>10} {'budget':>7} {'prompt tok (avg)':>17} {'shared prefix tok':>18} "
+              f"{'latency ms (avg)':>17}")
+
+        for label, budget in (("full", 0), ("retrieval", args.budget)):
+            cv_retrieval.CV_CONTEXT_TOKEN_BUDGET = budget
+            prompt_tokens, shared_tokens, latencies = [], [], []
+            previous = None
+            for question in QUESTIONS:
+                cv_context, cv_entries = index.split_context_for(f"{question}\n{company_context}")
+                messages = build_prompt_messages(
+                    question=question,
+                    cv_context=cv_context,
+                    style_instructions=get_style_instructions(style),
+                    company_context=company_context,
+                    cv_entries=cv_entries,
+                )
+                prompt = "".join(m["content"] for m in messages)
+                prompt_tokens.append(estimate_tokens(prompt))
+                if previous is not None:
+                    shared_tokens.append(estimate_tokens(os.path.commonprefix([previous, prompt])))
+                previous = prompt
+
+                started = time.perf_counter()
+                await generate_answer(question, cv, style, JOB_CONTEXT, cv_index=index)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+            print(f"{label:>10} {budget:>7} {statistics.mean(prompt_tokens):>17.0f} "
+                  f"{statistics.mean(shared_tokens):>18.0f} {statistics.mean(latencies):>17.1f}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stub-port", type=int, default=9101)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--prefill-per-1k", type=float, default=0.15)
+    parser.add_argument("--experiences", type=int, default=14)
+    parser.add_argument("--budget", type=int, default=1200)
+    asyncio.run(run(parser.parse_args()))
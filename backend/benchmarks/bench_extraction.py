@@ -0,0 +1,95 @@
+"""
+Compare CV text extraction inline on the event loop (the old upload path)
+against cv_parser's off-loop extraction, which splits large PDFs across a
+process pool. Also reports the worst event-loop stall seen while extracting,
+which is what other requests wait on during an upload.
+
+Run from the backend directory:
+    python benchmarks/bench_extraction.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+async def _max_loop_stall(task: "asyncio.Future", interval: float = 0.005) -> float:
+    """Largest gap between ticks of a periodic coroutine while task runs."""
+    worst = 0.0
+    last = time.perf_counter()
+    while not task.done():
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        worst = max(worst, now - last - interval)
+        last = now
+    return worst
+
+
+async def _measure(make_coro, runs: int):
+    timings, stalls = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        task = asyncio.ensure_future(make_coro())
+        stall = await _max_loop_stall(task)
+        text = await task
+        timings.append((time.perf_counter() - start) * 1000)
+        stalls.append(stall * 1000)
+    return statistics.median(timings), max(stalls), len(text)
+
+
+async def run(args) -> None:
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    import cv_parser
+    from text_extraction import extract_text_from_docx, extract_text_from_pdf
+    from corpus import cv_lines, senior_cv, write_docx, write_pdf
+
+    async def inline(fn, path):
+        return fn(path)
+
+    workdir = tempfile.mkdtemp(prefix="cv-corpus-")
+    print(f"workers={cv_parser.CV_EXTRACT_WORKERS} pages_per_task={cv_parser.CV_EXTRACT_PAGES_PER_TASK}")
+    print(f"{'file':<22}{'inline ms':>11}{'stall ms':>10}{'pooled ms':>11}{'stall ms':>10}{'chars':>9}")
+
+    # Warm the pool so worker start-up is not billed to the first document
+    warm = os.path.join(workdir, "warm.pdf")
+    write_pdf(["warm up"], warm)
+    await cv_parser.extract_pdf_text(warm)
+
+    for experiences in args.experiences:
+        cv = senior_cv(experiences=experiences, achievements=args.achievements)
+
+        pdf_path = os.path.join(workdir, f"cv-{experiences}.pdf")
+        pages = write_pdf(cv_lines(cv), pdf_path)
+        base = await _measure(lambda: inline(extract_text_from_pdf, pdf_path), args.runs)
+        pooled = await _measure(lambda: cv_parser.extract_pdf_text(pdf_path), args.runs)
+        assert base[2] == pooled[2], "pooled extraction changed the text"
+        print(f"{f'pdf {pages} pages':<22}{base[0]:>11.1f}{base[1]:>10.1f}{pooled[0]:>11.1f}{pooled[1]:>10.1f}{pooled[2]:>9}")
+
+        docx_path = os.path.join(workdir, f"cv-{experiences}.docx")
+        write_docx(cv, docx_path)
+        base = await _measure(lambda: inline(extract_text_from_docx, docx_path), args.runs)
+        pooled = await _measure(lambda: cv_parser.extract_text(docx_path, docx_path), args.runs)
+        print(f"{f'docx {experiences} roles':<22}{base[0]:>11.1f}{base[1]:>10.1f}{pooled[0]:>11.1f}{pooled[1]:>10.1f}{pooled[2]:>9}")
+
+    cv_parser.shutdown_extract_pool()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--experiences", type=int, nargs="+", default=[4, 16, 48, 120],
+                        help="Roles per generated CV (controls page count)")
+    parser.add_argument("--achievements", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per file (median reported)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
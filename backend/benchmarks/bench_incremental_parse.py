@@ -0,0 +1,148 @@
+"""
+Latency and upstream tokens of CV re-uploads with full and incremental parsing.
+
+Starts the fake OpenAI server with prefill and decode costs, then runs the API
+once per CV_PARSE_MODE and uploads three revisions of a long academic CV as
+PDFs: the original, one with a new job at the top of Experience, and one
+with a skill added. Each revision is a new file, so the parsed-CV cache
+(keyed by file bytes) misses every time; incremental mode only re-sends the
+sections that changed.
+
+Run from the backend directory:
+    python benchmarks/bench_incremental_parse.py
+    python benchmarks/bench_incremental_parse.py --publications 80 --prefill-per-1k 0.2
+"""
+import argparse
+import asyncio
+import copy
+import os
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import cv_lines, publications, senior_cv, write_pdf  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+TOKEN_FIELDS = ("completions", "prompt_tokens", "completion_tokens")
+
+
+def revisions(args) -> List[Tuple[str, List[str]]]:
+    """(name, CV text lines) of each uploaded revision, in upload order."""
+    cv = senior_cv(experiences=args.experiences)
+    papers = ["", "Publications", *publications(args.publications)]
+
+    new_job = copy.deepcopy(cv)
+    new_job["experience"].insert(0, {
+        "company": "Massive Dynamic",
+        "role": "Principal Engineer",
+        "duration": "2024 - Present",
+        "achievements": ["Led the detection platform rewrite across four teams"],
+    })
+    new_skill = copy.deepcopy(new_job)
+    new_skill["skills"] = sorted(new_skill["skills"] + ["Zig"])
+
+    return [
+        ("original", cv_lines(cv) + papers),
+        ("new job", cv_lines(new_job) + papers),
+        ("new skill", cv_lines(new_skill) + papers),
+    ]
+
+
+async def upload_revisions(api_url: str, directory: str, docs: List[Tuple[str, List[str]]]) -> List[dict]:
+    results = []
+    async with httpx.AsyncClient(timeout=300) as client:
+        for name, lines in docs:
+            path = os.path.join(directory, f"{name.replace(' ', '_')}.pdf")
+            write_pdf(lines, path)
+            with open(path, "rb") as f:
+                content = f.read()
+
+            before = (await client.get(f"{api_url}/cache/stats")).json()["prompt_cache"]
+            started = time.perf_counter()
+            response = await client.post(f"{api_url}/upload_cv", files={"file": ("cv.pdf", content, "application/pdf")})
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            after = (await client.get(f"{api_url}/cache/stats")).json()["prompt_cache"]
+
+            parsed = response.json()
+            results.append({
+                "name": name,
+                "seconds": elapsed,
+                "experience": len(parsed["experience"]),
+                "projects": len(parsed["projects"]),
+                "skills": len(parsed["skills"]),
+                **{field: after[field] - before[field] for field in TOKEN_FIELDS},
+            })
+    return results
+
+
+def print_run(mode: str, results: List[dict]) -> None:
+    print(f"\nCV_PARSE_MODE={mode}")
+    for result in results:
+        print(
+            f"  {result['name']:<10} {result['seconds'] * 1000:>8.1f} ms  completions {result['completions']}"
+            f"  prompt tokens {result['prompt_tokens']:>6}  completion tokens {result['completion_tokens']:>6}"
+            f"  (experience {result['experience']}, projects {result['projects']}, skills {result['skills']})"
+        )
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+    docs = revisions(args)
+
+    stub = start_process([
+        "benchmarks/fake_openai.py", "--port", str(args.stub_port),
+        "--latency", str(args.latency),
+        "--prefill-per-1k", str(args.prefill_per_1k),
+        "--tokens-per-second", str(args.tokens_per_second),
+    ])
+    runs = {}
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+        for mode in ("full", "incremental"):
+            env = dict(os.environ)
+            env.update({
+                "OPENAI_API_KEY": "stub-key",
+                "OPENAI_BASE_URL": f"{stub_url}/v1",
+                "CV_PARSE_MODE": mode,
+                "CV_CACHE_BACKEND": "memory",
+                "CV_SECTION_CACHE_BACKEND": "memory",
+            })
+            api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+            try:
+                await wait_until_ready(f"{api_url}/health")
+                with tempfile.TemporaryDirectory() as directory:
+                    runs[mode] = await upload_revisions(api_url, directory, docs)
+            finally:
+                api.terminate()
+                api.wait()
+            print_run(mode, runs[mode])
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    print("\nre-uploads (after the original)")
+    for full, incremental in zip(runs["full"][1:], runs["incremental"][1:]):
+        print(
+            f"  {full['name']:<10} latency {incremental['seconds'] / full['seconds']:.0%} of full,"
+            f" prompt tokens {incremental['prompt_tokens'] / max(1, full['prompt_tokens']):.0%} of full"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--experiences", type=int, default=12)
+    parser.add_argument("--publications", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake time to first token")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.1, help="Fake prefill seconds per 1k prompt tokens")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Fake upstream decode rate")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,162 @@
+"""
+Latency and estimated cost of answers with and without model-tier routing.
+
+Starts the fake OpenAI server with the quality model slower than the fast one,
+then runs the API twice: with the default MODEL_ROUTING, and with every
+question type forced onto the quality tier (the behavior before routing).
+Each run answers the questions of the synthetic application forms, plus a few
+short questions the CV cannot answer, sending single-line inputs with a
+maxlength and open questions as textareas. It reports p50/p95 latency per
+field type and the per-tier split of upstream latency and cost from
+/cache/stats.
+
+Cost comes from the token usage the stub reports and the list prices in
+llm_client.MODEL_PRICES, so compare runs with each other rather than with a bill.
+
+Run from the backend directory:
+    python benchmarks/bench_model_tiers.py
+    python benchmarks/bench_model_tiers.py --quality-latency 1.2 --fast-latency 0.3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import STYLE, percentile  # noqa: E402
+from corpus import APPLICATION_FORMS, senior_cv  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+# Every question type on the quality tier: one model for everything
+ALL_QUALITY = "general=quality,skills=quality,motivation=quality,experience=quality,behavioral=quality"
+
+OPEN_QUESTION_WORDS = ("why", "tell", "describe", "how", "what")
+
+# maxlength of the single-line inputs in the synthetic forms
+SHORT_FIELD_MAX_LENGTH = 120
+
+# Single-line questions the CV cannot answer directly, added to every form
+SHORT_QUESTIONS = [
+    "Earliest start date",
+    "Do you require visa sponsorship?",
+    "Preferred working arrangement (remote, hybrid or onsite)",
+    "One sentence about yourself",
+]
+
+
+def field_for(question: str) -> dict:
+    """Open questions get a textarea; everything else is a short single-line input."""
+    if question.lower().startswith(OPEN_QUESTION_WORDS):
+        return {"field_type": "textarea"}
+    return {"field_type": "text", "max_length": SHORT_FIELD_MAX_LENGTH}
+
+
+async def run_forms(api_url: str, rounds: int) -> Tuple[Dict[str, List[float]], dict]:
+    """Answer every form question rounds times; latencies per field type and the tier stats."""
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    async with httpx.AsyncClient(timeout=120) as client:
+        session = await client.put(f"{api_url}/cv", json=senior_cv(experiences=6))
+        session.raise_for_status()
+        cv_id = session.json()["cv_id"]
+
+        for _ in range(rounds):
+            for form in APPLICATION_FORMS:
+                for question in form["questions"] + SHORT_QUESTIONS:
+                    field = field_for(question)
+                    started = time.perf_counter()
+                    response = await client.post(f"{api_url}/generate_answer", json={
+                        "question": question,
+                        "cv_id": cv_id,
+                        "style": STYLE,
+                        "job_description": form["job_description"],
+                        "regenerate": True,
+                        **field,
+                    })
+                    response.raise_for_status()
+                    elapsed = time.perf_counter() - started
+                    # Answered from the CV without a completion on either run
+                    kind = "cv field" if response.json()["question_type"] == "basic_info" else field["field_type"]
+                    latencies[kind].append(elapsed)
+
+        stats = (await client.get(f"{api_url}/cache/stats")).json()
+    return latencies, stats["model_tiers"]
+
+
+def print_run(name: str, latencies: Dict[str, List[float]], tiers: dict) -> float:
+    print(f"\n{name}")
+    for field_type, values in sorted(latencies.items()):
+        print(
+            f"  {field_type:<9} answers {len(values):>4}  p50 {percentile(values, 0.5) * 1000:>7.1f} ms"
+            f"  p95 {percentile(values, 0.95) * 1000:>7.1f} ms"
+        )
+    total_cost = 0.0
+    for tier, totals in tiers.items():
+        total_cost += totals["cost_usd"]
+        print(
+            f"  tier {tier:<8} completions {totals['completions']:>4}  mean upstream {totals['mean_latency_ms']!s:>7} ms"
+            f"  cost ${totals['cost_usd']:.6f}"
+        )
+    print(f"  total estimated cost ${total_cost:.6f}")
+    return total_cost
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    stub = start_process([
+        "benchmarks/fake_openai.py", "--port", str(args.stub_port),
+        "--latency", str(args.quality_latency),
+        "--model-latency", f"{args.fast_model}={args.fast_latency}",
+        "--tokens-per-second", str(args.tokens_per_second),
+    ])
+    costs = {}
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+        for name, routing in (("routed (default MODEL_ROUTING)", None), ("quality only", ALL_QUALITY)):
+            env = dict(os.environ)
+            env.update({
+                "OPENAI_API_KEY": "stub-key",
+                "OPENAI_BASE_URL": f"{stub_url}/v1",
+                "ANSWER_CACHE_BACKEND": "none",
+                "FAST_TIER_MODEL": args.fast_model,
+            })
+            if routing:
+                env["MODEL_ROUTING"] = routing
+            else:
+                env.pop("MODEL_ROUTING", None)
+
+            api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+            try:
+                await wait_until_ready(f"{api_url}/health")
+                latencies, tiers = await run_forms(api_url, args.rounds)
+            finally:
+                api.terminate()
+                api.wait()
+            costs[name] = print_run(name, latencies, tiers)
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    routed, quality = costs.values()
+    if quality:
+        print(f"\nrouting saves {1 - routed / quality:.0%} of the estimated completion cost")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--fast-model", default="gpt-4o-mini")
+    parser.add_argument("--quality-latency", type=float, default=0.8, help="Fake time to first token of the quality model")
+    parser.add_argument("--fast-latency", type=float, default=0.25, help="Fake time to first token of the fast model")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Fake upstream decode rate")
+    parser.add_argument("--rounds", type=int, default=2, help="Times each form is answered per run")
+    sys.exit(asyncio.run(main(parser.parse_args())))
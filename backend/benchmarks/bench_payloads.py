@@ -0,0 +1,158 @@
+"""
+Serialization time and bytes on the wire of the API's JSON payloads.
+
+Runs in process, without a server or upstream:
+
+- serialization: rendering ParsedCV, GenerateAnswerResponse and
+  GenerateAnswersResponse bodies the way FastAPI does (JSON-mode dump of the
+  response model, then the response class), with the stdlib JSONResponse and
+  with ORJSONResponse, the app's default
+- bytes on the wire: the same bodies, and the /generate_answer request with an
+  inline CV, uncompressed and with each encoding of compression.py, with the
+  time to encode and the transfer time on a slow link
+- a round trip of PUT /cv and GET /cv/{id} through the app with gzip both ways,
+  checking the middleware returns what was sent and that the compressed
+  request is still attributed to its route in /metrics
+
+Run from the backend directory:
+    python benchmarks/bench_payloads.py
+    python benchmarks/bench_payloads.py --link-kbps 512
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import httpx
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+import compression  # noqa: E402
+from bench_suite import STYLE  # noqa: E402
+from corpus import JOB_CONTEXT, senior_cv  # noqa: E402
+from models import BatchAnswerItem, GenerateAnswerResponse, GenerateAnswersResponse, ParsedCV  # noqa: E402
+
+ANSWER = (
+    "I want to join Globex because your threat detection work sits where I have spent the last decade: "
+    "building high-scale security pipelines in Python and Go on Kubernetes. At Acme I led the rewrite of "
+    "our detection service, cutting p95 latency by 40% for 30M users, and I mentored four engineers "
+    "through their first on-call rotations. "
+) * 3
+
+
+def payloads() -> List[Tuple[str, object]]:
+    """(name, response model) pairs of realistic sizes."""
+    items = [
+        (f"ParsedCV {experiences} jobs", ParsedCV(**senior_cv(experiences=experiences)))
+        for experiences in (2, 6, 12, 30)
+    ]
+    items.append(("GenerateAnswerResponse", GenerateAnswerResponse(answer=ANSWER, question_type="motivation")))
+    items.append(("GenerateAnswersResponse x10", GenerateAnswersResponse(answers=[
+        BatchAnswerItem(question=f"Question {index}?", answer=ANSWER, question_type="motivation")
+        for index in range(10)
+    ])))
+    return items
+
+
+def timed(fn: Callable[[], object], min_seconds: float = 0.2) -> float:
+    """Mean seconds per call over at least min_seconds."""
+    fn()
+    calls, started = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < min_seconds:
+        fn()
+        calls += 1
+    return elapsed / calls
+
+
+def render(response_class, model) -> bytes:
+    return response_class(model.model_dump(mode="json")).body
+
+
+def print_serialization(items) -> None:
+    print("serialization (model dump + response render)")
+    print(f"  {'payload':<28} {'bytes':>7}  {'JSONResponse':>12}  {'ORJSONResponse':>14}  speedup")
+    for name, model in items:
+        stdlib = timed(lambda: render(JSONResponse, model))
+        fast = timed(lambda: render(ORJSONResponse, model))
+        print(
+            f"  {name:<28} {len(render(ORJSONResponse, model)):>7}  {stdlib * 1e6:>9.1f} us"
+            f"  {fast * 1e6:>11.1f} us  {stdlib / fast:>6.1f}x"
+        )
+
+
+def print_wire(bodies: List[Tuple[str, bytes]], link_kbps: float) -> None:
+    encodings = ["identity", *compression.ENCODERS]
+    print(f"\nbytes on the wire (transfer at {link_kbps:g} kbit/s; encode time)")
+    print(f"  {'payload':<28} " + "  ".join(f"{encoding:>24}" for encoding in encodings))
+    for name, body in bodies:
+        cells = []
+        for encoding in encodings:
+            if encoding == "identity":
+                encoded, seconds = body, 0.0
+            else:
+                encode = lambda: compression.ENCODERS[encoding]().encode(body, final=True)  # noqa: E731
+                encoded, seconds = encode(), timed(encode, 0.1)
+            transfer_ms = len(encoded) * 8 / link_kbps
+            cells.append(f"{len(encoded):>7} B {transfer_ms:>6.0f} ms {seconds * 1e6:>5.0f} us")
+        print(f"  {name:<28} " + "  ".join(f"{cell:>24}" for cell in cells))
+    if "br" not in compression.ENCODERS:
+        print("  (install the optional brotli package to compare br)")
+
+
+async def round_trip(cv: dict) -> None:
+    """PUT a gzip-compressed CV and read it back gzip-compressed through the app."""
+    from main import app
+
+    raw = json.dumps(cv).encode()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        put = await client.put(
+            "/cv", content=gzip.compress(raw),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        put.raise_for_status()
+        get = await client.get(f"/cv/{put.json()['cv_id']}", headers={"Accept-Encoding": "gzip"})
+        get.raise_for_status()
+        same = ParsedCV(**get.json()) == ParsedCV(**cv)
+        print(
+            f"\nround trip: PUT /cv sent {len(gzip.compress(raw))} of {len(raw)} bytes,"
+            f" GET /cv received {get.num_bytes_downloaded} bytes ({get.headers.get('content-encoding')}),"
+            f" {'identical' if same else 'DIFFERENT'} CV"
+        )
+        if not same:
+            raise SystemExit(1)
+
+        # Decompressing the body must not hide the matched route from the metrics
+        exposition = (await client.get("/metrics")).text
+        labelled = 'submitme_request_seconds_count{endpoint="/cv",method="PUT",status="200"}' in exposition
+        print(f"compressed PUT /cv recorded as endpoint=\"/cv\": {'yes' if labelled else 'NO'}")
+        if not labelled:
+            raise SystemExit(1)
+
+
+def main(args) -> int:
+    items = payloads()
+    print_serialization(items)
+
+    bodies = [(name, render(ORJSONResponse, model)) for name, model in items]
+    request = {"question": "Why do you want to work at Globex?", "cv_data": senior_cv(experiences=12),
+               "style": STYLE, "job_description": JOB_CONTEXT}
+    bodies.append(("POST /generate_answer (cv)", json.dumps(request).encode()))
+    print_wire(bodies, args.link_kbps)
+
+    asyncio.run(round_trip(senior_cv(experiences=12)))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--link-kbps", type=float, default=1000.0, help="Link speed for transfer times (kbit/s)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+Accuracy and speed of the question router (question_router.py) on the
+labeled question corpus, against the previous substring if/elif classifier,
+plus the share of questions answered locally from a CV (cv_fields.py).
+
+Run from the backend directory:
+    python benchmarks/bench_router.py
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from question_router import route_question  # noqa: E402
+from cv_fields import extract_field  # noqa: E402
+from labeled_questions import LABELED_QUESTIONS  # noqa: E402
+from models import ParsedCV  # noqa: E402
+from corpus import senior_cv  # noqa: E402
+
+
+def legacy_route(question: str):
+    """The substring ladders that classify_question/answer_basic_field used before."""
+    q = question.lower()
+    if "first name" in q:
+        field = "first_name"
+    elif "last name" in q or "surname" in q or "family name" in q:
+        field = "last_name"
+    elif "full name" in q or "your name" in q or q.strip() in {"name", "what is your name"}:
+        field = "full_name"
+    elif "email" in q or "e-mail" in q:
+        field = "email"
+    elif "phone" in q or "mobile" in q or "contact number" in q:
+        field = "phone"
+    elif "linkedin" in q:
+        field = "linkedin"
+    elif "website" in q or "portfolio" in q or "site" in q:
+        field = "website"
+    elif "country" in q or "location" in q:
+        field = "country"
+    else:
+        field = None
+
+    if any(word in q for word in ["why", "motivation", "interested", "want to join"]):
+        question_type = "motivation"
+    elif any(word in q for word in ["project", "experience", "worked on", "tell us about"]):
+        question_type = "experience"
+    elif any(word in q for word in ["skill", "knowledge", "proficient", "familiar with"]):
+        question_type = "skills"
+    elif any(word in q for word in ["challenge", "conflict", "difficult", "problem", "situation"]):
+        question_type = "behavioral"
+    else:
+        question_type = "general"
+    return field, question_type
+
+
+def router_route(question: str):
+    route = route_question.__wrapped__(question)
+    return (route.field if route.direct else None), route.question_type
+
+
+def cached_route(question: str):
+    """The router as the API calls it, through its LRU cache (warm after the first pass)."""
+    route = route_question(question)
+    return (route.field if route.direct else None), route.question_type
+
+
+def evaluate(name: str, fn, repeat: int, verbose: bool) -> None:
+    field_ok = type_ok = direct = 0
+    for question, field, question_type in LABELED_QUESTIONS:
+        got_field, got_type = fn(question)
+        field_ok += got_field == field
+        type_ok += got_type == question_type
+        direct += got_field is not None and got_field == field
+        if verbose and (got_field, got_type) != (field, question_type):
+            print(f"  {name} miss: {question!r} -> {got_field}/{got_type}, expected {field}/{question_type}")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question, _, _ in LABELED_QUESTIONS:
+            fn(question)
+    per_call_us = (time.perf_counter() - start) / (repeat * len(LABELED_QUESTIONS)) * 1e6
+
+    total = len(LABELED_QUESTIONS)
+    answerable = sum(1 for _, field, _ in LABELED_QUESTIONS if field)
+    print(
+        f"{name:<8} field acc {field_ok / total:6.1%}  type acc {type_ok / total:6.1%}  "
+        f"answered locally {direct}/{answerable}  {per_call_us:6.2f} us/question"
+    )
+
+
+def evaluate_answers(repeat: int, verbose: bool) -> None:
+    """Route and answer every question from a synthetic CV, without the cache."""
+    cv = ParsedCV(**senior_cv())
+
+    def answer(question: str):
+        route = route_question.__wrapped__(question)
+        return extract_field(route.field, question, cv) if route.direct else None
+
+    answered = 0
+    for question, _, _ in LABELED_QUESTIONS:
+        value = answer(question)
+        answered += value is not None
+        if verbose and value is not None:
+            print(f"  {question!r} -> {value[:60]!r}")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for question, _, _ in LABELED_QUESTIONS:
+            answer(question)
+    per_call_us = (time.perf_counter() - start) / (repeat * len(LABELED_QUESTIONS)) * 1e6
+    print(f"local answers {answered}/{len(LABELED_QUESTIONS)} questions without the LLM, {per_call_us:.2f} us/question")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--verbose", action="store_true", help="Print misclassified questions")
+    args = parser.parse_args()
+
+    print(f"{len(LABELED_QUESTIONS)} labeled questions")
+    evaluate("legacy", legacy_route, args.repeat, args.verbose)
+    evaluate("router", router_route, args.repeat, args.verbose)
+    evaluate("cached", cached_route, args.repeat, False)
+    evaluate_answers(args.repeat // 10, args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cold-start timing for the API process.
+
+For each run, measures in fresh processes:
+- import: wall time of `python -c "import main"`
+- ready: spawning uvicorn until /health first answers
+- first answer: the first /generate_answer on that fresh process (against
+  the fake OpenAI server), sent --delay seconds after ready; it pays for
+  whatever OpenAI client setup has not happened in the background yet
+- health stall: the slowest /health response while that first answer is in
+  flight; client setup done on the event loop shows up here
+and lists which heavy modules importing the app loads.
+
+Run from the backend directory:
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import BACKEND_DIR, REQUEST_BODY, start_process, wait_until_ready  # noqa: E402
+
+# Loaded on demand by the app; none should appear right after import
+HEAVY_MODULES = ("openai", "httpx", "pypdf", "docx")
+
+
+def time_import(env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def loaded_heavy_modules(env: dict) -> list:
+    output = subprocess.check_output(
+        [sys.executable, "-c", f"import main, sys; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"],
+        cwd=BACKEND_DIR, env=env, text=True, stderr=subprocess.DEVNULL
+    )
+    return output.split()
+
+
+async def time_ready_and_first_answer(env: dict, api_port: int, delay: float) -> tuple:
+    api_url = f"http://127.0.0.1:{api_port}"
+    started = time.perf_counter()
+    api = start_process(["-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning"], env=env)
+    try:
+        await wait_until_ready(f"{api_url}/health", timeout=60)
+        ready = time.perf_counter() - started
+        await asyncio.sleep(delay)
+
+        async with httpx.AsyncClient(timeout=60) as client:
+            answering = True
+
+            async def probe_health() -> float:
+                slowest = 0.0
+                while answering:
+                    probe_started = time.perf_counter()
+                    await client.get(f"{api_url}/health")
+                    slowest = max(slowest, time.perf_counter() - probe_started)
+                    await asyncio.sleep(0.01)
+                return slowest
+
+            probe = asyncio.ensure_future(probe_health())
+            started = time.perf_counter()
+            response = await client.post(f"{api_url}/generate_answer", json=REQUEST_BODY)
+            response.raise_for_status()
+            first_answer = time.perf_counter() - started
+            answering = False
+            health_stall = await probe
+    finally:
+        api.terminate()
+        api.wait()
+    return ready, first_answer, health_stall
+
+
+def report(name: str, values: list) -> None:
+    print(f"{name:<14} median {statistics.median(values) * 1000:8.0f} ms   min {min(values) * 1000:8.0f} ms")
+
+
+async def main(args) -> None:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "ANSWER_CACHE_BACKEND": "none",
+    })
+
+    stub = start_process(["benchmarks/fake_openai.py", "--port", str(args.stub_port), "--latency", str(args.latency)])
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+
+        imports, readies, first_answers, health_stalls = [], [], [], []
+        for _ in range(args.runs):
+            imports.append(time_import(env))
+            ready, first_answer, health_stall = await time_ready_and_first_answer(env, args.api_port, args.delay)
+            readies.append(ready)
+            first_answers.append(first_answer)
+            health_stalls.append(health_stall)
+
+        print(f"runs: {args.runs}, upstream latency {args.latency}s, first answer {args.delay}s after ready")
+        report("import", imports)
+        report("ready", readies)
+        report("first answer", first_answers)
+        report("health stall", health_stalls)
+        print("heavy modules loaded at import:", ", ".join(loaded_heavy_modules(env)) or "none")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds between ready and the first answer")
+    asyncio.run(main(parser.parse_args()))
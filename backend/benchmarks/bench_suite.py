@@ -0,0 +1,264 @@
+"""
+Latency and throughput benchmark for /upload_cv and /generate_answer.
+
+Starts the fake OpenAI server (benchmarks/fake_openai.py) and the API as
+subprocesses, uploads a synthetic corpus of PDF and DOCX CVs and answers the
+questions of synthetic application forms at increasing concurrency. Reports
+p50/p95/p99 latency and throughput per endpoint and level, and writes them as
+JSON (benchmarks/results/<commit>.json by default) so runs on different
+commits can be compared.
+
+Run from the backend directory:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --compare benchmarks/results/<baseline>.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import APPLICATION_FORMS, senior_cv, write_cv_corpus  # noqa: E402
+from load_test import BACKEND_DIR, start_process, wait_until_ready  # noqa: E402
+
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+STYLE = {"voice_tone": "confident", "length": "medium", "personality": "balanced"}
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Nearest-rank percentile of values (share in 0-1)."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(share * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(concurrency: int, latencies: List[float], errors: int, elapsed: float) -> dict:
+    completed = len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": completed + errors,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+    }
+
+
+async def run_level(
+    concurrency: int,
+    total: int,
+    send: Callable[[int], Awaitable[httpx.Response]]
+) -> dict:
+    """Send total requests from concurrency workers, each waiting for its previous response."""
+    numbers = iter(range(total))
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for number in numbers:
+            started = time.perf_counter()
+            try:
+                response = await send(number)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(concurrency, latencies, errors, time.perf_counter() - started)
+
+
+def upload_sender(client: httpx.AsyncClient, api_url: str, paths: List[str]):
+    files = [(os.path.basename(path), open(path, "rb").read(), CONTENT_TYPES[os.path.splitext(path)[1]]) for path in paths]
+
+    async def send(number: int) -> httpx.Response:
+        name, content, content_type = files[number % len(files)]
+        return await client.post(f"{api_url}/upload_cv", files={"file": (name, content, content_type)})
+
+    return send
+
+
+def answer_sender(client: httpx.AsyncClient, api_url: str, cv_id: str, level: int):
+    questions = [
+        (form["job_description"], question)
+        for form in APPLICATION_FORMS
+        for question in form["questions"]
+    ]
+    # Fixed order mixing form fields and open questions, so every level sees both
+    random.Random(0).shuffle(questions)
+
+    async def send(number: int) -> httpx.Response:
+        job_description, question = questions[number % len(questions)]
+        # A unique suffix per request keeps identical questions from coalescing
+        return await client.post(f"{api_url}/generate_answer", json={
+            "question": f"{question} (#{level}-{number})",
+            "cv_id": cv_id,
+            "style": STYLE,
+            "job_description": job_description,
+        })
+
+    return send
+
+
+def git_commit() -> str:
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True).strip()
+        dirty = subprocess.run(["git", "diff", "--quiet", "HEAD"], cwd=BACKEND_DIR).returncode != 0
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> List[str]:
+    """Describe p95 and throughput changes beyond tolerance (a share) against a baseline run."""
+    regressions = []
+    print(f"\ncompared with {baseline['meta']['commit']} (tolerance {tolerance:.0%})")
+    for endpoint, levels in current["results"].items():
+        previous = {level["concurrency"]: level for level in baseline["results"].get(endpoint, [])}
+        for level in levels:
+            before = previous.get(level["concurrency"])
+            if not before or not before["p95_ms"] or not level["p95_ms"]:
+                continue
+            p95_change = level["p95_ms"] / before["p95_ms"] - 1
+            rps_change = level["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+            flag = ""
+            if p95_change > tolerance or rps_change < -tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{endpoint} @ {level['concurrency']}")
+            print(
+                f"{endpoint:<16} {level['concurrency']:>4}  p95 {before['p95_ms']:>8} -> {level['p95_ms']:>8} ms "
+                f"({p95_change:+.0%})  req/s {before['throughput_rps']:>7} -> {level['throughput_rps']:>7} "
+                f"({rps_change:+.0%}){flag}"
+            )
+    return regressions
+
+
+def print_table(endpoint: str, levels: List[dict]) -> None:
+    print(f"\n{endpoint}")
+    print(f"{'concurrency':>12} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for level in levels:
+        print(
+            f"{level['concurrency']:>12} {level['requests']:>9} {level['errors']:>7} {level['throughput_rps']:>8} "
+            f"{level['p50_ms']!s:>8} {level['p95_ms']!s:>8} {level['p99_ms']!s:>8}"
+        )
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        # Every request does the full work: no parsed-CV or answer cache hits
+        "CV_CACHE_BACKEND": "none",
+        "ANSWER_CACHE_BACKEND": "none",
+    })
+
+    stub = start_process([
+        "benchmarks/fake_openai.py", "--port", str(args.stub_port), "--latency", str(args.latency),
+        "--tokens-per-second", str(args.tokens_per_second), "--prefill-per-1k", str(args.prefill_per_1k),
+    ])
+    api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+
+    run = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "settings": {
+                "latency": args.latency,
+                "tokens_per_second": args.tokens_per_second,
+                "prefill_per_1k": args.prefill_per_1k,
+                "rounds": args.rounds,
+            },
+        },
+        "results": {},
+    }
+
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+        await wait_until_ready(f"{api_url}/health")
+
+        with tempfile.TemporaryDirectory() as directory:
+            paths = write_cv_corpus(directory)
+            limits = httpx.Limits(max_connections=max(args.levels) + 4)
+            async with httpx.AsyncClient(limits=limits, timeout=300) as client:
+                session = await client.put(f"{api_url}/cv", json=senior_cv(experiences=6))
+                session.raise_for_status()
+                cv_id = session.json()["cv_id"]
+
+                endpoints = {
+                    "upload_cv": lambda level: upload_sender(client, api_url, paths),
+                    "generate_answer": lambda level: answer_sender(client, api_url, cv_id, level),
+                }
+                for endpoint, sender in endpoints.items():
+                    if args.only and endpoint not in args.only:
+                        continue
+                    levels = []
+                    for level in args.levels:
+                        levels.append(await run_level(level, level * args.rounds, sender(level)))
+                    run["results"][endpoint] = levels
+                    print_table(endpoint, levels)
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{run['meta']['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), run, args.tolerance)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake upstream time to first token (seconds)")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Fake upstream decode rate")
+    parser.add_argument("--prefill-per-1k", type=float, default=0.02, help="Fake upstream seconds per 1k prompt tokens")
+    parser.add_argument("--rounds", type=int, default=4, help="Requests per worker at each level")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--only", nargs="+", choices=["upload_cv", "generate_answer"])
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p95/throughput change before flagging")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,238 @@
+"""
+Deterministic synthetic CVs and application questions for benchmarks.
+"""
+import os
+import random
+
+COMPANIES = [
+    "Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises",
+    "Cyberdyne", "Soylent", "Wonka", "Tyrell", "Massive Dynamic", "Aperture", "Vandelay", "Pied Piper"
+]
+ROLES = [
+    "Backend Engineer", "Security Engineer", "Data Engineer", "Engineering Manager",
+    "Frontend Engineer", "Platform Engineer", "ML Engineer", "Site Reliability Engineer"
+]
+DOMAINS = [
+    "payments", "cyber security", "threat detection", "ad tech", "healthcare records", "logistics",
+    "search ranking", "mobile gaming", "fraud prevention", "observability", "identity and access"
+]
+TECH = [
+    "Python", "Go", "Rust", "Kubernetes", "PostgreSQL", "Kafka", "React", "TypeScript", "AWS",
+    "Terraform", "Spark", "Redis", "gRPC", "FastAPI", "TensorFlow", "Elasticsearch"
+]
+VERBS = ["Built", "Led", "Designed", "Scaled", "Migrated", "Automated", "Hardened", "Optimized"]
+
+QUESTIONS = [
+    "Why do you want to work at Globex?",
+    "Tell us about a challenging security project you led.",
+    "Describe your experience with Kubernetes and cloud infrastructure.",
+    "What is your experience with payments systems?",
+    "Tell us about a time you improved system performance.",
+    "How have you mentored other engineers?",
+]
+
+JOB_CONTEXT = (
+    '{"companyName": "Globex", "jobTitle": "Senior Security Engineer", '
+    '"jobDescription": "We are looking for a senior engineer to build threat detection '
+    'pipelines in Python and Go on Kubernetes, working remotely with our security team."}'
+)
+
+# Application forms as the extension sees them: a page context and its detected questions
+APPLICATION_FORMS = [
+    {
+        "name": "security-engineer",
+        "job_description": JOB_CONTEXT,
+        "questions": [
+            "First name", "Last name", "Email", "Phone", "LinkedIn profile", "Country",
+            "Years of experience", "Current company",
+            "Why do you want to work at Globex?",
+            "Tell us about a challenging security project you led.",
+            "Are you willing to relocate?",
+        ],
+    },
+    {
+        "name": "backend-engineer",
+        "job_description": (
+            '{"companyName": "Initech", "jobTitle": "Backend Engineer", '
+            '"jobDescription": "Own payment APIs in Python and PostgreSQL.", '
+            '"companyValues": "Ownership, candour, shipping small and often."}'
+        ),
+        "questions": [
+            "Full name", "Email address", "Website", "Highest level of education",
+            "What is your experience with payments systems?",
+            "Tell us about a time you improved system performance.",
+            "Describe a conflict within your team and how you resolved it.",
+        ],
+    },
+    {
+        "name": "engineering-manager",
+        "job_description": "Engineering Manager at Hooli. Lead a team of eight platform engineers.",
+        "questions": [
+            "Name", "Current job title", "Notice period", "Salary expectations",
+            "How have you mentored other engineers?",
+            "What motivates you as a manager?",
+            "Describe your experience with Kubernetes and cloud infrastructure.",
+        ],
+    },
+]
+
+
+def _achievement(rng: random.Random) -> str:
+    return (
+        f"{rng.choice(VERBS)} {rng.choice(DOMAINS)} service in {rng.choice(TECH)} and "
+        f"{rng.choice(TECH)}, cutting latency by {rng.randint(10, 70)}% for {rng.randint(1, 50)}M users"
+    )
+
+
+def senior_cv(experiences: int = 12, achievements: int = 5, projects: int = 8, seed: int = 7) -> dict:
+    """A long CV as a ParsedCV-shaped dict."""
+    rng = random.Random(seed)
+    year = 2024
+    experience = []
+    for i in range(experiences):
+        start = year - rng.randint(1, 3)
+        experience.append({
+            "company": COMPANIES[i % len(COMPANIES)],
+            "role": f"{'Senior ' if i < experiences // 2 else ''}{rng.choice(ROLES)}",
+            "duration": f"{start} - {year}" if i else f"{start} - Present",
+            "achievements": [_achievement(rng) for _ in range(achievements)],
+        })
+        year = start
+
+    return {
+        "name": "Jane Doe",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "email": "jane.doe@example.com",
+        "phone": "+1 555 0100",
+        "linkedin_url": "https://linkedin.com/in/janedoe",
+        "website": "https://janedoe.dev",
+        "country": "USA",
+        "summary": "Engineering leader with two decades building secure, high-scale backend systems.",
+        "experience": experience,
+        "skills": sorted(set(rng.choice(TECH) for _ in range(30))),
+        "projects": [
+            {
+                "name": f"Project {rng.choice(DOMAINS).title()} {i}",
+                "description": _achievement(rng),
+                "technologies": rng.sample(TECH, 3),
+            }
+            for i in range(projects)
+        ],
+        "education": ["MSc Computer Science, Stanford, 2004", "BSc Mathematics, MIT, 2002"],
+    }
+
+
+def publications(count: int, seed: int = 11) -> list:
+    """Publication list entries of an academic CV, one line each."""
+    rng = random.Random(seed)
+    return [
+        f"Doe, J. et al. ({2024 - i // 4}). Scalable {rng.choice(DOMAINS)} with {rng.choice(TECH)}: "
+        f"a study of {rng.randint(3, 40)} production systems. Journal of Systems {rng.randint(10, 60)}({rng.randint(1, 12)})."
+        for i in range(count)
+    ]
+
+
+def cv_lines(cv: dict) -> list:
+    """Plain-text lines of a ParsedCV-shaped dict, laid out like a CV."""
+    lines = [cv["name"], f"{cv['email']} | {cv['phone']} | {cv['linkedin_url']}", "", "Summary", cv["summary"], ""]
+    lines.append("Experience")
+    for exp in cv["experience"]:
+        lines.append(f"{exp['role']} - {exp['company']} ({exp['duration']})")
+        lines.extend(f"- {achievement}" for achievement in exp["achievements"])
+        lines.append("")
+    lines.append("Projects")
+    for project in cv["projects"]:
+        lines.append(f"{project['name']}: {project['description']}")
+        lines.append(f"Technologies: {', '.join(project['technologies'])}")
+    lines.extend(["", "Skills", ", ".join(cv["skills"]), "", "Education"])
+    lines.extend(cv["education"])
+    return lines
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(lines: list, path: str, lines_per_page: int = 48) -> int:
+    """
+    Write lines as a minimal text-only PDF (Helvetica, one text object per page).
+    Returns the page count.
+    """
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in pages:
+        body = "BT /F1 10 Tf 14 TL 50 790 Td " + " ".join(f"({_pdf_escape(line)}) '" for line in page) + " ET"
+        stream = body.encode("latin-1", "replace")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), len(pages))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    with open(path, "wb") as f:
+        f.write(out)
+    return len(pages)
+
+
+def write_docx(cv: dict, path: str) -> None:
+    """Write a CV as DOCX with contact details in the header and skills in a table."""
+    from docx import Document
+
+    doc = Document()
+    header = doc.sections[0].header.paragraphs[0]
+    header.text = f"{cv['name']} | {cv['email']} | {cv['phone']} | {cv['linkedin_url']}"
+
+    doc.add_heading("Summary", level=1)
+    doc.add_paragraph(cv["summary"])
+    doc.add_heading("Experience", level=1)
+    for exp in cv["experience"]:
+        doc.add_paragraph(f"{exp['role']} - {exp['company']} ({exp['duration']})")
+        for achievement in exp["achievements"]:
+            doc.add_paragraph(achievement, style="List Bullet")
+
+    doc.add_heading("Skills", level=1)
+    table = doc.add_table(rows=0, cols=4)
+    skills = cv["skills"]
+    for i in range(0, len(skills), 4):
+        cells = table.add_row().cells
+        for cell, skill in zip(cells, skills[i:i + 4]):
+            cell.text = skill
+
+    doc.add_heading("Education", level=1)
+    for edu in cv["education"]:
+        doc.add_paragraph(edu)
+    doc.save(path)
+
+
+def write_cv_corpus(directory: str, sizes=(2, 6, 12)) -> list:
+    """
+    Write one PDF and one DOCX CV per size (number of experiences) into
+    directory. Returns the file paths, smallest CVs first.
+    """
+    paths = []
+    for experiences in sizes:
+        cv = senior_cv(experiences=experiences, seed=experiences)
+        pdf_path = os.path.join(directory, f"cv-{experiences}.pdf")
+        write_pdf(cv_lines(cv), pdf_path)
+        docx_path = os.path.join(directory, f"cv-{experiences}.docx")
+        write_docx(cv, docx_path)
+        paths.extend([pdf_path, docx_path])
+    return paths
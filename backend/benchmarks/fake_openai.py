@@ -0,0 +1,324 @@
+"""
+Minimal stand-in for the OpenAI chat completions API.
+
+Every completion sleeps for a configurable latency before answering, which is
+enough to tell a blocked event loop apart from a concurrent one. An optional
+per-prompt-token delay models prefill cost, so larger prompts answer slower,
+and an optional decode rate adds time per completion token.
+Latency can be set per model (--model-latency) to compare model tiers.
+CV parses of text laid out like benchmarks/corpus.py return its entries, so
+output size follows the CV; per-section parses answer for the sections sent.
+Rate limiting can be emulated with an RPM quota (429 once spent) and by
+failing a random share of requests with 429 or 5xx.
+
+Run from the backend directory:
+    python benchmarks/fake_openai.py --port 9100 --latency 0.5 --prefill-per-1k 0.1
+    python benchmarks/fake_openai.py --latency 0.2 --tokens-per-second 80
+    python benchmarks/fake_openai.py --latency 0.8 --model-latency gpt-4o-mini=0.25
+    python benchmarks/fake_openai.py --rpm 60 --error-rate 0.2 --error-status 429
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY = 0.5
+# Per-model time to first token, overriding LATENCY
+MODEL_LATENCY: Dict[str, float] = {}
+PREFILL_PER_1K = 0.0
+TOKENS_PER_SECOND = 0.0
+RPM = 0
+ERROR_RATE = 0.0
+ERROR_STATUS = 429
+
+app = FastAPI(title="Fake OpenAI")
+
+SAMPLE_CV = {
+    "name": "Jane Doe",
+    "first_name": "Jane",
+    "last_name": "Doe",
+    "email": "jane@example.com",
+    "phone": "+1 555 0100",
+    "linkedin_url": "https://linkedin.com/in/janedoe",
+    "website": None,
+    "country": "USA",
+    "summary": "Backend engineer with eight years of experience.",
+    "experience": [
+        {
+            "company": "Acme",
+            "role": "Senior Backend Engineer",
+            "duration": "2019 - Present",
+            "achievements": ["Cut p95 latency by 40%"]
+        }
+    ],
+    "skills": ["Python", "FastAPI", "PostgreSQL"],
+    "projects": [],
+    "education": ["BSc Computer Science, MIT, 2015"]
+}
+
+
+# Headings of the CVs laid out by corpus.cv_lines
+CV_HEADINGS = ("summary", "experience", "projects", "publications", "skills", "education")
+
+
+def _section_entries(heading: str, lines: List[str]) -> dict:
+    """List fields of one CV section, read the way corpus.cv_lines writes them."""
+    entries = {"experience": [], "skills": [], "projects": [], "education": []}
+    heading = heading.strip().lower()
+    for line in filter(None, (line.strip() for line in lines)):
+        if heading == "skills":
+            entries["skills"].extend(skill.strip() for skill in line.split(",") if skill.strip())
+        elif heading == "education":
+            entries["education"].append(line)
+        elif heading in ("projects", "publications"):
+            if line.startswith("Technologies:"):
+                if entries["projects"]:
+                    entries["projects"][-1]["technologies"] = [t.strip() for t in line[13:].split(",")]
+            else:
+                name, _, description = line.partition(": ")
+                entries["projects"].append({"name": name, "description": description, "technologies": []})
+        elif heading == "experience":
+            if line.startswith("- ") and entries["experience"]:
+                entries["experience"][-1]["achievements"].append(line[2:])
+            else:
+                role, _, rest = line.partition(" - ")
+                company, _, duration = rest.partition(" (")
+                entries["experience"].append({
+                    "company": company or role, "role": role, "duration": duration.rstrip(")") or None,
+                    "achievements": []
+                })
+    return entries
+
+
+def _parsed_cv(text: str) -> dict:
+    """SAMPLE_CV's profile with the entries found in the CV text (SAMPLE_CV's when there are none)."""
+    parsed = {**SAMPLE_CV, "experience": [], "skills": [], "projects": [], "education": []}
+    heading, lines = "", []
+    for line in text.splitlines() + ["summary"]:
+        if line.strip().lower() not in CV_HEADINGS:
+            lines.append(line)
+            continue
+        for field, values in _section_entries(heading, lines).items():
+            parsed[field].extend(values)
+        heading, lines = line, []
+    return parsed if parsed["experience"] else SAMPLE_CV
+
+
+def _parsed_sections(text: str) -> dict:
+    """Entries per "### Section <id> (<heading>)" block of a per-section parse prompt."""
+    blocks = re.split(r"^### Section (\S+) \((.*)\)$", text, flags=re.MULTILINE)
+    sections = [
+        {"section_id": section_id, **_section_entries(heading, body.splitlines())}
+        for section_id, heading, body in zip(blocks[1::3], blocks[2::3], blocks[3::3])
+    ]
+    profile = {key: SAMPLE_CV[key] for key in SAMPLE_CV if key not in ("experience", "skills", "projects", "education")}
+    return {"profile": profile, "sections": sections}
+
+
+# Recent prompts, used to emulate the provider's prefix cache
+_recent_prompts: List[str] = []
+
+
+def _prompt_text(body: dict) -> str:
+    return "".join(m.get("content") or "" for m in body.get("messages", []))
+
+
+def _cached_tokens(prompt: str) -> int:
+    """
+    Emulate upstream prefix caching: the longest prefix shared with a recent
+    prompt counts as cached once it reaches 1024 tokens, in 128-token steps.
+    """
+    longest = 0
+    for previous in _recent_prompts:
+        limit = min(len(prompt), len(previous))
+        shared = 0
+        while shared < limit and prompt[shared] == previous[shared]:
+            shared += 1
+        longest = max(longest, shared)
+
+    _recent_prompts.append(prompt)
+    del _recent_prompts[:-64]
+
+    tokens = longest // 4
+    return (tokens // 128) * 128 if tokens >= 1024 else 0
+
+
+def _usage(prompt: str, content: str) -> dict:
+    prompt_tokens = len(prompt) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(content) // 4,
+        "total_tokens": prompt_tokens + len(content) // 4,
+        "prompt_tokens_details": {"cached_tokens": _cached_tokens(prompt)}
+    }
+
+
+def _completion(model: str, content: str, usage: dict) -> dict:
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": usage
+    }
+
+
+def _latency(model: str) -> float:
+    return MODEL_LATENCY.get(model, LATENCY)
+
+
+def _decode_seconds(content: str) -> float:
+    """Time to generate content at TOKENS_PER_SECOND (0 = instant)."""
+    return len(content) // 4 / TOKENS_PER_SECOND if TOKENS_PER_SECOND else 0.0
+
+
+def _stream(model: str, content: str, usage: dict):
+    """Emit the answer word by word, spreading the model's latency and decode time over the stream."""
+    words = content.split(" ")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    per_word = (_latency(model) + _decode_seconds(content)) / len(words)
+
+    async def events():
+        for index, word in enumerate(words):
+            await asyncio.sleep(per_word)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"content": word if index == 0 else f" {word}"},
+                        "finish_reason": None
+                    }
+                ]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        final = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": usage
+        }
+        yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+# RPM quota as a replenishing bucket, the way the provider enforces it
+_quota = {"tokens": 0.0, "updated": 0.0}
+
+# Requests served and rejected, for test scripts (GET /stats)
+stats = {"served": 0, "rate_limited": 0, "injected_errors": 0}
+
+
+def _error(status: int, message: str, retry_after: Optional[float] = None) -> JSONResponse:
+    headers = {"retry-after": f"{retry_after:.3f}"} if retry_after is not None else None
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "server_error"}},
+        headers=headers
+    )
+
+
+def _check_limits() -> Optional[JSONResponse]:
+    now = time.monotonic()
+    if RPM:
+        if not _quota["updated"]:
+            _quota.update(tokens=float(RPM), updated=now)
+        _quota["tokens"] = min(RPM, _quota["tokens"] + (now - _quota["updated"]) * RPM / 60)
+        _quota["updated"] = now
+        if _quota["tokens"] < 1:
+            stats["rate_limited"] += 1
+            return _error(429, "Rate limit reached for requests", retry_after=(1 - _quota["tokens"]) * 60 / RPM)
+        _quota["tokens"] -= 1
+
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        stats["injected_errors"] += 1
+        return _error(ERROR_STATUS, "Injected failure", retry_after=0.2 if ERROR_STATUS == 429 else None)
+
+    return None
+
+
+@app.get("/stats")
+async def get_stats():
+    return stats
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    rejection = _check_limits()
+    if rejection is not None:
+        return rejection
+    stats["served"] += 1
+    prompt = _prompt_text(body)
+    await asyncio.sleep(PREFILL_PER_1K * (len(prompt) // 4) / 1000)
+
+    if body.get("stream"):
+        content = "I am excited about this role because it matches my backend experience."
+        return _stream(body.get("model", "gpt-4o"), content, _usage(prompt, content))
+
+    response_format = body.get("response_format", {})
+    user_text = body.get("messages", [{}])[-1].get("content") or ""
+    if response_format.get("type") == "json_schema":
+        if response_format["json_schema"].get("name") == "parsed_cv_sections":
+            content = json.dumps(_parsed_sections(user_text))
+        else:
+            content = json.dumps(_parsed_cv(user_text))
+    else:
+        content = "I am excited about this role because it matches my backend experience."
+
+    await asyncio.sleep(_latency(body.get("model", "gpt-4o")) + _decode_seconds(content))
+
+    return _completion(body.get("model", "gpt-4o"), content, _usage(prompt, content))
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument(
+        "--model-latency", action="append", default=[], metavar="MODEL=SECONDS",
+        help="Latency for one model, overriding --latency (repeatable)"
+    )
+    parser.add_argument("--prefill-per-1k", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Completion decode rate (0 = instant)")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before answering 429 (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failed on purpose")
+    parser.add_argument("--error-status", type=int, default=429, help="Status code for injected failures")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected failures")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    LATENCY = args.latency
+    for pair in args.model_latency:
+        model, _, seconds = pair.partition("=")
+        MODEL_LATENCY[model] = float(seconds)
+    PREFILL_PER_1K = args.prefill_per_1k
+    TOKENS_PER_SECOND = args.tokens_per_second
+    RPM = args.rpm
+    ERROR_RATE = args.error_rate
+    ERROR_STATUS = args.error_status
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,108 @@
+"""
+Application-form questions labeled with the CV field that answers them
+directly (None = needs the LLM) and the expected question type.
+"""
+
+# (question, field, question_type)
+LABELED_QUESTIONS = [
+    # Identity / contact labels
+    ("First name", "first_name", "general"),
+    ("First Name*", "first_name", "general"),
+    ("What is your first name?", "first_name", "general"),
+    ("Given name", "first_name", "general"),
+    ("Last name", "last_name", "general"),
+    ("Surname", "last_name", "general"),
+    ("Family name (as on passport)", "last_name", "general"),
+    ("Full name", "full_name", "general"),
+    ("Name", "full_name", "general"),
+    ("What is your name?", "full_name", "general"),
+    ("Legal name", "full_name", "general"),
+    ("Email", "email", "general"),
+    ("E-mail address", "email", "general"),
+    ("Email Address*", "email", "general"),
+    ("Phone", "phone", "general"),
+    ("Phone number", "phone", "general"),
+    ("Mobile phone", "phone", "general"),
+    ("Contact number", "phone", "general"),
+    ("Telephone", "phone", "general"),
+    ("LinkedIn Profile", "linkedin", "general"),
+    ("LinkedIn URL", "linkedin", "general"),
+    ("Linked In profile link", "linkedin", "general"),
+    ("Website", "website", "general"),
+    ("Personal website", "website", "general"),
+    ("Portfolio URL", "website", "general"),
+    ("Personal site or blog", "website", "general"),
+    ("Country", "country", "general"),
+    ("Country of residence", "country", "general"),
+    ("Location", "country", "general"),
+    ("Current location", "country", "general"),
+    ("Where are you currently located?", "country", "general"),
+    ("Where are you based?", "country", "general"),
+    ("Country [USA, Canada, UK]", "country", "general"),
+    ("Which country do you live in? Options: Israel, USA, Germany", "country", "general"),
+
+    # Structured fields answered from experience, education and skills
+    ("Years of experience", "years_experience", "general"),
+    ("How many years of professional experience do you have?", "years_experience", "general"),
+    ("Total experience (years)", "years_experience", "general"),
+    ("Current company", "current_company", "general"),
+    ("Current employer", "current_company", "general"),
+    ("Company name", "current_company", "general"),
+    ("Most recent employer", "current_company", "general"),
+    ("Current job title", "current_title", "general"),
+    ("Title", "current_title", "general"),
+    ("Current role", "current_title", "general"),
+    ("Highest degree", "degree", "general"),
+    ("Highest level of education", "degree", "general"),
+    ("Degree", "degree", "general"),
+    ("Education level", "degree", "general"),
+    ("Graduation year", "graduation_year", "general"),
+    ("When did you graduate?", "graduation_year", "general"),
+    ("Skills", "skills", "general"),
+    ("Key skills", "skills", "general"),
+    ("Please list your technical skills", "skills", "general"),
+    ("Desired salary", "salary", "general"),
+    ("Expected compensation (USD)", "salary", "general"),
+    ("Notice period", "notice_period", "general"),
+    ("Earliest start date", "notice_period", "general"),
+
+    # Look like labels, but need the LLM
+    ("Are you willing to work on-site?", None, "general"),
+    ("Are you able to work onsite three days a week?", None, "general"),
+    ("Would you consider relocation?", None, "general"),
+    ("Are you open to relocating to our London location?", None, "general"),
+    ("Do you require visa sponsorship to work in this country?", None, "general"),
+    ("Are you legally authorized to work in the country where this job is located?", None, "general"),
+    ("Is the hybrid schedule at our office location workable for you?", None, "general"),
+    ("Can you commute to our Tel Aviv location?", None, "general"),
+    ("Describe a project where you built a website from scratch.", None, "experience"),
+    ("Tell us about a time you had to work with a difficult stakeholder over email.", None, "experience"),
+    ("Why do you want to join our team? Include your portfolio if relevant.", None, "motivation"),
+    ("How many years of experience do you have with Kubernetes?", None, "experience"),
+    ("Do you have a degree in Computer Science?", None, "general"),
+    ("Do you have a personal website?", None, "general"),
+    ("Are you currently employed?", None, "general"),
+
+    # Open questions
+    ("Why do you want to work at Globex?", None, "motivation"),
+    ("What interests you about this role?", None, "motivation"),
+    ("What motivates you in your work?", None, "motivation"),
+    ("What excites you about our mission?", None, "motivation"),
+    ("Tell us about a project you are proud of.", None, "experience"),
+    ("Describe your experience with Kubernetes.", None, "experience"),
+    ("What have you worked on recently?", None, "experience"),
+    ("Which programming languages are you proficient in?", None, "skills"),
+    ("What skills would you bring to the team?", None, "skills"),
+    ("How familiar with React are you?", None, "skills"),
+    ("Rate your knowledge of SQL.", None, "skills"),
+    ("How do you handle conflict in a team?", None, "behavioral"),
+    ("What was the most difficult bug you fixed?", None, "behavioral"),
+    ("How do you approach a problem you have never seen before?", None, "behavioral"),
+    ("What is your greatest challenge as a manager?", None, "behavioral"),
+    ("How did you hear about us?", None, "general"),
+    ("What are your salary expectations?", "salary", "general"),
+    ("What is your current salary?", None, "general"),
+    ("Current compensation", None, "general"),
+    ("When can you start?", "notice_period", "general"),
+    ("Anything else you would like us to know?", None, "general"),
+]
@@ -0,0 +1,145 @@
+"""
+Load test for /generate_answer against the local fake OpenAI server.
+
+Starts the stub (benchmarks/fake_openai.py) and the API as subprocesses, then
+fires batches of requests at increasing concurrency. With non-blocking
+upstream calls, throughput should grow with concurrency while /health stays
+fast; a blocked event loop shows flat throughput instead.
+
+Run from the backend directory:
+    python benchmarks/load_test.py
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REQUEST_BODY = {
+    "question": "Why do you want to work here?",
+    "cv_data": {
+        "name": "Jane Doe",
+        "email": "jane@example.com",
+        "summary": "Backend engineer with eight years of experience.",
+        "experience": [
+            {
+                "company": "Acme",
+                "role": "Senior Backend Engineer",
+                "duration": "2019 - Present",
+                "achievements": ["Cut p95 latency by 40%"]
+            }
+        ],
+        "skills": ["Python", "FastAPI"],
+        "projects": [],
+        "education": []
+    },
+    "style": {"voice_tone": "confident", "length": "medium", "personality": "balanced"},
+    "job_description": "{\"companyName\": \"Globex\", \"jobTitle\": \"Backend Engineer\"}"
+}
+
+
+def start_process(args, env=None):
+    return subprocess.Popen(
+        [sys.executable] + args,
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_ready(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+async def run_level(client: httpx.AsyncClient, api_url: str, concurrency: int, rounds: int) -> dict:
+    total = concurrency * rounds
+    health_latencies = []
+
+    async def one_request(number: int):
+        # Distinct questions, so requests are neither cached nor coalesced
+        body = {**REQUEST_BODY, "question": f"{REQUEST_BODY['question']} ({concurrency}-{number})"}
+        response = await client.post(f"{api_url}/generate_answer", json=body)
+        response.raise_for_status()
+
+    async def probe_health(stop: asyncio.Event):
+        while not stop.is_set():
+            started = time.perf_counter()
+            await client.get(f"{api_url}/health")
+            health_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.05)
+
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe_health(stop))
+
+    started = time.perf_counter()
+    for round_number in range(rounds):
+        await asyncio.gather(*(one_request(round_number * concurrency + i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await prober
+
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2),
+        "health_max_ms": round(max(health_latencies, default=0) * 1000, 1),
+    }
+
+
+async def main(args) -> None:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    env = dict(os.environ)
+    env["OPENAI_API_KEY"] = "stub-key"
+    env["OPENAI_BASE_URL"] = f"{stub_url}/v1"
+    env["ANSWER_CACHE_BACKEND"] = "none"
+
+    stub = start_process(["benchmarks/fake_openai.py", "--port", str(args.stub_port), "--latency", str(args.latency)])
+    api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+        await wait_until_ready(f"{api_url}/health")
+
+        limits = httpx.Limits(max_connections=max(args.levels) + 4)
+        async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+            print(f"upstream latency: {args.latency}s")
+            print(f"{'concurrency':>12} {'requests':>9} {'seconds':>8} {'req/s':>8} {'health max ms':>14}")
+            for level in args.levels:
+                result = await run_level(client, api_url, level, args.rounds)
+                print(
+                    f"{result['concurrency']:>12} {result['requests']:>9} {result['seconds']:>8} "
+                    f"{result['throughput_rps']:>8} {result['health_max_ms']:>14}"
+                )
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,139 @@
+"""
+Check that workers share parsed-CV, answer, session and job-context state.
+
+Starts the fake OpenAI server and the API in its production run mode
+(`python main.py`) with several workers and STATE_BACKEND=sqlite, then repeats
+the same upload, answer, session and job-context requests over fresh
+connections so they land on different workers. Passes when:
+- every request succeeds;
+- the fake server saw one CV parse and one answer completion in total;
+- more than one worker reports cache hits.
+
+Run from the backend directory:
+    python benchmarks/multi_worker_check.py --workers 2
+    python benchmarks/multi_worker_check.py --backend memory   # expected to fail
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import JOB_CONTEXT, cv_lines, senior_cv, write_pdf  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+STYLE = {"voice_tone": "confident", "length": "medium", "personality": "balanced"}
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """One request on its own connection, so the kernel may hand it to any worker."""
+    async with httpx.AsyncClient(timeout=60) as client:
+        return await client.request(method, url, **kwargs)
+
+
+async def worker_stats(api_url: str, workers: int, attempts: int = 200) -> dict:
+    """Latest /cache/stats of each worker, polling until every worker answered once."""
+    seen = {}
+    for _ in range(attempts):
+        stats = (await request("GET", f"{api_url}/cache/stats")).json()
+        seen[stats["worker"]] = stats
+        if len(seen) == workers:
+            break
+    return seen
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env.update({
+            "OPENAI_API_KEY": "stub-key",
+            "OPENAI_BASE_URL": f"{stub_url}/v1",
+            "PORT": str(args.api_port),
+            "HOST": "127.0.0.1",
+            "WEB_CONCURRENCY": str(args.workers),
+            "STATE_BACKEND": args.backend,
+            "STATE_PATH": os.path.join(directory, "state.sqlite3"),
+        })
+
+        pdf_path = os.path.join(directory, "cv.pdf")
+        cv = senior_cv(experiences=4)
+        write_pdf(cv_lines(cv), pdf_path)
+        with open(pdf_path, "rb") as f:
+            pdf = f.read()
+
+        stub = start_process(["benchmarks/fake_openai.py", "--port", str(args.stub_port), "--latency", "0.05"])
+        api = start_process(["main.py"], env=env)
+        statuses: Counter = Counter()
+
+        try:
+            await wait_until_ready(f"{stub_url}/docs")
+            await wait_until_ready(f"{api_url}/health", timeout=60)
+            # Let every worker finish starting before spreading requests
+            await asyncio.sleep(2)
+
+            session = await request("PUT", f"{api_url}/cv", json=cv)
+            cv_id = session.json()["cv_id"]
+            job = await request("POST", f"{api_url}/job_context", json={"job_description": JOB_CONTEXT})
+            job_id = job.json()["job_id"]
+
+            for _ in range(args.repeats):
+                upload = await request("POST", f"{api_url}/upload_cv", files={"file": ("cv.pdf", pdf, "application/pdf")})
+                statuses[f"upload_cv {upload.status_code}"] += 1
+                answer = await request("POST", f"{api_url}/generate_answer", json={
+                    "question": "Why do you want to join our security team?",
+                    "cv_id": cv_id,
+                    "job_id": job_id,
+                    "style": STYLE,
+                })
+                statuses[f"generate_answer {answer.status_code}"] += 1
+                stored = await request("GET", f"{api_url}/cv/{cv_id}")
+                statuses[f"get_cv {stored.status_code}"] += 1
+
+            stats = await worker_stats(api_url, args.workers)
+            upstream = (await request("GET", f"{stub_url}/stats")).json()
+        finally:
+            api.terminate()
+            stub.terminate()
+            api.wait()
+            stub.wait()
+
+    print("responses:", dict(sorted(statuses.items())))
+    print("upstream completions:", upstream["served"])
+    for pid, worker in sorted(stats.items()):
+        print(
+            f"worker {pid}: cv hits {worker['cv']['hits']} misses {worker['cv']['misses']} | "
+            f"answer hits {worker['answers']['hits']} misses {worker['answers']['misses']} | "
+            f"session hits {worker['cv_sessions']['hits']} | job context hits {worker['job_contexts']['hits']}"
+        )
+
+    hit_workers = sum(1 for worker in stats.values() if worker["cv"]["hits"] or worker["answers"]["hits"])
+    failures = []
+    if any(not key.endswith(" 200") for key in statuses):
+        failures.append("some requests failed")
+    if upstream["served"] != 2:
+        failures.append(f"expected 2 upstream completions (one parse, one answer), got {upstream['served']}")
+    if len(stats) < 2:
+        failures.append("only one worker answered; use more --repeats")
+    elif hit_workers < 2:
+        failures.append("cache hits were served by a single worker")
+
+    print("FAIL: " + "; ".join(failures) if failures else f"PASS: {hit_workers} workers served shared cache hits")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--backend", default="sqlite", help="STATE_BACKEND; memory shows the failure this guards against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
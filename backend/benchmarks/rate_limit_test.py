@@ -0,0 +1,122 @@
+"""
+Burst test for the upstream scheduler against a rate-limited fake OpenAI.
+
+Starts the stub with an RPM quota and randomly injected 429s, and the API with
+a matching OPENAI_RPM, then sends several "generate all" batches together with
+a trickle of interactive single answers. Reports response statuses, how many
+upstream 429s the retries absorbed, and the latency of interactive requests
+(which should stay ahead of the batches) next to the batches'.
+
+Run from the backend directory:
+    python benchmarks/rate_limit_test.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import senior_cv  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+STYLE = {"voice_tone": "confident", "length": "medium", "personality": "balanced"}
+
+
+async def main(args) -> None:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"{stub_url}/v1",
+        "ANSWER_CACHE_BACKEND": "none",
+        "OPENAI_RPM": str(args.api_rpm),
+        "OPENAI_MAX_CONCURRENCY": str(args.concurrency),
+        "OPENAI_MAX_QUEUE": str(args.max_queue),
+        "OPENAI_MAX_RETRIES": str(args.max_retries),
+    })
+
+    stub = start_process([
+        "benchmarks/fake_openai.py", "--port", str(args.stub_port), "--latency", str(args.latency),
+        "--rpm", str(args.stub_rpm), "--error-rate", str(args.error_rate),
+    ])
+    api = start_process(["-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"], env=env)
+
+    cv = senior_cv(experiences=3)
+    statuses: Counter = Counter()
+    item_errors = 0
+    latencies = {"interactive": [], "batch": []}
+
+    async def batch(client: httpx.AsyncClient, number: int) -> None:
+        nonlocal item_errors
+        questions = [f"Why are you a good fit for team {number}-{i}?" for i in range(args.batch_size)]
+        started = time.perf_counter()
+        response = await client.post(f"{api_url}/generate_answers", json={"questions": questions, "cv_data": cv, "style": STYLE})
+        statuses[f"batch {response.status_code}"] += 1
+        if response.status_code == 200:
+            latencies["batch"].append(time.perf_counter() - started)
+            item_errors += sum(1 for item in response.json()["answers"] if item["error"])
+
+    async def interactive(client: httpx.AsyncClient, number: int) -> None:
+        await asyncio.sleep(number * args.interactive_interval)
+        started = time.perf_counter()
+        response = await client.post(
+            f"{api_url}/generate_answer",
+            json={"question": f"What motivates you, take {number}?", "cv_data": cv, "style": STYLE}
+        )
+        statuses[f"interactive {response.status_code}"] += 1
+        if response.status_code == 200:
+            latencies["interactive"].append(time.perf_counter() - started)
+
+    try:
+        await wait_until_ready(f"{stub_url}/docs")
+        await wait_until_ready(f"{api_url}/health")
+
+        async with httpx.AsyncClient(timeout=300, limits=httpx.Limits(max_connections=200)) as client:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(batch(client, n) for n in range(args.batches)),
+                *(interactive(client, n) for n in range(args.interactive)),
+            )
+            elapsed = time.perf_counter() - started
+
+            upstream = (await client.get(f"{stub_url}/stats")).json()
+            scheduler = (await client.get(f"{api_url}/cache/stats")).json()["scheduler"]
+
+        print(f"elapsed {elapsed:.1f}s")
+        print("responses:", dict(sorted(statuses.items())), f"| failed batch items: {item_errors}")
+        print("upstream:", upstream)
+        print("scheduler:", scheduler)
+        for lane, values in latencies.items():
+            if values:
+                print(f"{lane:<12} p50 {statistics.median(values):6.2f}s  max {max(values):6.2f}s  n={len(values)}")
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--stub-rpm", type=int, default=300, help="Quota enforced by the fake server")
+    parser.add_argument("--api-rpm", type=int, default=280, help="OPENAI_RPM given to the API (0 = no limiter)")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Share of upstream calls failed with 429")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--max-retries", type=int, default=3, help="OPENAI_MAX_RETRIES (0 shows behaviour without retries)")
+    parser.add_argument("--batches", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--interactive", type=int, default=10)
+    parser.add_argument("--interactive-interval", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
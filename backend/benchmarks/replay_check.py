@@ -0,0 +1,145 @@
+"""
+Record a workload against the fake upstream, then replay it offline.
+
+1. Starts the fake OpenAI server and the API with OPENAI_REPLAY_MODE=record,
+   and runs a workload: a CV upload, answers to the questions of the
+   synthetic application forms, a streamed answer and a batch.
+2. Stops the fake server and runs the same workload twice more with
+   OPENAI_REPLAY_MODE=replay, no API key and an unreachable base URL: once at
+   the recorded latency and once with OPENAI_REPLAY_LATENCY_SCALE=0.
+
+It passes when every replayed response matches the recorded run and nothing
+was missing from the recordings. Wall time per run shows what replay at
+scaled latency buys for profiling loops.
+
+Run from the backend directory:
+    python benchmarks/replay_check.py
+    python benchmarks/replay_check.py --latency 0.3 --keep recordings.sqlite3
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_suite import STYLE  # noqa: E402
+from corpus import APPLICATION_FORMS, cv_lines, senior_cv, write_pdf  # noqa: E402
+from load_test import start_process, wait_until_ready  # noqa: E402
+
+
+async def workload(api_url: str, pdf: bytes) -> Tuple[List[str], dict]:
+    """Responses of the workload, as comparable strings, and the replay stats."""
+    responses = []
+    async with httpx.AsyncClient(timeout=120) as client:
+        upload = await client.post(f"{api_url}/upload_cv", files={"file": ("cv.pdf", pdf, "application/pdf")})
+        upload.raise_for_status()
+        responses.append(upload.text)
+        cv_id = upload.headers["X-CV-Id"]
+
+        for form in APPLICATION_FORMS:
+            for question in form["questions"]:
+                answer = await client.post(f"{api_url}/generate_answer", json={
+                    "question": question, "cv_id": cv_id, "style": STYLE,
+                    "job_description": form["job_description"],
+                })
+                answer.raise_for_status()
+                responses.append(answer.text)
+
+        form = APPLICATION_FORMS[0]
+        async with client.stream("POST", f"{api_url}/generate_answer/stream", json={
+            "question": form["questions"][-2], "cv_id": cv_id, "style": STYLE,
+            "job_description": form["job_description"], "regenerate": True,
+        }) as stream:
+            events = [line async for line in stream.aiter_lines() if line.startswith("data: ")]
+        responses.append(events[-1][len("data: "):])
+
+        batch = await client.post(f"{api_url}/generate_answers", json={
+            "questions": form["questions"], "cv_id": cv_id, "style": STYLE,
+            "job_description": form["job_description"], "regenerate": True,
+        })
+        batch.raise_for_status()
+        responses.append(batch.text)
+
+        stats = (await client.get(f"{api_url}/cache/stats")).json()["replay"]
+    return responses, stats
+
+
+async def run_api(api_url: str, port: int, env_overrides: dict, pdf: bytes) -> Tuple[List[str], dict, float]:
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.update(env_overrides)
+    api = start_process(["-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"], env=env)
+    try:
+        await wait_until_ready(f"{api_url}/health")
+        started = time.perf_counter()
+        responses, stats = await workload(api_url, pdf)
+        return responses, stats, time.perf_counter() - started
+    finally:
+        api.terminate()
+        api.wait()
+
+
+async def main(args) -> int:
+    stub_url = f"http://127.0.0.1:{args.stub_port}"
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    with tempfile.TemporaryDirectory() as directory:
+        recordings = os.path.join(directory, "recordings.sqlite3")
+        pdf_path = os.path.join(directory, "cv.pdf")
+        write_pdf(cv_lines(senior_cv(experiences=6)), pdf_path)
+        with open(pdf_path, "rb") as f:
+            pdf = f.read()
+
+        # Fresh caches per run, so every run makes the same upstream calls
+        common = {"STATE_BACKEND": "memory", "OPENAI_REPLAY_PATH": recordings}
+
+        stub = start_process([
+            "benchmarks/fake_openai.py", "--port", str(args.stub_port),
+            "--latency", str(args.latency), "--tokens-per-second", str(args.tokens_per_second),
+        ])
+        try:
+            await wait_until_ready(f"{stub_url}/docs")
+            recorded, record_stats, record_seconds = await run_api(api_url, args.api_port, {
+                **common, "OPENAI_REPLAY_MODE": "record",
+                "OPENAI_API_KEY": "stub-key", "OPENAI_BASE_URL": f"{stub_url}/v1",
+            }, pdf)
+        finally:
+            stub.terminate()
+            stub.wait()
+        print(f"record    {record_seconds:>7.2f} s  {record_stats}")
+
+        failures = 0
+        for name, scale in (("replay x1", "1"), ("replay x0", "0")):
+            replayed, stats, seconds = await run_api(api_url, args.api_port, {
+                **common, "OPENAI_REPLAY_MODE": "replay", "OPENAI_REPLAY_LATENCY_SCALE": scale,
+                # Nothing listens here: a live call would fail the run
+                "OPENAI_BASE_URL": "http://127.0.0.1:9/v1",
+            }, pdf)
+            mismatches = [index for index, (a, b) in enumerate(zip(recorded, replayed)) if json.loads(a) != json.loads(b)]
+            failures += len(mismatches) + stats["misses"] + (len(recorded) != len(replayed))
+            print(f"{name} {seconds:>7.2f} s  {stats}  mismatched responses: {mismatches or 'none'}")
+
+        if args.keep:
+            shutil.copy(recordings, args.keep)
+            print(f"recordings kept in {args.keep}")
+
+    print("PASS" if not failures else "FAIL")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake time to first token while recording")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Fake decode rate while recording")
+    parser.add_argument("--keep", help="Copy the recordings to this path")
+    sys.exit(asyncio.run(main(parser.parse_args())))
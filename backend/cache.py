@@ -0,0 +1,174 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Defaults for every store built by create_cache, so one setting moves all
+# shared state (parsed CVs, answers, CV sessions, job contexts) to one file
+STATE_BACKEND = os.getenv('STATE_BACKEND', 'memory')
+STATE_PATH = os.getenv('STATE_PATH', 'cache.sqlite3')
+
+# Seconds a writer waits for another process holding the SQLite write lock
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '10'))
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with a per-entry time-to-live.
+    Values are stored as strings so every backend behaves the same.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self),
+            "max_entries": self.max_entries,
+        }
+
+
+class SQLiteCache(MemoryCache):
+    """
+    On-disk cache backed by a single SQLite table.
+    Survives restarts; entries expire by TTL and the least recently used
+    ones are evicted once max_entries is exceeded. Several processes (e.g.
+    uvicorn workers) can share one file: it is opened in WAL mode and writers
+    wait for each other instead of failing with "database is locked".
+
+    Lookups only read, on a connection of their own, so they never wait for
+    a writer; the recency they record is written with the next set(). set()
+    and delete() can wait up to SQLITE_BUSY_TIMEOUT for another worker's
+    write, so async callers run them in a worker thread.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path: str, table: str = "cache", max_entries: int = 1024, ttl: Optional[float] = None):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = path
+        self.table = table
+        self._conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._reader = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, check_same_thread=False)
+        self._read_lock = threading.Lock()
+        # key -> time of its last hit, not yet written to last_used
+        self._touched: Dict[str, float] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._read_lock:
+            row = self._reader.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            # Expired rows are left for the next set() to delete
+            if row is not None and (row[1] is None or row[1] > now):
+                if key in self._touched or len(self._touched) < self.max_entries:
+                    self._touched[key] = now
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            with self._read_lock:
+                touched, self._touched = self._touched, {}
+            self._conn.executemany(
+                f"UPDATE {self.table} SET last_used = max(last_used, ?) WHERE key = ?",
+                [(used, touched_key) for touched_key, used in touched.items()]
+            )
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now)
+            )
+            self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._read_lock:
+            return self._reader.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+def create_cache(name: str, default_max_entries: int = 256, default_ttl: Optional[float] = None):
+    """
+    Build a cache from environment settings prefixed with `name`, e.g. for "CV_CACHE":
+    CV_CACHE_BACKEND (memory | sqlite | none), CV_CACHE_MAX_ENTRIES,
+    CV_CACHE_TTL (seconds, 0 disables expiry) and CV_CACHE_PATH (sqlite file).
+    Backend and path default to STATE_BACKEND and STATE_PATH.
+    Returns None when caching is disabled.
+    """
+    backend = os.getenv(f"{name}_BACKEND", STATE_BACKEND).lower()
+    max_entries = int(os.getenv(f"{name}_MAX_ENTRIES", str(default_max_entries)))
+    ttl = float(os.getenv(f"{name}_TTL", str(default_ttl or 0))) or None
+
+    if backend == "none":
+        return None
+    if backend == "sqlite":
+        path = os.getenv(f"{name}_PATH", STATE_PATH)
+        logger.info("Using sqlite cache | name=%s | path=%s", name, path)
+        return SQLiteCache(path=path, table=name.lower(), max_entries=max_entries, ttl=ttl)
+    if backend != "memory":
+        raise ValueError(f"Unknown cache backend for {name}: {backend}")
+
+    return MemoryCache(max_entries=max_entries, ttl=ttl)
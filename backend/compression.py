@@ -0,0 +1,209 @@
+"""
+HTTP compression of API payloads.
+
+Responses are compressed with brotli (when the optional `brotli` package is
+installed) or gzip, whichever the client prefers in Accept-Encoding. Request
+bodies sent with Content-Encoding gzip, deflate or br are decompressed before
+the app reads them, so the extension can send CVs and job descriptions
+compressed. Event streams are never compressed, so tokens are not held back.
+"""
+import json
+import os
+import zlib
+from typing import Callable, Dict, Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers, MutableHeaders
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only
+    brotli = None
+
+# Smallest response body worth compressing (bytes)
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '500'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+# 0-11; mid qualities compress JSON close to gzip -9 at a fraction of the time
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '5'))
+# Largest decompressed request body (bytes), against decompression bombs; 0 disables the limit
+COMPRESSION_MAX_REQUEST_BYTES = int(os.getenv('COMPRESSION_MAX_REQUEST_BYTES', str(20 * 1024 * 1024)))
+
+# Content types sent as is: streamed events, and formats that are compressed already
+UNCOMPRESSED_TYPES = ("text/event-stream", "image/", "audio/", "video/", "application/zip", "application/gzip")
+
+
+class _GzipEncoder:
+    def __init__(self):
+        self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        # Sync-flush streamed chunks so each one reaches the client when sent
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        return self._compressor.process(data) + (self._compressor.finish() if final else self._compressor.flush())
+
+
+ENCODERS: Dict[str, Callable] = {"gzip": _GzipEncoder}
+DECODERS: Dict[str, Callable] = {
+    "gzip": lambda: zlib.decompressobj(16 + zlib.MAX_WBITS).decompress,
+    "deflate": lambda: zlib.decompressobj().decompress,
+}
+if brotli is not None:
+    ENCODERS["br"] = _BrotliEncoder
+    DECODERS["br"] = lambda: brotli.Decompressor().process
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The supported encoding the client ranks highest (brotli on ties), or None."""
+    ranks = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                continue
+        ranks[name.strip()] = quality
+
+    candidates = [
+        (ranks.get(name, ranks.get("*", 0.0)), name == "br", name)
+        for name in ENCODERS
+    ]
+    quality, _, name = max(candidates)
+    return name if quality > 0 else None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware decompressing request bodies and compressing responses.
+    Streamed responses are compressed chunk by chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = headers.get("content-encoding", "identity").strip().lower()
+        if content_encoding != "identity":
+            if content_encoding not in DECODERS:
+                await self._reject(send, 415, f"Unsupported Content-Encoding: {content_encoding}")
+                return
+            # Edited in place: the router writes scope["route"] into this dict,
+            # and MetricsMiddleware reads it from the same one
+            scope["headers"] = [
+                (key, value) for key, value in scope["headers"]
+                if key not in (b"content-encoding", b"content-length")
+            ]
+            receive = self._decompressing(receive, content_encoding)
+
+        encoding = negotiate(headers.get("accept-encoding", ""))
+        if encoding is not None:
+            send = _CompressingSend(send, encoding)
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _decompressing(receive, encoding: str):
+        decode = DECODERS[encoding]()
+        received = {"encoded": 0, "decoded": 0}
+
+        async def receive_decompressed():
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            try:
+                decoded = decode(body)
+            except Exception:
+                raise HTTPException(status_code=400, detail="Invalid compressed request body")
+            received["encoded"] += len(body)
+            received["decoded"] += len(decoded)
+            if COMPRESSION_MAX_REQUEST_BYTES and received["decoded"] > COMPRESSION_MAX_REQUEST_BYTES:
+                raise HTTPException(status_code=413, detail="Decompressed request body is too large")
+            if not message.get("more_body", False):
+                metrics.COMPRESSION_BYTES.inc(received["encoded"], direction="request", encoding=encoding, kind="encoded")
+                metrics.COMPRESSION_BYTES.inc(received["decoded"], direction="request", encoding=encoding, kind="original")
+            return {**message, "body": decoded}
+
+        return receive_decompressed
+
+    @staticmethod
+    async def _reject(send, status: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class _CompressingSend:
+    """
+    Wraps send: holds the response start until the first body chunk shows
+    whether the response is worth compressing, then encodes every chunk.
+    """
+
+    def __init__(self, send, encoding: str):
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[dict] = None
+        self.encoder = None
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not self._compressible(start, body, more_body):
+                await self.send(start)
+                await self.send(message)
+                return
+            self.encoder = ENCODERS[self.encoding]()
+            encoded = self.encoder.encode(body, final=not more_body)
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(encoded))
+            await self.send(start)
+        elif self.encoder is None:
+            await self.send(message)
+            return
+        else:
+            encoded = self.encoder.encode(body, final=not more_body)
+
+        metrics.COMPRESSION_BYTES.inc(len(body), direction="response", encoding=self.encoding, kind="original")
+        metrics.COMPRESSION_BYTES.inc(len(encoded), direction="response", encoding=self.encoding, kind="encoded")
+        await self.send({"type": "http.response.body", "body": encoded, "more_body": more_body})
+
+    @staticmethod
+    def _compressible(start: dict, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=start["headers"])
+        if start["status"] < 200 or start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        if headers.get("content-type", "").startswith(UNCOMPRESSED_TYPES):
+            return False
+        return more_body or len(body) >= COMPRESSION_MIN_BYTES
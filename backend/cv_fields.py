@@ -0,0 +1,236 @@
+"""
+Deterministic answers for short form fields, read straight from a ParsedCV.
+
+Each extractor returns None when the CV does not answer the field with
+confidence, in which case the question goes to the LLM.
+"""
+import os
+import re
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+
+from models import Experience, ParsedCV
+from question_router import extract_options
+
+# Canned answers for fields a CV never contains; empty sends them to the LLM
+SALARY_EXPECTATION_ANSWER = os.getenv('SALARY_EXPECTATION_ANSWER', 'Open to discussion')
+NOTICE_PERIOD_ANSWER = os.getenv('NOTICE_PERIOD_ANSWER', 'Flexible, happy to discuss a start date')
+
+# Skills listed in a one-line skills field
+MAX_SKILLS_ANSWER = 20
+
+MONTHS = {
+    name: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+    )
+}
+
+_DATE_RE = re.compile(
+    r"(?P<present>present|current|now|today|ongoing)"
+    r"|(?:(?P<month_name>jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?,?\s*)?"
+    r"(?:(?P<month_num>\d{1,2})[/.-])?(?P<year>(?:19|20)\d{2})\b"
+)
+_LENGTH_RE = re.compile(
+    r"^\s*(?:(?P<years>\d+(?:\.\d+)?)\s*(?:years?|yrs?))?\s*,?\s*(?:(?P<months>\d+)\s*(?:months?|mos?))?\s*$"
+)
+_CURRENT_RE = re.compile(r"\b(?:present|current|now|today|ongoing)\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_INCOMPLETE_RE = re.compile(r"\b(?:candidate|in\s+progress|pursuing|expected|ongoing|current(?:ly)?)\b", re.IGNORECASE)
+
+# Highest first; matched against each education entry
+DEGREE_LEVELS: List[Tuple[str, "re.Pattern"]] = [
+    ("doctorate", re.compile(r"\b(?:ph\.?\s?d|doctor(?:ate)?|d\.?phil|md|jd)\b", re.IGNORECASE)),
+    ("master", re.compile(r"\b(?:master'?s?|m\.?sc|m\.?s|m\.?a|mba|m\.?eng|meng|m\.?phil)\b", re.IGNORECASE)),
+    ("bachelor", re.compile(r"\b(?:bachelor'?s?|b\.?sc|b\.?s|b\.?a|b\.?eng|beng|b\.?tech|ba)\b", re.IGNORECASE)),
+    ("associate", re.compile(r"\b(?:associate'?s?|a\.?a|a\.?s)\s+(?:degree|of)\b", re.IGNORECASE)),
+]
+
+
+def derive_name_parts(cv_data: ParsedCV) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Get first and last name from the parsed CV without inventing new values.
+    """
+    if getattr(cv_data, "first_name", None) or getattr(cv_data, "last_name", None):
+        return cv_data.first_name, cv_data.last_name
+
+    if cv_data.name:
+        parts = cv_data.name.strip().split()
+        if parts:
+            first = parts[0]
+            last = parts[-1] if len(parts) > 1 else None
+            return first, last
+
+    return None, None
+
+
+def parse_duration(duration: Optional[str], today: Optional[date] = None) -> Optional[Tuple[int, int]]:
+    """
+    Parse an experience duration into a (start, end) range of month indexes
+    (year * 12 + month - 1), end exclusive. Understands "2019 - Present",
+    "Jan 2018 – Mar 2020", "03/2018 - 2020" and the like. Returns None when
+    the text has no start and end.
+    """
+    if not duration:
+        return None
+    today = today or date.today()
+
+    points = []
+    for match in _DATE_RE.finditer(duration.lower()):
+        if match.group("present"):
+            points.append((today.year * 12 + today.month - 1, True))
+            continue
+        year = int(match.group("year"))
+        if match.group("month_name"):
+            month = MONTHS[match.group("month_name")]
+        elif match.group("month_num") and 1 <= int(match.group("month_num")) <= 12:
+            month = int(match.group("month_num"))
+        else:
+            month = None
+        points.append((year * 12 + (month or 1) - 1, month is not None))
+
+    if len(points) != 2:
+        return None
+    (start, _), (end, end_has_month) = points
+    # "Jan 2018 - Mar 2020" includes March
+    end += 1 if end_has_month else 0
+    return (start, end) if end > start else None
+
+
+def parse_length_months(duration: Optional[str]) -> Optional[int]:
+    """Parse a bare length such as "3 years", "2 yrs 6 months" or "18 months"."""
+    if not duration:
+        return None
+    match = _LENGTH_RE.match(duration.lower())
+    if not match or not (match.group("years") or match.group("months")):
+        return None
+    return round(float(match.group("years") or 0) * 12) + int(match.group("months") or 0)
+
+
+def total_experience_months(experience: List[Experience], today: Optional[date] = None) -> Optional[int]:
+    """
+    Months of experience across all roles, counting overlapping roles once.
+    None unless every role's duration parses.
+    """
+    if not experience:
+        return None
+
+    ranges = []
+    extra = 0
+    for exp in experience:
+        parsed = parse_duration(exp.duration, today)
+        if parsed is not None:
+            ranges.append(parsed)
+            continue
+        length = parse_length_months(exp.duration)
+        if length is None:
+            return None
+        extra += length
+
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(ranges):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+
+    return total + extra
+
+
+def current_role(cv_data: ParsedCV) -> Optional[Experience]:
+    """The ongoing role if one is marked as such, else the first (most recent) listed."""
+    if not cv_data.experience:
+        return None
+    return next(
+        (exp for exp in cv_data.experience if exp.duration and _CURRENT_RE.search(exp.duration)),
+        cv_data.experience[0]
+    )
+
+
+def highest_education(cv_data: ParsedCV) -> Optional[Tuple[str, str]]:
+    """(degree text, full entry) for the highest recognizable completed degree."""
+    completed = [entry for entry in cv_data.education if not _INCOMPLETE_RE.search(entry)]
+    for _, pattern in DEGREE_LEVELS:
+        for entry in completed:
+            if pattern.search(entry):
+                return entry.split(",")[0].strip(), entry
+    return None
+
+
+def _answer_country(question: str, cv_data: ParsedCV) -> Optional[str]:
+    if not cv_data.country:
+        return None
+    options = extract_options(question)
+    if not options:
+        return cv_data.country
+    country = cv_data.country.lower()
+    match = next((opt for opt in options if opt.lower() == country), None)
+    if not match:
+        match = next((opt for opt in options if country in opt.lower() or opt.lower() in country), None)
+    return match
+
+
+def _answer_years(question: str, cv_data: ParsedCV) -> Optional[str]:
+    months = total_experience_months(cv_data.experience)
+    if not months:
+        return None
+    years = round(months / 12)
+    return str(years) if years else "Less than 1"
+
+
+def _answer_company(question: str, cv_data: ParsedCV) -> Optional[str]:
+    role = current_role(cv_data)
+    return role.company if role else None
+
+
+def _answer_title(question: str, cv_data: ParsedCV) -> Optional[str]:
+    role = current_role(cv_data)
+    return role.role if role else None
+
+
+def _answer_degree(question: str, cv_data: ParsedCV) -> Optional[str]:
+    education = highest_education(cv_data)
+    return education[0] if education else None
+
+
+def _answer_graduation_year(question: str, cv_data: ParsedCV) -> Optional[str]:
+    education = highest_education(cv_data)
+    if not education:
+        return None
+    years = _YEAR_RE.findall(education[1])
+    return max(years) if years else None
+
+
+def _answer_skills(question: str, cv_data: ParsedCV) -> Optional[str]:
+    return ", ".join(cv_data.skills[:MAX_SKILLS_ANSWER]) or None
+
+
+FIELD_EXTRACTORS: Dict[str, Callable[[str, ParsedCV], Optional[str]]] = {
+    "first_name": lambda question, cv: derive_name_parts(cv)[0],
+    "last_name": lambda question, cv: derive_name_parts(cv)[1],
+    "full_name": lambda question, cv: cv.name,
+    "email": lambda question, cv: cv.email,
+    "phone": lambda question, cv: cv.phone,
+    "linkedin": lambda question, cv: cv.linkedin_url,
+    "website": lambda question, cv: cv.website,
+    "country": _answer_country,
+    "years_experience": _answer_years,
+    "current_company": _answer_company,
+    "current_title": _answer_title,
+    "degree": _answer_degree,
+    "graduation_year": _answer_graduation_year,
+    "skills": _answer_skills,
+    "salary": lambda question, cv: SALARY_EXPECTATION_ANSWER,
+    "notice_period": lambda question, cv: NOTICE_PERIOD_ANSWER,
+}
+
+
+def extract_field(field: str, question: str, cv_data: ParsedCV) -> Optional[str]:
+    """Answer a routed field from the CV, or None to fall back to the LLM."""
+    value = FIELD_EXTRACTORS[field](question, cv_data)
+    return str(value) if value else None
@@ -1,51 +1,180 @@
-import io
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import BinaryIO
-from openai import OpenAI
-from pypdf import PdfReader
-from docx import Document
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from models import ParsedCV
-from dotenv import load_dotenv
+from cv_sections import Section, chunk_sections, merge_fragments, split_sections
+from llm_client import create_chat_completion
+from scheduler import PARSE
+from cache import create_cache
+import metrics
+from text_extraction import extract_pdf_pages, extract_text_from_docx, extract_text_from_pdf, join_pages
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY environment variable not set")
+# Per-call upper bound for the structured extraction completion (seconds)
+CV_PARSE_TIMEOUT = float(os.getenv('CV_PARSE_TIMEOUT', '90'))
+# "full" parses each new file in one completion; "chunked" parses long CVs
+# in section chunks concurrently; "incremental" also reuses the parsed
+# entries of unchanged sections from earlier uploads
+CV_PARSE_MODE = os.getenv('CV_PARSE_MODE', 'full').lower()
+# Text per chunk (characters); sections longer than this are split between entries
+CV_PARSE_CHUNK_CHARS = int(os.getenv('CV_PARSE_CHUNK_CHARS', '6000'))
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Process pool size for PDF text extraction (0 extracts in a thread instead)
+CV_EXTRACT_WORKERS = int(os.getenv('CV_EXTRACT_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Pages per extraction task; PDFs with more pages are split across workers
+CV_EXTRACT_PAGES_PER_TASK = int(os.getenv('CV_EXTRACT_PAGES_PER_TASK', '4'))
+# Largest accepted upload (bytes); 0 disables the limit
+CV_MAX_UPLOAD_BYTES = int(os.getenv('CV_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-def extract_text_from_pdf(file: BinaryIO) -> str:
-    """Extract text from PDF file."""
-    reader = PdfReader(file)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() + "\n"
-    return text
+# Parsed CVs keyed by a hash of the uploaded file bytes (default TTL: 7 days)
+cv_cache = create_cache("CV_CACHE", default_max_entries=256, default_ttl=7 * 24 * 3600)
+# Parsed entries of CV sections keyed by a hash of the section text, and
+# profiles keyed by the header's hash (CV_PARSE_MODE=incremental)
+cv_section_cache = create_cache("CV_SECTION_CACHE", default_max_entries=4096, default_ttl=30 * 24 * 3600)
 
+_extract_pool: Optional[ProcessPoolExecutor] = None
 
-def extract_text_from_docx(file: BinaryIO) -> str:
-    """Extract text from DOCX file."""
-    doc = Document(file)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
 
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds CV_MAX_UPLOAD_BYTES."""
 
-def parse_cv_with_openai(text: str) -> ParsedCV:
+
+def _get_extract_pool() -> Optional[ProcessPoolExecutor]:
+    global _extract_pool
+    if _extract_pool is None and CV_EXTRACT_WORKERS > 0:
+        _extract_pool = ProcessPoolExecutor(max_workers=CV_EXTRACT_WORKERS)
+    return _extract_pool
+
+
+def shutdown_extract_pool() -> None:
+    global _extract_pool
+    if _extract_pool is not None:
+        _extract_pool.shutdown(cancel_futures=True)
+        _extract_pool = None
+
+
+async def spool_upload(upload, suffix: str = "") -> Tuple[str, str]:
     """
-    Parse CV text using OpenAI structured extraction.
-    Uses function calling to enforce structured output.
+    Stream an upload (anything with an async read(size)) to a temp file,
+    hashing it on the way. Returns (path, sha256 hex digest); the caller
+    removes the file. Writes run in a worker thread, off the event loop.
+    Raises UploadTooLarge past CV_MAX_UPLOAD_BYTES.
     """
+    digest = hashlib.sha256()
+    size = 0
+    spooled = tempfile.NamedTemporaryFile(suffix=suffix, delete=False)
+    try:
+        with spooled, metrics.stage("file_read"):
+            while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if CV_MAX_UPLOAD_BYTES and size > CV_MAX_UPLOAD_BYTES:
+                    raise UploadTooLarge(f"File exceeds the {CV_MAX_UPLOAD_BYTES} byte upload limit.")
+                digest.update(chunk)
+                await asyncio.to_thread(spooled.write, chunk)
+    except BaseException:
+        os.unlink(spooled.name)
+        raise
+    return spooled.name, digest.hexdigest()
 
-    completion = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "system",
-                "content": """You are a flexible CV/resume parser that can handle various CV formats and styles.
+
+async def extract_pdf_text(path: str) -> str:
+    """
+    Extract PDF text off the event loop.
+    The first task reports the page count; remaining page ranges are then
+    extracted in parallel across the process pool.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_extract_pool()
+    step = max(1, CV_EXTRACT_PAGES_PER_TASK)
+
+    if pool is None:
+        return await asyncio.to_thread(extract_text_from_pdf, path)
+
+    pages, total = await loop.run_in_executor(pool, extract_pdf_pages, path, 0, step)
+    rest = await asyncio.gather(*(
+        loop.run_in_executor(pool, extract_pdf_pages, path, start, start + step)
+        for start in range(step, total, step)
+    ))
+    for chunk, _ in rest:
+        pages.extend(chunk)
+    return join_pages(pages)
+
+
+async def extract_text(path: str, filename: str) -> str:
+    """Extract plain text from a PDF or DOCX file on disk without blocking the event loop."""
+    if filename.lower().endswith('.pdf'):
+        return await extract_pdf_text(path)
+    if filename.lower().endswith('.docx'):
+        return await asyncio.to_thread(extract_text_from_docx, path)
+    raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
+
+
+# Profile fields come from the whole CV; the list fields are parsed per entry
+PROFILE_PROPERTIES = {
+    "name": {"type": "string"},
+    "first_name": {"type": ["string", "null"]},
+    "last_name": {"type": ["string", "null"]},
+    "email": {"type": ["string", "null"]},
+    "phone": {"type": ["string", "null"]},
+    "linkedin_url": {"type": ["string", "null"]},
+    "website": {"type": ["string", "null"]},
+    "country": {"type": ["string", "null"]},
+    "summary": {"type": "string"},
+}
+
+LIST_PROPERTIES = {
+    "experience": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "company": {"type": "string"},
+                "role": {"type": "string"},
+                "duration": {"type": ["string", "null"]},
+                "achievements": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                }
+            },
+            "required": ["company", "role", "duration", "achievements"],
+            "additionalProperties": False
+        }
+    },
+    "skills": {
+        "type": "array",
+        "items": {"type": "string"}
+    },
+    "projects": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "description": {"type": "string"},
+                "technologies": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                }
+            },
+            "required": ["name", "description", "technologies"],
+            "additionalProperties": False
+        }
+    },
+    "education": {
+        "type": "array",
+        "items": {"type": "string"}
+    }
+}
+
+PARSE_SYSTEM_PROMPT = """You are a flexible CV/resume parser that can handle various CV formats and styles.
 
 Your task is to extract structured information from any CV format, including:
 - Traditional chronological CVs
@@ -75,6 +204,29 @@ Be flexible and adaptive:
 - LinkedIn URLs may appear as: full URLs, shortened URLs, or just the username portion
 
 Output valid data even for minimal or poorly formatted CVs."""
+
+SECTIONS_PROMPT = """The CV is given as numbered sections, possibly only some of them. Return the profile \
+(name, contact details and summary) as far as the sections show it, and for every section the experience, skills, \
+projects and education found in that section only, under its section_id. Do not repeat an entry in another \
+section's output. A section may continue an entry from the section before it under the same heading.
+When a previous profile is given, the sections sent are the ones that changed since it was parsed: \
+keep its values unless these sections change them."""
+
+
+async def parse_cv_with_openai(text: str) -> ParsedCV:
+    """
+    Parse CV text using OpenAI structured extraction.
+    Uses function calling to enforce structured output.
+    """
+
+    completion = await create_chat_completion(
+        model="gpt-4o",
+        timeout=CV_PARSE_TIMEOUT,
+        priority=PARSE,
+        messages=[
+            {
+                "role": "system",
+                "content": PARSE_SYSTEM_PROMPT
             },
             {
                 "role": "user",
@@ -86,86 +238,207 @@ Output valid data even for minimal or poorly formatted CVs."""
             "json_schema": {
                 "name": "parsed_cv",
                 "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {**PROFILE_PROPERTIES, **LIST_PROPERTIES},
+                    "required": ["name", "email", "phone", "linkedin_url", "website", "country", "summary", "experience", "skills", "projects", "education"],
+                    "additionalProperties": False
+                }
+            }
+        }
+    )
+
+    parsed_data = json.loads(completion.choices[0].message.content)
+    return ParsedCV(**parsed_data)
+
+
+async def parse_cv_sections_with_openai(
+    sections: List[Section],
+    previous_profile: Optional[dict] = None
+) -> Tuple[dict, Dict[str, dict]]:
+    """
+    Parse some sections of a CV in one structured completion.
+    Returns the profile and the entries of each section by Section.key;
+    sections the model left out are missing from the result.
+    """
+    section_ids = {f"s{index}": section for index, section in enumerate(sections, start=1)}
+    parts = []
+    if previous_profile is not None:
+        parts.append(f"Previous profile:\n{json.dumps(previous_profile)}")
+    parts.extend(
+        f"### Section {section_id} ({section.heading or 'header'})\n{section.text}"
+        for section_id, section in section_ids.items()
+    )
+
+    completion = await create_chat_completion(
+        model="gpt-4o",
+        timeout=CV_PARSE_TIMEOUT,
+        priority=PARSE,
+        messages=[
+            {"role": "system", "content": f"{PARSE_SYSTEM_PROMPT}\n\n{SECTIONS_PROMPT}"},
+            {"role": "user", "content": "Parse these CV sections:\n\n" + "\n\n".join(parts)}
+        ],
+        response_format={
+            "type": "json_schema",
+            "json_schema": {
+                "name": "parsed_cv_sections",
+                "strict": True,
                 "schema": {
                     "type": "object",
                     "properties": {
-                        "name": {"type": "string"},
-                        "first_name": {"type": ["string", "null"]},
-                        "last_name": {"type": ["string", "null"]},
-                        "email": {"type": ["string", "null"]},
-                        "phone": {"type": ["string", "null"]},
-                        "linkedin_url": {"type": ["string", "null"]},
-                        "website": {"type": ["string", "null"]},
-                        "country": {"type": ["string", "null"]},
-                        "summary": {"type": "string"},
-                        "experience": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "company": {"type": "string"},
-                                    "role": {"type": "string"},
-                                    "duration": {"type": ["string", "null"]},
-                                    "achievements": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    }
-                                },
-                                "required": ["company", "role", "duration", "achievements"],
-                                "additionalProperties": False
-                            }
-                        },
-                        "skills": {
-                            "type": "array",
-                            "items": {"type": "string"}
+                        "profile": {
+                            "type": "object",
+                            "properties": PROFILE_PROPERTIES,
+                            "required": list(PROFILE_PROPERTIES),
+                            "additionalProperties": False
                         },
-                        "projects": {
+                        "sections": {
                             "type": "array",
                             "items": {
                                 "type": "object",
-                                "properties": {
-                                    "name": {"type": "string"},
-                                    "description": {"type": "string"},
-                                    "technologies": {
-                                        "type": "array",
-                                        "items": {"type": "string"}
-                                    }
-                                },
-                                "required": ["name", "description", "technologies"],
+                                "properties": {"section_id": {"type": "string"}, **LIST_PROPERTIES},
+                                "required": ["section_id", *LIST_PROPERTIES],
                                 "additionalProperties": False
                             }
-                        },
-                        "education": {
-                            "type": "array",
-                            "items": {"type": "string"}
                         }
                     },
-                    "required": ["name", "email", "phone", "linkedin_url", "website", "country", "summary", "experience", "skills", "projects", "education"],
+                    "required": ["profile", "sections"],
                     "additionalProperties": False
                 }
             }
         }
     )
 
-    import json
     parsed_data = json.loads(completion.choices[0].message.content)
-    return ParsedCV(**parsed_data)
+    fragments = {}
+    for fragment in parsed_data["sections"]:
+        section = section_ids.get(fragment.pop("section_id"))
+        if section is not None:
+            fragments[section.key] = fragment
+    return parsed_data["profile"], fragments
 
 
-async def parse_cv_file(file_content: bytes, filename: str) -> ParsedCV:
+async def parse_sections(
+    sections: List[Section],
+    previous_profile: Optional[dict] = None
+) -> Tuple[dict, Dict[str, dict]]:
+    """
+    Parse sections in chunks of about CV_PARSE_CHUNK_CHARS, concurrently.
+    The profile comes from the chunk holding the header or summary, or the
+    first chunk when neither was sent.
+    """
+    chunks = chunk_sections(sections, CV_PARSE_CHUNK_CHARS)
+    tasks = [asyncio.ensure_future(parse_cv_sections_with_openai(chunk, previous_profile)) for chunk in chunks]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    profile_chunk = next(
+        (index for index, chunk in enumerate(chunks) if any(s.kind in ("header", "summary") for s in chunk)), 0
+    )
+    fragments: Dict[str, dict] = {}
+    for _, parsed in results:
+        fragments.update(parsed)
+    return results[profile_chunk][0], fragments
+
+
+async def parse_cv_chunked(text: str) -> ParsedCV:
+    """
+    Parse a long CV as concurrent section chunks (map) merged into one
+    ParsedCV (reduce). Text that fits in one chunk or does not split into
+    sections is parsed in one completion.
+    """
+    sections = split_sections(text, CV_PARSE_CHUNK_CHARS)
+    if len(text) <= CV_PARSE_CHUNK_CHARS or len(sections) < 2:
+        return await parse_cv_with_openai(text)
+
+    logger.info("Chunked CV parse | sections=%d | chars=%d", len(sections), len(text))
+    profile, fragments = await parse_sections(sections)
+    return merge_fragments(profile, [fragments[section.key] for section in sections if section.key in fragments])
+
+
+async def parse_cv_incremental(text: str) -> ParsedCV:
+    """
+    Parse a CV reusing the entries of sections seen before.
+
+    Only sections whose text is not in the section cache are sent to the
+    model, along with the profile previously parsed from the same header, so
+    a revised CV with one new job costs one short completion and an unchanged
+    one none. When the header changed, every section is parsed again since
+    the profile is derived from the whole CV. Text that does not split into
+    sections is parsed in one piece; long changes are parsed in chunks.
+    """
+    sections = split_sections(text, CV_PARSE_CHUNK_CHARS)
+    if len(sections) < 2 or cv_section_cache is None:
+        return await parse_cv_with_openai(text)
+
+    profile_key = f"profile:{sections[0].key}"
+    cached_profile = cv_section_cache.get(profile_key)
+    fragments: Dict[str, dict] = {}
+    if cached_profile is not None:
+        for section in sections:
+            cached = cv_section_cache.get(section.key)
+            if cached is not None:
+                fragments[section.key] = json.loads(cached)
+    changed = [section for section in sections if section.key not in fragments]
+
+    metrics.CACHE_REQUESTS.inc(len(fragments), cache="cv_section", result="hit")
+    metrics.CACHE_REQUESTS.inc(len(changed), cache="cv_section", result="miss")
+    logger.info("Incremental CV parse | sections=%d | changed=%d", len(sections), len(changed))
+
+    profile = json.loads(cached_profile) if cached_profile is not None else None
+    if changed:
+        profile, parsed = await parse_sections(changed, profile)
+        for key, fragment in parsed.items():
+            await asyncio.to_thread(cv_section_cache.set, key, json.dumps(fragment))
+            fragments[key] = fragment
+        await asyncio.to_thread(cv_section_cache.set, profile_key, json.dumps(profile))
+
+    return merge_fragments(profile, [fragments[section.key] for section in sections if section.key in fragments])
+
+
+async def parse_cv_text(text: str) -> ParsedCV:
+    """Parse extracted CV text in the configured CV_PARSE_MODE."""
+    if CV_PARSE_MODE == "incremental":
+        return await parse_cv_incremental(text)
+    if CV_PARSE_MODE == "chunked":
+        return await parse_cv_chunked(text)
+    return await parse_cv_with_openai(text)
+
+
+async def parse_cv_file(path: str, filename: str, content_hash: Optional[str] = None) -> ParsedCV:
     """
     Main entry point for CV parsing.
     Detects file type and extracts structured data.
+    Identical files are served from the parsed-CV cache without calling the LLM;
+    pass content_hash (sha256 of the file, e.g. from spool_upload) to skip rehashing.
     """
-    file_io = io.BytesIO(file_content)
+    if content_hash is None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
 
-    # Extract text based on file type
-    if filename.lower().endswith('.pdf'):
-        text = extract_text_from_pdf(file_io)
-    elif filename.lower().endswith('.docx'):
-        text = extract_text_from_docx(file_io)
-    else:
-        raise ValueError("Unsupported file format. Please upload PDF or DOCX.")
-
-# Parse with OpenAI
-    return parse_cv_with_openai(text)
+    if cv_cache is not None:
+        cached = cv_cache.get(content_hash)
+        if cached is not None:
+            metrics.CACHE_REQUESTS.inc(cache="cv", result="hit")
+            logger.info("Parsed CV cache hit | key=%s", content_hash[:12])
+            return ParsedCV.model_validate_json(cached)
+        metrics.CACHE_REQUESTS.inc(cache="cv", result="miss")
+
+    with metrics.stage("text_extraction"):
+        text = await extract_text(path, filename)
+
+    # Parse with OpenAI
+    with metrics.stage("llm_parse"):
+        parsed_cv = await parse_cv_text(text)
+
+    if cv_cache is not None:
+        await asyncio.to_thread(cv_cache.set, content_hash, parsed_cv.model_dump_json())
+
+    return parsed_cv
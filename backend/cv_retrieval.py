@@ -0,0 +1,226 @@
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from models import ParsedCV
+
+# Rough prompt budget for the CV block; 0 disables retrieval (full CV every time)
+CV_CONTEXT_TOKEN_BUDGET = int(os.getenv('CV_CONTEXT_TOKEN_BUDGET', '1200'))
+# Upper bound on ranked chunks (experiences/projects) included per question
+CV_CONTEXT_TOP_K = int(os.getenv('CV_CONTEXT_TOP_K', '6'))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how i in is it of on or our that the this to
+was we what when where which who why will with you your us do does did can about tell
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t.rstrip(".") for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class Chunk:
+    kind: str  # "experience" or "project"
+    position: int  # index within its CV section
+    text: str
+    tokens: List[str]
+    term_freq: Counter = field(default_factory=Counter)
+
+
+class CVIndex:
+    """
+    BM25 index over the rankable parts of a CV (experiences and projects).
+
+    The header (name, location, summary), skills and education are short and
+    always included; experiences and projects are ranked against the question
+    and job context and kept only while they fit the token budget.
+
+    split_context_for keeps the two apart: the base context is the same for
+    every question of a CV, so it can sit in the cacheable prompt prefix,
+    while the ranked entries go next to the question.
+    """
+
+    def __init__(self, cv_data: ParsedCV):
+        self.cv_data = cv_data
+        self.chunks: List[Chunk] = []
+
+        for position, exp in enumerate(cv_data.experience):
+            self.chunks.append(Chunk("experience", position, _render_experience(exp), []))
+        for position, project in enumerate(cv_data.projects):
+            self.chunks.append(Chunk("project", position, _render_project(project), []))
+
+        self.doc_freq: Dict[str, int] = Counter()
+        for chunk in self.chunks:
+            chunk.tokens = tokenize(chunk.text)
+            chunk.term_freq = Counter(chunk.tokens)
+            self.doc_freq.update(set(chunk.tokens))
+
+        lengths = [len(chunk.tokens) for chunk in self.chunks]
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        # Rendered once per CV: the full context is reused for every question that fits
+        self.full_context = render_cv_context(cv_data)
+        self.full_tokens = estimate_tokens(self.full_context)
+        self.base_context = render_cv_context(cv_data, set(), set())
+        self.base_tokens = estimate_tokens(self.base_context)
+
+    def _score(self, chunk: Chunk, query_terms: Counter) -> float:
+        n = len(self.chunks)
+        term_freq = chunk.term_freq
+        length_norm = 1 - BM25_B + BM25_B * (len(chunk.tokens) / self.avg_length if self.avg_length else 0)
+
+        score = 0.0
+        for term, query_count in query_terms.items():
+            tf = term_freq.get(term)
+            if not tf:
+                continue
+            df = self.doc_freq[term]
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            score += query_count * idf * (tf * (BM25_K1 + 1)) / (tf + BM25_K1 * length_norm)
+        return score
+
+    def _select(self, query: str, token_budget: Optional[int], top_k: Optional[int]) -> Optional[Tuple[set, set]]:
+        """
+        Positions of the experiences and projects to include for a query, or
+        None when the full CV already fits the budget.
+        """
+        token_budget = CV_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        top_k = CV_CONTEXT_TOP_K if top_k is None else top_k
+
+        if token_budget <= 0 or self.full_tokens <= token_budget:
+            return None
+
+        query_terms = Counter(tokenize(query))
+        # Ties keep CV order, so recent roles (listed first) win
+        ranked = sorted(
+            range(len(self.chunks)),
+            key=lambda i: (-self._score(self.chunks[i], query_terms), i)
+        )
+
+        remaining = token_budget - self.base_tokens
+        experiences, projects = set(), set()
+        for i in ranked[:top_k]:
+            chunk = self.chunks[i]
+            cost = estimate_tokens(chunk.text)
+            if cost > remaining and (experiences or projects):
+                continue
+            remaining -= cost
+            (experiences if chunk.kind == "experience" else projects).add(chunk.position)
+        return experiences, projects
+
+    def context_for(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        top_k: Optional[int] = None
+    ) -> str:
+        """
+        Render the CV context for a question, in one block.
+        Returns the full CV when it already fits the budget.
+        """
+        selected = self._select(query, token_budget, top_k)
+        if selected is None:
+            return self.full_context
+        return render_cv_context(self.cv_data, *selected)
+
+    def split_context_for(
+        self,
+        query: str,
+        token_budget: Optional[int] = None,
+        top_k: Optional[int] = None
+    ) -> Tuple[str, str]:
+        """
+        The CV context for a question as (base, entries): the part shared by
+        every question of this CV and the experiences and projects ranked for
+        this one. entries is empty when the full CV fits the budget.
+        """
+        selected = self._select(query, token_budget, top_k)
+        if selected is None:
+            return self.full_context, ""
+        return self.base_context, render_cv_entries(self.cv_data, *selected)
+
+
+def _render_experience(exp) -> str:
+    text = f"- {exp.role} at {exp.company}"
+    if exp.duration:
+        text += f" ({exp.duration})"
+    text += "\n"
+    for achievement in exp.achievements:
+        text += f"  • {achievement}\n"
+    return text
+
+
+def _render_project(project) -> str:
+    text = f"- {project.name}: {project.description}\n"
+    if project.technologies:
+        text += f"  Technologies: {', '.join(project.technologies)}\n"
+    return text
+
+
+def render_cv_entries(cv_data: ParsedCV, experiences: set, projects: set) -> str:
+    """The selected experiences and projects alone, in their original CV order."""
+    parts = []
+    selected_experience = [exp for i, exp in enumerate(cv_data.experience) if i in experiences]
+    if selected_experience:
+        parts.append("Work Experience:\n")
+        parts.extend(_render_experience(exp) for exp in selected_experience)
+    selected_projects = [project for i, project in enumerate(cv_data.projects) if i in projects]
+    if selected_projects:
+        if parts:
+            parts.append("\n")
+        parts.append("Projects:\n")
+        parts.extend(_render_project(project) for project in selected_projects)
+    return "".join(parts)
+
+
+def render_cv_context(cv_data: ParsedCV, experiences: Optional[set] = None, projects: Optional[set] = None) -> str:
+    """
+    Convert structured CV data into a narrative context for the LLM.
+    `experiences`/`projects` restrict those sections to the given indices
+    (None keeps all); selected entries keep their original CV order.
+    """
+    parts = [f"Candidate Name: {cv_data.name}\n\n"]
+
+    if cv_data.country:
+        parts.append(f"Location/Country: {cv_data.country}\n\n")
+
+    if cv_data.summary:
+        parts.append(f"Professional Summary:\n{cv_data.summary}\n\n")
+
+    selected_experience = [
+        exp for i, exp in enumerate(cv_data.experience) if experiences is None or i in experiences
+    ]
+    if selected_experience:
+        parts.append("Work Experience:\n")
+        parts.extend(_render_experience(exp) for exp in selected_experience)
+        parts.append("\n")
+
+    if cv_data.skills:
+        parts.append(f"Skills: {', '.join(cv_data.skills)}\n\n")
+
+    selected_projects = [
+        project for i, project in enumerate(cv_data.projects) if projects is None or i in projects
+    ]
+    if selected_projects:
+        parts.append("Projects:\n")
+        parts.extend(_render_project(project) for project in selected_projects)
+        parts.append("\n")
+
+    if cv_data.education:
+        parts.append("Education:\n")
+        parts.extend(f"- {edu}\n" for edu in cv_data.education)
+
+    return "".join(parts)
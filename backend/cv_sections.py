@@ -0,0 +1,224 @@
+"""
+Split extracted CV text into sections and merge per-section parse results.
+
+Sections start at recognised headings ("Experience", "Work History",
+"Publications", ...); the text before the first heading is the header (name
+and contact details). Each section is identified by a hash of its
+whitespace-normalised text, so an unchanged section of a revised CV hashes
+the same and its parsed entries can be reused. Sections longer than a parse
+chunk are split between entries, and consecutive sections are packed into
+chunks that can be parsed concurrently.
+"""
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from models import Experience, ParsedCV, Project
+
+# Heading wording (lowercase, letters only) by the section kind it introduces
+SECTION_HEADINGS: Dict[str, tuple] = {
+    "summary": (
+        "summary", "profile", "about", "about me", "objective", "career objective",
+        "personal statement", "overview",
+    ),
+    "experience": (
+        "experience", "work experience", "employment", "employment history", "work history",
+        "career history", "professional background", "positions", "appointments",
+        "academic appointments", "research experience", "teaching experience", "teaching",
+        "leadership", "volunteering", "volunteer experience",
+    ),
+    "education": ("education", "academic background", "qualifications", "education training", "degrees"),
+    "skills": (
+        "skills", "technical skills", "core competencies", "competencies", "languages",
+        "tools", "technologies", "certifications", "certificates", "skills certifications",
+    ),
+    "projects": (
+        "projects", "publications", "research", "grants", "patents", "awards", "honors",
+        "honours", "awards honors", "talks", "presentations", "conferences", "portfolio",
+    ),
+}
+
+# Qualifiers that may precede a heading ("Selected Publications", "Relevant Experience")
+HEADING_QUALIFIERS = ("selected", "professional", "relevant", "key", "other", "additional", "recent", "peer reviewed")
+
+# Headings are short lines; longer ones are content that happens to start with a heading word
+MAX_HEADING_CHARS = 40
+
+BULLETS = ("-", "*", "\u2022", "\u2013", "\u00b7")
+
+_HEADING_KINDS = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+
+
+@dataclass(frozen=True)
+class Section:
+    kind: str  # "header", a SECTION_HEADINGS kind
+    heading: str
+    text: str
+
+    @property
+    def key(self) -> str:
+        """Hash of the heading and text, insensitive to whitespace and line wrapping."""
+        normalized = " ".join(f"{self.heading}\n{self.text}".split())
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def heading_kind(line: str) -> Optional[str]:
+    """The section kind a line introduces, or None when it is not a heading."""
+    stripped = line.strip().rstrip(":").strip()
+    if not stripped or len(stripped) > MAX_HEADING_CHARS:
+        return None
+    words = re.sub(r"[^a-z]+", " ", stripped.casefold()).split()
+    words = [word for word in words if word != "and"]
+    while words and " ".join(words[:2]) in HEADING_QUALIFIERS:
+        words = words[2:]
+    while words and words[0] in HEADING_QUALIFIERS:
+        words = words[1:]
+    return _HEADING_KINDS.get(" ".join(words))
+
+
+def _is_bullet(line: str) -> bool:
+    return line.lstrip().startswith(BULLETS)
+
+
+def _is_detail(line: str) -> bool:
+    """A labelled detail line of the entry above ("Technologies: ...", "Grade: ...")."""
+    return _is_bullet(line) or re.match(r"\s*\w+:\s", line) is not None
+
+
+def _entry_starts(lines: List[str]) -> List[bool]:
+    """
+    Whether each line may start a new entry: after a blank line, at a title
+    following bullet points, or at any line other than a labelled detail in
+    a section without bullets (one entry per line, like a publication list).
+    """
+    has_bullets = any(_is_bullet(line) for line in lines)
+    starts = [False] * len(lines)
+    for index in range(1, len(lines)):
+        previous, line = lines[index - 1], lines[index]
+        if not line.strip():
+            continue
+        if not previous.strip():
+            starts[index] = True
+        elif has_bullets:
+            starts[index] = _is_bullet(previous) and not _is_bullet(line)
+        else:
+            starts[index] = not _is_detail(line)
+    return starts
+
+
+def split_long_section(section: Section, max_chars: int) -> List[Section]:
+    """
+    Split a section longer than max_chars into pieces under the same
+    heading, breaking between entries where possible and mid-entry only
+    when one entry alone exceeds twice max_chars.
+    """
+    if len(section.text) <= max_chars:
+        return [section]
+    lines = section.text.splitlines()
+    starts = _entry_starts(lines)
+    pieces, current, size = [], [], 0
+    for line, start in zip(lines, starts):
+        if current and ((start and size >= max_chars) or size >= 2 * max_chars):
+            pieces.append(current)
+            current, size = [], 0
+        current.append(line)
+        size += len(line) + 1
+    pieces.append(current)
+    return [
+        Section(kind=section.kind, heading=section.heading, text="\n".join(piece).strip())
+        for piece in pieces if "".join(piece).strip()
+    ]
+
+
+def chunk_sections(sections: List[Section], max_chars: int) -> List[List[Section]]:
+    """Pack consecutive sections into chunks of about max_chars of text each."""
+    chunks: List[List[Section]] = []
+    size = 0
+    for section in sections:
+        if not chunks or size + len(section.text) > max_chars:
+            chunks.append([])
+            size = 0
+        chunks[-1].append(section)
+        size += len(section.text)
+    return chunks
+
+
+def split_sections(text: str, max_chars: int = 0) -> List[Section]:
+    """
+    Sections of a CV in document order, starting with the header. Empty
+    sections are dropped; with max_chars, longer ones are split between entries.
+    """
+    sections: List[Section] = []
+    kind, heading, lines = "header", "", []
+
+    def close():
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append(Section(kind=kind, heading=heading, text=body))
+
+    for line in text.splitlines():
+        line_kind = heading_kind(line)
+        if line_kind is None:
+            lines.append(line)
+            continue
+        close()
+        kind, heading, lines = line_kind, line.strip().rstrip(":").strip(), []
+    close()
+    if max_chars:
+        return [piece for section in sections for piece in split_long_section(section, max_chars)]
+    return sections
+
+
+def _casefold(value: Optional[str]) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def _union(first: Iterable[str], second: Iterable[str]) -> List[str]:
+    seen, merged = set(), []
+    for value in [*first, *second]:
+        if _casefold(value) not in seen:
+            seen.add(_casefold(value))
+            merged.append(value)
+    return merged
+
+
+def merge_fragments(profile: dict, fragments: List[dict]) -> ParsedCV:
+    """
+    Combine the profile (name, contact details, summary) with section
+    fragments, in document order, into one ParsedCV. Entries repeated across
+    fragments are merged: experiences by company, role and dates (achievements
+    unioned), projects by name and description (technologies unioned), and
+    skills and education by case-insensitive text. The result only depends
+    on the inputs' order.
+    """
+    experience: Dict[tuple, Experience] = {}
+    projects: Dict[tuple, Project] = {}
+    skills: List[str] = []
+    education: List[str] = []
+
+    for fragment in fragments:
+        for entry in fragment.get("experience", []):
+            key = (_casefold(entry["company"]), _casefold(entry["role"]), _casefold(entry.get("duration")))
+            if key in experience:
+                previous = experience[key]
+                previous.achievements = _union(previous.achievements, entry.get("achievements", []))
+            else:
+                experience[key] = Experience(**entry)
+        for entry in fragment.get("projects", []):
+            key = (_casefold(entry["name"]), _casefold(entry.get("description")))
+            if key in projects:
+                previous = projects[key]
+                previous.technologies = _union(previous.technologies, entry.get("technologies", []))
+            else:
+                projects[key] = Project(**entry)
+        skills = _union(skills, fragment.get("skills", []))
+        education = _union(education, fragment.get("education", []))
+
+    return ParsedCV(
+        **profile,
+        experience=list(experience.values()),
+        projects=list(projects.values()),
+        skills=skills,
+        education=education,
+    )
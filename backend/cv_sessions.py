@@ -0,0 +1,116 @@
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from models import ParsedCV
+from cache import MemoryCache, create_cache
+from answer_cache import fingerprint_cv
+from cv_retrieval import CVIndex
+
+logger = logging.getLogger(__name__)
+
+
+class CVVersionConflict(Exception):
+    """Raised when an update's If-Match version is not the current one."""
+
+
+@dataclass(frozen=True)
+class CVSession:
+    """
+    A validated CV plus everything derived from it that the answer path needs.
+    Built once per version, so answer requests skip validation and re-rendering.
+    """
+    cv_id: str
+    version: str
+    cv: ParsedCV
+    index: CVIndex
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.version}"'
+
+
+class CVSessionStore:
+    """
+    Server-side CV sessions addressed by cv_id.
+
+    The persisted record is "<version>\n<CV JSON>"; the validated model and
+    its retrieval index are memoized in-process per (cv_id, version).
+    The version is the CV fingerprint used by the answer cache.
+    """
+
+    def __init__(self, store, max_prepared: int = 256):
+        self.store = store
+        self.max_prepared = max_prepared
+        self._prepared: "OrderedDict[str, CVSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prepare(self, cv_id: str, cv: ParsedCV, version: str) -> CVSession:
+        session = CVSession(
+            cv_id=cv_id,
+            version=version,
+            cv=cv,
+            index=CVIndex(cv)
+        )
+        with self._lock:
+            self._prepared[cv_id] = session
+            self._prepared.move_to_end(cv_id)
+            while len(self._prepared) > self.max_prepared:
+                self._prepared.popitem(last=False)
+        return session
+
+    def _save(self, cv_id: str, cv: ParsedCV) -> CVSession:
+        session = self._prepare(cv_id, cv, fingerprint_cv(cv))
+        self.store.set(cv_id, f"{session.version}\n{cv.model_dump_json()}")
+        return session
+
+    def create(self, cv: ParsedCV) -> CVSession:
+        session = self._save(uuid.uuid4().hex, cv)
+        logger.info("Created CV session | cv_id=%s | version=%s", session.cv_id, session.version)
+        return session
+
+    def get(self, cv_id: str) -> Optional[CVSession]:
+        record = self.store.get(cv_id)
+        if record is None:
+            return None
+
+        version, cv_json = record.split("\n", 1)
+        with self._lock:
+            prepared = self._prepared.get(cv_id)
+            if prepared is not None and prepared.version == version:
+                self._prepared.move_to_end(cv_id)
+                return prepared
+
+        # Another worker (or an earlier process) wrote this version
+        return self._prepare(cv_id, ParsedCV.model_validate_json(cv_json), version)
+
+    def update(self, cv_id: str, cv: ParsedCV, if_match: Optional[str] = None) -> CVSession:
+        """
+        Replace the CV stored under cv_id.
+        Raises KeyError for an unknown session and CVVersionConflict when
+        if_match does not name the current version.
+        """
+        current = self.get(cv_id)
+        if current is None:
+            raise KeyError(cv_id)
+
+        if if_match is not None and if_match.removeprefix("W/").strip('"') != current.version:
+            raise CVVersionConflict(f"CV {cv_id} is at version {current.version}")
+
+        session = self._save(cv_id, cv)
+        logger.info("Updated CV session | cv_id=%s | version=%s", cv_id, session.version)
+        return session
+
+
+def create_session_store() -> CVSessionStore:
+    """
+    Build the session store from CV_SESSION_* settings (see cache.create_cache).
+    Sessions cannot be disabled, so a "none" backend falls back to memory.
+    """
+    store = create_cache("CV_SESSION", default_max_entries=4096, default_ttl=30 * 24 * 3600)
+    if store is None:
+        store = MemoryCache(max_entries=4096, ttl=30 * 24 * 3600)
+    return CVSessionStore(store)
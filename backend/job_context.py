@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, Optional, Tuple
+
+from cache import MemoryCache, create_cache
+from llm_client import create_chat_completion
+from scheduler import BATCH
+
+logger = logging.getLogger(__name__)
+
+# Descriptions longer than this (characters) are condensed when requested
+JOB_CONDENSE_THRESHOLD = int(os.getenv('JOB_CONDENSE_THRESHOLD', '1200'))
+JOB_CONDENSE_TIMEOUT = float(os.getenv('JOB_CONDENSE_TIMEOUT', '30'))
+
+PAGE_FIELDS = ("companyName", "jobTitle", "jobDescription", "companyValues")
+
+
+def _clean(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _dedupe_sentences(text: str) -> str:
+    """
+    Drop repeated sentences; scraped pages often contain the same blurb twice
+    (e.g. a header summary and the full posting).
+    """
+    seen = set()
+    kept = []
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        key = sentence.lower().strip()
+        if key and key not in seen:
+            seen.add(key)
+            kept.append(sentence.strip())
+    return " ".join(kept)
+
+
+def normalize_job_context(job_description: str) -> Dict[str, str]:
+    """
+    Normalize the page context sent by the extension (JSON or raw text) into
+    the known fields with whitespace collapsed, duplicate sentences removed and
+    fields that merely repeat another one dropped.
+    """
+    try:
+        data = json.loads(job_description)
+        if not isinstance(data, dict):
+            raise ValueError("not an object")
+    except ValueError:
+        data = {"jobDescription": job_description}
+
+    fields: Dict[str, str] = {}
+    for name in PAGE_FIELDS:
+        value = data.get(name)
+        if not isinstance(value, str):
+            continue
+        value = _clean(value)
+        if name in ("jobDescription", "companyValues"):
+            value = _dedupe_sentences(value)
+        if value and value not in fields.values():
+            fields[name] = value
+
+    return fields
+
+
+def render_company_context(fields: Dict[str, str]) -> str:
+    """
+    Render normalized job fields in the same layout as build_company_context.
+    """
+    company_context = ""
+    if fields.get('companyName'):
+        company_context += f"Company: {fields['companyName']}\n"
+    if fields.get('jobTitle'):
+        company_context += f"Position: {fields['jobTitle']}\n"
+    if fields.get('keyRequirements'):
+        company_context += f"Key Requirements:\n{fields['keyRequirements']}\n"
+    elif fields.get('jobDescription'):
+        company_context += f"Job Description:\n{fields['jobDescription']}\n"
+    if fields.get('companyValues'):
+        company_context += f"Company Values/Culture:\n{fields['companyValues']}\n"
+    return company_context
+
+
+async def condense_description(fields: Dict[str, str]) -> str:
+    """
+    Summarize a long job description into its key requirements with one LLM call.
+    """
+    completion = await create_chat_completion(
+        model="gpt-4o-mini",
+        messages=[
+            {
+                "role": "system",
+                "content": "Condense job postings for a recruiter. Return 5-10 short bullet points "
+                           "covering the role's key requirements, responsibilities, tech stack, seniority "
+                           "and work arrangement. Use only facts from the posting."
+            },
+            {"role": "user", "content": fields["jobDescription"]}
+        ],
+        temperature=0,
+        max_tokens=300,
+        timeout=JOB_CONDENSE_TIMEOUT,
+        priority=BATCH
+    )
+    return completion.choices[0].message.content.strip()
+
+
+def _job_id(fields: Dict[str, str], condensed: bool) -> str:
+    """Id of a page context: a hash of its normalized fields and whether it is condensed."""
+    digest_source = json.dumps(fields, sort_keys=True) + ("|condensed" if condensed else "")
+    return hashlib.sha256(digest_source.encode("utf-8")).hexdigest()[:32]
+
+
+class JobContextStore:
+    """
+    Precompiled job contexts addressed by job_id.
+
+    The id is a hash of the normalized fields, so the same page registered twice
+    (or from another worker) maps to the same entry. The stored value is the
+    rendered company context used directly in answer prompts.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    async def register(self, job_description: str, condense: bool = False) -> Tuple[str, bool]:
+        """
+        Normalize, optionally condense and store a page context.
+        Returns (job_id, condensed).
+
+        A condensed context has its own job_id, written only once condensing
+        succeeded; when it fails the plain context's job_id is returned, so
+        the next condense request tries again.
+        """
+        fields = normalize_job_context(job_description)
+
+        if condense and len(fields.get("jobDescription", "")) > JOB_CONDENSE_THRESHOLD:
+            job_id = _job_id(fields, condensed=True)
+            if self.store.get(job_id) is not None:
+                return job_id, True
+            try:
+                key_requirements = await condense_description(fields)
+            except Exception as e:
+                # The full description still works, just with a longer prompt
+                logger.error("Failed to condense job description: %s", e)
+            else:
+                await asyncio.to_thread(
+                    self.store.set, job_id, render_company_context({**fields, "keyRequirements": key_requirements})
+                )
+                logger.info("Registered job context | job_id=%s | condensed=True", job_id)
+                return job_id, True
+
+        job_id = _job_id(fields, condensed=False)
+        if self.store.get(job_id) is None:
+            await asyncio.to_thread(self.store.set, job_id, render_company_context(fields))
+            logger.info("Registered job context | job_id=%s | condensed=False", job_id)
+        return job_id, False
+
+    def get(self, job_id: str) -> Optional[str]:
+        return self.store.get(job_id)
+
+
+def create_job_context_store() -> JobContextStore:
+    """
+    Build the job context store from JOB_CONTEXT_* settings (see cache.create_cache).
+    """
+    store = create_cache("JOB_CONTEXT", default_max_entries=4096, default_ttl=7 * 24 * 3600)
+    if store is None:
+        store = MemoryCache(max_entries=4096, ttl=7 * 24 * 3600)
+    return JobContextStore(store)
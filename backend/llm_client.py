@@ -0,0 +1,363 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from scheduler import INTERACTIVE, UpstreamScheduler, backoff_delay
+import metrics
+import replay
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Checked when the client is first needed, so the app imports and serves
+# /health without a key
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Connection pool and concurrency settings, tunable per deployment
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '64'))
+OPENAI_MAX_KEEPALIVE = int(os.getenv('OPENAI_MAX_KEEPALIVE', '32'))
+OPENAI_MAX_CONCURRENCY = int(os.getenv('OPENAI_MAX_CONCURRENCY', '32'))
+
+# Rate limits and backpressure: quota per minute (0 = unlimited), callers
+# allowed to wait for a slot, and retries on 429/5xx/connection errors
+OPENAI_RPM = float(os.getenv('OPENAI_RPM', '0'))
+OPENAI_TPM = float(os.getenv('OPENAI_TPM', '0'))
+OPENAI_MAX_QUEUE = int(os.getenv('OPENAI_MAX_QUEUE', '256'))
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+
+# Speculative answer generation (prefetch lane): slots it may hold at once
+# (0 = a quarter of the concurrency) and callers allowed to wait
+OPENAI_PREFETCH_CONCURRENCY = int(os.getenv('OPENAI_PREFETCH_CONCURRENCY', '0'))
+OPENAI_PREFETCH_QUEUE = int(os.getenv('OPENAI_PREFETCH_QUEUE', '64'))
+
+# Worker processes serving the app (uvicorn reads the same variable). The
+# concurrency and quota settings above are totals, split evenly across workers.
+WEB_CONCURRENCY = max(1, int(os.getenv('WEB_CONCURRENCY', '1')))
+
+# The single pooled client shared by every module that talks to OpenAI,
+# built on first use (see get_client)
+_client: Optional["AsyncOpenAI"] = None
+# Background import of the SDK, started at app startup (see start_client_preload)
+_preload: Optional["asyncio.Future"] = None
+
+scheduler = UpstreamScheduler(
+    max_concurrency=max(1, OPENAI_MAX_CONCURRENCY // WEB_CONCURRENCY),
+    rpm=OPENAI_RPM / WEB_CONCURRENCY,
+    tpm=OPENAI_TPM / WEB_CONCURRENCY,
+    max_queue=OPENAI_MAX_QUEUE,
+    prefetch_concurrency=max(1, OPENAI_PREFETCH_CONCURRENCY // WEB_CONCURRENCY) if OPENAI_PREFETCH_CONCURRENCY else None,
+    prefetch_queue=OPENAI_PREFETCH_QUEUE,
+)
+
+# List prices in USD per 1M tokens: (input, cached input, output). Models are
+# matched by longest prefix, so dated snapshots share their family's price.
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+}
+
+# Running token totals reported by the API, including prompt-cache hits
+usage_totals = {
+    "completions": 0,
+    "prompt_tokens": 0,
+    "cached_prompt_tokens": 0,
+    "completion_tokens": 0,
+    "cost_usd": 0.0,
+}
+
+# The same totals plus upstream time, per model tier (see model_routing)
+tier_totals: Dict[str, dict] = {}
+
+
+def get_client() -> "AsyncOpenAI":
+    """
+    Return the shared client, creating it on first use. The openai SDK and
+    httpx are imported here rather than at startup, which keeps cold starts
+    and workers that never reach OpenAI fast.
+    """
+    global _client
+    if _client is None:
+        if not OPENAI_API_KEY:
+            raise RuntimeError("OPENAI_API_KEY environment variable not set")
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+        )
+        # OPENAI_BASE_URL is picked up from the environment by the SDK (e.g. a local stub server).
+        # Retries are done here, outside the concurrency slot, rather than by the SDK.
+        _client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client, max_retries=0)
+    return _client
+
+
+def preload_client_modules() -> None:
+    """
+    Import the openai SDK (and httpx with it) ahead of the first completion.
+    Meant to run in a thread after startup, so the app is serving while the
+    import happens and the first answer does not pay for it.
+    """
+    import openai  # noqa: F401
+    import openai.types  # noqa: F401
+
+
+def start_client_preload() -> "asyncio.Future":
+    """Run preload_client_modules in a worker thread, once; returns its future."""
+    global _preload
+    if _preload is None:
+        _preload = asyncio.get_running_loop().run_in_executor(None, preload_client_modules)
+    return _preload
+
+
+async def get_ready_client() -> "AsyncOpenAI":
+    """
+    get_client(), after the SDK import has finished in its worker thread.
+    Importing it on the event loop instead would stall every request (and
+    race the preload thread) for the whole import.
+    """
+    if _client is None and not (_preload is not None and _preload.done()):
+        await start_client_preload()
+    return get_client()
+
+
+async def _create_completion(**request):
+    return await (await get_ready_client()).chat.completions.create(**request)
+
+
+def estimate_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """USD cost of a completion at list prices; 0 for models without a known price."""
+    family = max((name for name in MODEL_PRICES if model.startswith(name)), key=len, default=None)
+    if family is None:
+        return 0.0
+    input_price, cached_price, output_price = MODEL_PRICES[family]
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+def _tier_totals() -> dict:
+    return tier_totals.setdefault(metrics.current_model_tier(), {
+        "completions": 0,
+        "seconds": 0.0,
+        "prompt_tokens": 0,
+        "cached_prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cost_usd": 0.0,
+    })
+
+
+@contextmanager
+def _timed_completion(model: str) -> Iterator[None]:
+    """Time an upstream call as a pipeline stage and per model tier."""
+    started = time.perf_counter()
+    try:
+        with metrics.stage("upstream_completion"):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.COMPLETION_SECONDS.observe(elapsed, tier=metrics.current_model_tier(), model=model)
+        _tier_totals()["seconds"] += elapsed
+
+
+def record_usage(usage, model: str = "") -> None:
+    """
+    Add a completion's usage block to the running totals.
+    cached_tokens lives under prompt_tokens_details, which older SDK models
+    only expose as an untyped extra field.
+    """
+    if usage is None:
+        return
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        cached = details.get("cached_tokens") or 0
+    else:
+        cached = getattr(details, "cached_tokens", 0) or 0
+
+    prompt_tokens = usage.prompt_tokens or 0
+    completion_tokens = usage.completion_tokens or 0
+    cost = estimate_cost(model, prompt_tokens, cached, completion_tokens)
+
+    for totals in (usage_totals, _tier_totals()):
+        totals["completions"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["cached_prompt_tokens"] += cached
+        totals["completion_tokens"] += completion_tokens
+        totals["cost_usd"] += cost
+    metrics.record_tokens(prompt_tokens, completion_tokens, cached, model, cost)
+
+    logger.debug(
+        "Completion usage | prompt_tokens=%s | cached_tokens=%s | completion_tokens=%s",
+        usage.prompt_tokens, cached, usage.completion_tokens
+    )
+
+
+def _as_usage(raw):
+    """Streamed usage arrives as a plain dict on older SDK versions."""
+    from openai.types import CompletionUsage
+
+    return CompletionUsage(**raw) if isinstance(raw, dict) else raw
+
+
+def usage_stats() -> dict:
+    stats = dict(usage_totals)
+    prompt_tokens = stats["prompt_tokens"]
+    stats["cached_prompt_ratio"] = round(stats["cached_prompt_tokens"] / prompt_tokens, 4) if prompt_tokens else 0.0
+    stats["cost_usd"] = round(stats["cost_usd"], 6)
+    return stats
+
+
+def tier_stats() -> dict:
+    """Completions, mean upstream latency, tokens and estimated cost per model tier."""
+    stats = {}
+    for tier, totals in sorted(tier_totals.items()):
+        completions = totals["completions"]
+        stats[tier] = {
+            **totals,
+            "seconds": round(totals["seconds"], 3),
+            "mean_latency_ms": round(totals["seconds"] / completions * 1000, 1) if completions else None,
+            "cost_usd": round(totals["cost_usd"], 6),
+            "cost_per_completion_usd": round(totals["cost_usd"] / completions, 6) if completions else None,
+        }
+    return stats
+
+
+def estimate_tokens(kwargs: dict) -> int:
+    """Prompt (~4 characters per token) plus the completion allowance, for the TPM bucket."""
+    prompt_chars = sum(len(message.get("content") or "") for message in kwargs.get("messages", []))
+    return prompt_chars // 4 + (kwargs.get("max_tokens") or 1000)
+
+
+def _retry_delay(attempt: int, error: Exception) -> Optional[float]:
+    """
+    Seconds to wait before retrying, or None when the error is final.
+    Honors the provider's Retry-After on 429s and pauses the scheduler for it.
+    Timeouts are final: the call already used its whole budget.
+    """
+    from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+    if not isinstance(error, (RateLimitError, InternalServerError, APIConnectionError)) or isinstance(error, APITimeoutError):
+        return None
+    if attempt >= OPENAI_MAX_RETRIES:
+        return None
+
+    delay = backoff_delay(attempt)
+    if isinstance(error, RateLimitError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            delay = max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            pass
+        scheduler.pause(delay)
+
+    scheduler.retries += 1
+    logger.warning("Retrying completion in %.2fs (attempt %d): %s", delay, attempt + 1, error)
+    return delay
+
+
+def _settle(estimated: int, usage) -> None:
+    if usage is not None:
+        scheduler.settle(estimated, (usage.prompt_tokens or 0) + (usage.completion_tokens or 0))
+
+
+async def create_chat_completion(timeout: Optional[float] = None, priority: int = INTERACTIVE, **kwargs):
+    """
+    Run a chat completion on the shared async client.
+    The call waits in the scheduler's priority lane for a concurrency slot and
+    RPM/TPM quota, and is retried with jittered backoff on 429/5xx.
+    Raises SchedulerBusy when the queue is full.
+    """
+    estimated = estimate_tokens(kwargs)
+    attempt = 0
+    while True:
+        async with scheduler.slot(priority, estimated):
+            try:
+                with _timed_completion(kwargs.get("model", "")):
+                    # Recorded or replayed under OPENAI_REPLAY_MODE; the client is only built for live calls
+                    completion = await replay.completion(
+                        _create_completion,
+                        timeout=timeout if timeout is not None else OPENAI_TIMEOUT,
+                        **kwargs
+                    )
+            except Exception as e:
+                delay = _retry_delay(attempt, e)
+                if delay is None:
+                    raise
+            else:
+                record_usage(completion.usage, kwargs.get("model", ""))
+                _settle(estimated, completion.usage)
+                return completion
+
+        # Back off without holding the slot
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def stream_chat_completion(
+    timeout: Optional[float] = None,
+    priority: int = INTERACTIVE,
+    **kwargs
+) -> AsyncIterator[str]:
+    """
+    Stream a chat completion, yielding content deltas as they arrive.
+    The scheduler slot is held until the stream is exhausted or closed.
+    Failures are retried only before the first delta has been yielded.
+    """
+    estimated = estimate_tokens(kwargs)
+    attempt = 0
+    while True:
+        started = False
+        async with scheduler.slot(priority, estimated):
+            try:
+                # Timed until the last chunk, including time the consumer spends between deltas
+                with _timed_completion(kwargs.get("model", "")):
+                    stream = replay.stream(
+                        _create_completion,
+                        timeout=timeout if timeout is not None else OPENAI_TIMEOUT,
+                        stream=True,
+                        # Ask for a final usage chunk so streamed calls report cached tokens too
+                        extra_body={"stream_options": {"include_usage": True}},
+                        **kwargs
+                    )
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            started = True
+                            yield chunk.choices[0].delta.content
+                        elif getattr(chunk, "usage", None):
+                            usage = _as_usage(chunk.usage)
+                            record_usage(usage, kwargs.get("model", ""))
+                            _settle(estimated, usage)
+                return
+            except Exception as e:
+                delay = None if started else _retry_delay(attempt, e)
+                if delay is None:
+                    raise
+
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def close_client() -> None:
+    """Release pooled connections on shutdown, if the client was ever created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -1,14 +1,50 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import time
+
+# Start of app import, for the startup time reported once the app is ready
+IMPORT_STARTED = time.perf_counter()
+
+from typing import Awaitable, List, Optional, Tuple, TypeVar
+from fastapi import FastAPI, UploadFile, File, Form, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from models import GenerateAnswerRequest, GenerateAnswerResponse, ParsedCV
-from cv_parser import parse_cv_file
-from answer_generator import generate_answer
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
+from models import (
+    CVReference,
+    CVSessionResponse,
+    GenerateAnswerRequest,
+    GenerateAnswerResponse,
+    GenerateAnswersRequest,
+    GenerateAnswersResponse,
+    JobContextRequest,
+    JobContextResponse,
+    ParsedCV,
+    AnswerSuggestion,
+    SuggestAnswersRequest,
+    SuggestAnswersResponse,
+)
+from cv_parser import UploadTooLarge, parse_cv_file, spool_upload, shutdown_extract_pool, cv_cache, cv_section_cache
+from answer_generator import (
+    build_company_context, generate_answer, generate_answers, stream_answer, answer_cache, answer_flights
+)
+from answer_history import create_answer_history
+from llm_client import WEB_CONCURRENCY, close_client, scheduler, start_client_preload, tier_stats, usage_stats
+from model_routing import FieldSpec
+from scheduler import BATCH, PREFETCH, SchedulerBusy
+from cv_sessions import CVSession, CVVersionConflict, create_session_store
+from job_context import create_job_context_store
+from metrics import Gauge, MetricsMiddleware, registry
+import metrics
+from replay import replay_stats
+from compression import CompressionMiddleware
+import asyncio
+import json
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="SubmitMe API", version="1.0.0")
+# orjson renders response models about three times faster than the stdlib encoder
+app = FastAPI(title="SubmitMe API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS - allow extension to call API
 app.add_middleware(
@@ -17,7 +53,165 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-CV-Id"],
 )
+app.add_middleware(CompressionMiddleware)
+# Outermost, so request timings include every other middleware
+app.add_middleware(MetricsMiddleware)
+
+cv_sessions = create_session_store()
+job_contexts = create_job_context_store()
+answer_history = create_answer_history()
+
+registry.register(Gauge(
+    "submitme_upstream_active",
+    "Upstream completions currently holding a scheduler slot.",
+    callback=lambda: {(): scheduler.stats()["active"]}
+))
+registry.register(Gauge(
+    "submitme_upstream_queued",
+    "Upstream completions waiting for a scheduler slot, by lane.",
+    ("lane",),
+    callback=lambda: {(lane,): count for lane, count in scheduler.stats()["queued"].items()}
+))
+startup_seconds = {"value": 0.0}
+
+registry.register(Gauge(
+    "submitme_startup_seconds",
+    "Seconds from importing the app until it was ready to serve requests.",
+    callback=lambda: {(): startup_seconds["value"]}
+))
+registry.register(Gauge(
+    "submitme_answers_in_flight",
+    "Distinct answer generations in flight (coalesced callers share one).",
+    callback=lambda: {(): answer_flights.stats()["in_flight"]}
+))
+
+
+def _set_session_headers(response: Response, session: CVSession) -> None:
+    response.headers["ETag"] = session.etag
+    response.headers["X-CV-Id"] = session.cv_id
+
+
+def resolve_cv(request: CVReference) -> dict:
+    """
+    Turn a request's cv_id or inline cv_data into keyword arguments for the
+    answer generator. Sessions contribute their precomputed index and hash.
+    """
+    if request.cv_id is None:
+        return {"cv_data": request.cv_data}
+
+    session = cv_sessions.get(request.cv_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown cv_id")
+
+    return {
+        "cv_data": session.cv,
+        "cv_index": session.index,
+        "cv_fingerprint": session.version,
+    }
+
+
+def resolve_job(request) -> dict:
+    """
+    Turn a request's job_id into the precompiled company context, if given.
+    """
+    if request.job_id is None:
+        return {}
+
+    company_context = job_contexts.get(request.job_id)
+    if company_context is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+
+    return {"company_context": company_context}
+
+
+async def record_answers(request, context_kwargs: dict, answers: List[Tuple[str, Optional[str], str]]) -> None:
+    """
+    Add (question, answer, question_type) triples generated for a CV session
+    to its answer history (see /suggest_answers), in a worker thread so the
+    SQLite write does not stall the event loop. Answers for inline cv_data
+    have no id to file them under.
+    """
+    if answer_history is None or request.cv_id is None:
+        return
+    company_context = context_kwargs.get("company_context") or build_company_context(request.job_description)
+
+    def record():
+        for question, answer, question_type in answers:
+            if answer:
+                answer_history.record(request.cv_id, question, answer, question_type, company_context)
+
+    try:
+        await asyncio.to_thread(record)
+    except Exception as e:
+        # The answer itself is fine; only its reuse is lost
+        logger.error(f"Error recording answer history: {str(e)}")
+
+
+T = TypeVar("T")
+
+# Seconds between checks whether a prefetching client is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+async def cancel_on_disconnect(http_request: Request, work: Awaitable[T]) -> Optional[T]:
+    """
+    Await work, cancelling it if the client disconnects first (e.g. the user
+    navigated away from the page being prefetched). Returns None when cancelled.
+    """
+    task = asyncio.ensure_future(work)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if await http_request.is_disconnected():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return None
+
+
+@app.exception_handler(SchedulerBusy)
+async def scheduler_busy_handler(request: Request, exc: SchedulerBusy):
+    """Upstream queue is full: tell the client when to come back instead of failing."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Report how long import and startup took. The OpenAI SDK is imported in
+    the background rather than before the app starts serving.
+    """
+    startup_seconds["value"] = time.perf_counter() - IMPORT_STARTED
+    logger.info("Startup complete in %.0f ms", startup_seconds["value"] * 1000)
+
+    if WEB_CONCURRENCY > 1:
+        local = [
+            name for name, store in (
+                ("CV cache", cv_cache), ("CV section cache", cv_section_cache),
+                ("answer cache", answer_cache and answer_cache.store),
+                ("CV sessions", cv_sessions.store), ("job contexts", job_contexts.store),
+            )
+            if store is not None and store.backend == "memory"
+        ]
+        if local:
+            logger.warning(
+                "Running %d workers with in-process state (%s); set STATE_BACKEND=sqlite to share it",
+                WEB_CONCURRENCY, ", ".join(local)
+            )
+    app.state.preload = start_client_preload()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close the shared OpenAI connection pool and the extraction workers."""
+    await close_client()
+    shutdown_extract_pool()
 
 
 @app.get("/health")
@@ -26,14 +220,50 @@ async def health_check():
     return {"status": "healthy", "service": "submitme-api"}
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters for the server-side caches, upstream prompt-cache usage,
+    latency and cost per model tier, request coalescing, the upstream scheduler
+    recorded/replayed completions and the answer history, as seen by the worker process that
+    serves the request.
+    """
+    return {
+        "worker": os.getpid(),
+        "cv": cv_cache.stats() if cv_cache is not None else None,
+        "cv_sections": cv_section_cache.stats() if cv_section_cache is not None else None,
+        "answers": answer_cache.stats() if answer_cache is not None else None,
+        "cv_sessions": cv_sessions.store.stats(),
+        "job_contexts": job_contexts.store.stats(),
+        "prompt_cache": usage_stats(),
+        "model_tiers": tier_stats(),
+        "coalescing": answer_flights.stats(),
+        "scheduler": scheduler.stats(),
+        "replay": replay_stats(),
+        "answer_history": answer_history.stats() if answer_history else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition of request, stage, token and cache metrics."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/upload_cv", response_model=ParsedCV)
-async def upload_cv(file: UploadFile = File(...)):
+async def upload_cv(
+    response: Response,
+    file: UploadFile = File(...),
+    cv_id: Optional[str] = Form(None)
+):
     """
     Upload and parse a CV file (PDF or DOCX).
-    Returns structured CV data.
+    Returns structured CV data. The CV is stored as a server-side session whose
+    id and version are returned in the X-CV-Id and ETag headers; pass an
+    existing cv_id to replace that session's CV instead of creating a new one.
     """
     try:
-        logger.info(f"Received CV upload: {file.filename}")
+        logger.debug(f"Received CV upload: {file.filename}")
 
         # Validate file type
         if not file.filename.lower().endswith(('.pdf', '.docx')):
@@ -42,15 +272,32 @@ async def upload_cv(file: UploadFile = File(...)):
                 detail="Invalid file format. Only PDF and DOCX are supported."
             )
 
-        # Read file content
-        content = await file.read()
+        # Stream the upload to disk; extraction workers read it from there
+        path, content_hash = await spool_upload(file, suffix=os.path.splitext(file.filename)[1])
+        try:
+            parsed_cv = await parse_cv_file(path, file.filename, content_hash)
+        finally:
+            os.unlink(path)
+
+        logger.debug(f"Successfully parsed CV for: {parsed_cv.name}")
 
-        # Parse CV
-        parsed_cv = await parse_cv_file(content, file.filename)
+        session = None
+        if cv_id:
+            try:
+                session = await asyncio.to_thread(cv_sessions.update, cv_id, parsed_cv)
+            except KeyError:
+                logger.info(f"Unknown cv_id on upload, creating a new session: {cv_id}")
+        if session is None:
+            session = await asyncio.to_thread(cv_sessions.create, parsed_cv)
+        _set_session_headers(response, session)
 
-        logger.info(f"Successfully parsed CV for: {parsed_cv.name}")
         return parsed_cv
 
+    except SchedulerBusy:
+        raise
+    except UploadTooLarge as e:
+        logger.warning(f"Upload rejected: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
     except ValueError as e:
         logger.error(f"Validation error: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -59,30 +306,223 @@ async def upload_cv(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail="Failed to parse CV")
 
 
+@app.put("/cv", response_model=CVSessionResponse)
+async def create_cv_session(cv: ParsedCV, response: Response):
+    """
+    Store an (edited) CV server-side and return its cv_id.
+    Answer endpoints accept this cv_id in place of the full cv_data.
+    """
+    session = await asyncio.to_thread(cv_sessions.create, cv)
+    _set_session_headers(response, session)
+    return CVSessionResponse(cv_id=session.cv_id, version=session.version)
+
+
+@app.get("/cv/{cv_id}", response_model=ParsedCV)
+async def get_cv_session(
+    cv_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
+    """Return the CV stored for a session, honouring If-None-Match."""
+    session = cv_sessions.get(cv_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown cv_id")
+
+    if if_none_match == session.etag:
+        return Response(status_code=304, headers={"ETag": session.etag})
+
+    _set_session_headers(response, session)
+    return session.cv
+
+
+@app.put("/cv/{cv_id}", response_model=CVSessionResponse)
+async def update_cv_session(
+    cv_id: str,
+    cv: ParsedCV,
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Replace the CV of an existing session.
+    With If-Match, the update only applies if the session is still at that version.
+    """
+    try:
+        session = await asyncio.to_thread(cv_sessions.update, cv_id, cv, if_match=if_match)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown cv_id")
+    except CVVersionConflict as e:
+        raise HTTPException(status_code=412, detail=str(e))
+
+    _set_session_headers(response, session)
+    return CVSessionResponse(cv_id=session.cv_id, version=session.version)
+
+
+@app.post("/job_context", response_model=JobContextResponse)
+async def register_job_context(request: JobContextRequest):
+    """
+    Ingest a page's job context once and return a job_id.
+    The context is normalized and deduplicated (and, with condense=true, long
+    descriptions are summarized into key requirements); answer endpoints
+    accept the job_id in place of job_description.
+    """
+    try:
+        job_id, condensed = await job_contexts.register(request.job_description, condense=request.condense)
+        return JobContextResponse(job_id=job_id, condensed=condensed)
+    except Exception as e:
+        logger.error(f"Error registering job context: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to register job context")
+
+
 @app.post("/generate_answer", response_model=GenerateAnswerResponse)
 async def generate_answer_endpoint(request: GenerateAnswerRequest):
     """
     Generate a tailored answer to an application question.
-    Uses the candidate's CV data and style preferences.
+    Uses the candidate's CV data (or CV session) and style preferences.
     """
+    context_kwargs = {**resolve_cv(request), **resolve_job(request)}
+
     try:
-        logger.info(f"Generating answer for question: {request.question[:50]}...")
+        logger.debug(f"Generating answer for question: {request.question[:50]}...")
 
         response = await generate_answer(
             question=request.question,
-            cv_data=request.cv_data,
             style=request.style,
-            job_description=request.job_description
+            job_description=request.job_description,
+            regenerate=request.regenerate,
+            field=FieldSpec(request.field_type, request.max_length),
+            **context_kwargs
         )
 
         logger.info(f"Generated {response.question_type} answer")
+        await record_answers(request, context_kwargs, [(request.question, response.answer, response.question_type)])
         return response
 
+    except SchedulerBusy:
+        raise
     except Exception as e:
         logger.error(f"Error generating answer: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to generate answer")
 
 
+@app.post("/generate_answer/stream")
+async def generate_answer_stream_endpoint(request: GenerateAnswerRequest):
+    """
+    Stream a tailored answer as Server-Sent Events.
+    Emits `token` events while the answer is generated and a final `done`
+    event carrying the full answer and its question_type.
+    """
+    context_kwargs = {**resolve_cv(request), **resolve_job(request)}
+    logger.debug(f"Streaming answer for question: {request.question[:50]}...")
+    # Reject before the 200 and headers go out; once streaming, errors become events
+    scheduler.ensure_capacity()
+
+    async def event_stream():
+        try:
+            async for event in stream_answer(
+                question=request.question,
+                style=request.style,
+                job_description=request.job_description,
+                regenerate=request.regenerate,
+                field=FieldSpec(request.field_type, request.max_length),
+                **context_kwargs
+            ):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event["type"] == "done":
+                    await record_answers(
+                        request, context_kwargs, [(request.question, event["answer"], event["question_type"])]
+                    )
+        except SchedulerBusy as e:
+            error = {"type": "error", "detail": "Server is busy, please retry shortly", "retry_after": e.retry_after}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming answer: {str(e)}")
+            error = {"type": "error", "detail": "Failed to generate answer"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/generate_answers", response_model=GenerateAnswersResponse)
+async def generate_answers_endpoint(request: GenerateAnswersRequest, http_request: Request):
+    """
+    Generate answers for every detected form question in one round trip.
+    CV, style and job context are sent once for the whole batch.
+    Prefetch batches run in the lowest-priority lane and are cancelled when
+    the client disconnects.
+    """
+    context_kwargs = {**resolve_cv(request), **resolve_job(request)}
+
+    try:
+        logger.info(f"Generating {'prefetch ' if request.prefetch else ''}batch of {len(request.questions)} answers")
+
+        work = generate_answers(
+            questions=request.questions,
+            style=request.style,
+            job_description=request.job_description,
+            regenerate=request.regenerate,
+            fields=[FieldSpec(field.field_type, field.max_length) for field in request.fields] if request.fields else None,
+            priority=PREFETCH if request.prefetch else BATCH,
+            **context_kwargs
+        )
+        if not request.prefetch:
+            answers = await work
+        else:
+            answers = await cancel_on_disconnect(http_request, work)
+            if answers is None:
+                logger.info("Prefetch batch cancelled: client disconnected")
+                # Nobody is listening; the status only shows up in logs and metrics
+                return Response(status_code=499)
+
+        await record_answers(
+            request, context_kwargs, [(item.question, item.answer, item.question_type) for item in answers]
+        )
+        return GenerateAnswersResponse(answers=answers)
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating batch answers: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to generate answers")
+
+
+@app.post("/suggest_answers", response_model=SuggestAnswersResponse)
+async def suggest_answers_endpoint(request: SuggestAnswersRequest):
+    """
+    Return the best-matching answers previously generated for this CV session,
+    most similar question first, to offer for reuse before generating a new
+    one. Only answers of at most max_length characters are returned when it
+    is given. Empty when there is no history (or it is disabled).
+    As with GET /cv/{cv_id}, knowing the cv_id is enough to read them.
+    """
+    if answer_history is None:
+        return SuggestAnswersResponse(suggestions=[])
+
+    try:
+        with metrics.stage("answer_history"):
+            suggestions = await asyncio.to_thread(
+                answer_history.suggest,
+                request.cv_id, request.question, limit=request.limit, max_length=request.max_length
+            )
+    except Exception as e:
+        logger.error(f"Error suggesting answers: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to suggest answers")
+
+    metrics.CACHE_REQUESTS.inc(cache="answer_history", result="hit" if suggestions else "miss")
+    return SuggestAnswersResponse(suggestions=[AnswerSuggestion(**vars(past)) for past in suggestions])
+
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # Production run mode: WEB_CONCURRENCY worker processes (an import string
+    # lets uvicorn start each one); see STATE_BACKEND for sharing their state
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=WEB_CONCURRENCY,
+    )
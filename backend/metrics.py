@@ -0,0 +1,288 @@
+"""
+Minimal Prometheus-style metrics: counters, histograms and callback gauges
+rendered in the text exposition format served by GET /metrics.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Request-path stages up to a minute (upstream completions and CV parsing)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(counts):
+                counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        lines = self.header()
+        inf = 'le="+Inf"'
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, inf)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Gauge(_Metric):
+    """A gauge read from a callback at scrape time, returning {label values: value}."""
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        values = self.callback() if self.callback else {}
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "submitme_stage_seconds",
+    "Time spent in each request pipeline stage.",
+    ("stage",)
+))
+REQUEST_SECONDS = registry.register(Histogram(
+    "submitme_request_seconds",
+    "Total request time by endpoint, until the last body byte is sent.",
+    ("endpoint", "method", "status")
+))
+TOKENS = registry.register(Counter(
+    "submitme_tokens_total",
+    "Tokens reported by the completions API.",
+    ("endpoint", "question_type", "tier", "kind")
+))
+COST_USD = registry.register(Counter(
+    "submitme_llm_cost_usd_total",
+    "Estimated completions API cost from reported usage and list prices.",
+    ("tier", "model")
+))
+COMPLETION_SECONDS = registry.register(Histogram(
+    "submitme_completion_seconds",
+    "Upstream completion time by model tier and model.",
+    ("tier", "model")
+))
+COMPRESSION_BYTES = registry.register(Counter(
+    "submitme_compression_bytes_total",
+    "HTTP body bytes before (original) and after (encoded) compression.",
+    ("direction", "encoding", "kind")
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "submitme_cache_requests_total",
+    "Cache lookups by cache and result.",
+    ("cache", "result")
+))
+FAST_PATH = registry.register(Counter(
+    "submitme_fast_path_answers_total",
+    "Questions answered from CV fields without the LLM.",
+    ("field",)
+))
+
+# Endpoint and question type that upstream usage is attributed to
+_endpoint: ContextVar[Optional[dict]] = ContextVar("metrics_scope", default=None)
+_question_type: ContextVar[str] = ContextVar("metrics_question_type", default="none")
+_model_tier: ContextVar[str] = ContextVar("metrics_model_tier", default="none")
+
+
+def stage(name: str):
+    """Time a pipeline stage: `with metrics.stage("prompt_build"): ...`"""
+    return STAGE_SECONDS.time(stage=name)
+
+
+def set_question_type(question_type: str) -> None:
+    """Attribute upstream usage in the current task to this question type."""
+    _question_type.set(question_type)
+
+
+def set_model_tier(tier: str) -> None:
+    """Attribute upstream usage and latency in the current task to this model tier."""
+    _model_tier.set(tier)
+
+
+def current_model_tier() -> str:
+    return _model_tier.get()
+
+
+def current_endpoint() -> str:
+    scope = _endpoint.get()
+    if scope is None:
+        return "none"
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def record_tokens(prompt_tokens: int, completion_tokens: int, cached_tokens: int, model: str, cost: float) -> None:
+    tier = _model_tier.get()
+    labels = {"endpoint": current_endpoint(), "question_type": _question_type.get(), "tier": tier}
+    TOKENS.inc(prompt_tokens, kind="prompt", **labels)
+    TOKENS.inc(completion_tokens, kind="completion", **labels)
+    TOKENS.inc(cached_tokens, kind="cached_prompt", **labels)
+    COST_USD.inc(cost, tier=tier, model=model)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing each HTTP request until its final body chunk, so
+    streamed responses are measured in full, and exposing the matched route
+    to usage accounting.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+        token = _endpoint.set(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                observe()
+
+        observed = False
+
+        def observe():
+            nonlocal observed
+            if not observed:
+                observed = True
+                REQUEST_SECONDS.observe(
+                    time.perf_counter() - started,
+                    endpoint=current_endpoint(),
+                    method=scope["method"],
+                    status=str(status["code"])
+                )
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            observe()
+            _endpoint.reset(token)
@@ -0,0 +1,119 @@
+"""
+Model tiers for answer generation.
+
+Short, single-line fields go to a smaller, faster model with a tight token
+budget; long-form answers keep the full model. Routing is decided per
+question type (MODEL_ROUTING) and by the form field the answer goes into.
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+FAST = "fast"
+QUALITY = "quality"
+AUTO = "auto"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    max_tokens: int
+    temperature: float
+
+
+TIERS: Dict[str, ModelTier] = {
+    FAST: ModelTier(
+        name=FAST,
+        model=os.getenv('FAST_TIER_MODEL', 'gpt-4o-mini'),
+        max_tokens=int(os.getenv('FAST_TIER_MAX_TOKENS', '150')),
+        temperature=float(os.getenv('FAST_TIER_TEMPERATURE', '0.5')),
+    ),
+    QUALITY: ModelTier(
+        name=QUALITY,
+        model=os.getenv('QUALITY_TIER_MODEL', 'gpt-4o'),
+        max_tokens=int(os.getenv('QUALITY_TIER_MAX_TOKENS', '500')),
+        temperature=float(os.getenv('QUALITY_TIER_TEMPERATURE', '0.7')),
+    ),
+}
+
+# Fields limited to this many characters (maxlength) cannot hold an essay
+SHORT_ANSWER_MAX_CHARS = int(os.getenv('SHORT_ANSWER_MAX_CHARS', '300'))
+
+# Tier per question type: fast, quality, or auto (decided by the form field)
+DEFAULT_ROUTING = "general=auto,skills=auto,motivation=auto,experience=auto,behavioral=quality"
+
+
+def parse_routing(spec: str) -> Dict[str, str]:
+    """Parse "question_type=tier,..." into a dict, rejecting unknown tiers."""
+    routing = {}
+    for pair in filter(None, (part.strip() for part in spec.split(","))):
+        question_type, _, tier = pair.partition("=")
+        tier = tier.strip().lower()
+        if tier not in (FAST, QUALITY, AUTO):
+            raise ValueError(f"Unknown model tier in MODEL_ROUTING: {pair}")
+        routing[question_type.strip()] = tier
+    return routing
+
+
+ROUTING = parse_routing(os.getenv('MODEL_ROUTING', DEFAULT_ROUTING))
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """The form field an answer is written into, as reported by the extension."""
+    field_type: Optional[str] = None  # "text" (single line) or "textarea"
+    max_length: Optional[int] = None  # the field's maxlength, if any
+
+    @property
+    def key(self) -> str:
+        """Part of the answer cache key: answers for different fields differ."""
+        if self.field_type is None and self.max_length is None:
+            return ""
+        return f"{self.field_type or ''}:{self.max_length or ''}"
+
+
+def select_tier(question_type: str, field: FieldSpec) -> ModelTier:
+    """
+    Pick the model tier for a question. Explicit routing rules win; with
+    "auto", a short maxlength or a single-line input goes to the fast tier and
+    everything else (textareas, or clients that send no field type) to the
+    quality tier.
+    """
+    rule = ROUTING.get(question_type, AUTO)
+    if rule != AUTO:
+        return TIERS[rule]
+    if field.max_length is not None and field.max_length <= SHORT_ANSWER_MAX_CHARS:
+        return TIERS[FAST]
+    if field.field_type == "text":
+        return TIERS[FAST]
+    return TIERS[QUALITY]
+
+
+def max_tokens_for(tier: ModelTier, field: FieldSpec) -> int:
+    """The tier's token budget, tightened to what fits in the field (~3 characters per token, with slack)."""
+    if field.max_length is None:
+        return tier.max_tokens
+    return max(16, min(tier.max_tokens, field.max_length // 3))
+
+
+def length_instructions(field: FieldSpec) -> str:
+    """Per-question prompt text describing the field the answer must fit."""
+    instructions = []
+    if field.field_type == "text":
+        instructions.append("This is a single-line form field: answer in one or two short sentences.")
+    if field.max_length is not None:
+        instructions.append(f"The answer must fit in {field.max_length} characters.")
+    return " ".join(instructions)
+
+
+def fit_to_length(answer: str, max_length: Optional[int]) -> str:
+    """Cut an answer that overflows the field at the last sentence or word boundary."""
+    if max_length is None or len(answer) <= max_length:
+        return answer
+    cut = answer[:max_length]
+    sentence_end = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+    if sentence_end >= max_length // 2:
+        return cut[:sentence_end + 1]
+    space = cut.rfind(" ")
+    return cut[:space].rstrip(",;:") if space > 0 else cut
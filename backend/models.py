@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional, Literal
 
 
@@ -37,13 +37,106 @@ class StylePreferences(BaseModel):
     personality: Literal["technical", "storytelling", "balanced"] = "balanced"
 
 
-class GenerateAnswerRequest(BaseModel):
+class CVReference(BaseModel):
+    """
+    Either the full CV or the id of a server-side CV session.
+    """
+    cv_data: Optional[ParsedCV] = None
+    cv_id: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_cv_reference(self):
+        if self.cv_data is None and self.cv_id is None:
+            raise ValueError("Either cv_data or cv_id is required")
+        return self
+
+
+class CVSessionResponse(BaseModel):
+    cv_id: str
+    version: str
+
+
+FieldType = Literal["text", "textarea"]
+
+
+class AnswerField(BaseModel):
+    """The form field an answer goes into; decides the model tier and length."""
+    field_type: Optional[FieldType] = None
+    max_length: Optional[int] = Field(None, gt=0)
+
+
+class GenerateAnswerRequest(CVReference):
     question: str
-    cv_data: ParsedCV
     style: StylePreferences
     job_description: Optional[str] = None
+    job_id: Optional[str] = None
+    regenerate: bool = False
+    field_type: Optional[FieldType] = None
+    max_length: Optional[int] = Field(None, gt=0)
 
 
 class GenerateAnswerResponse(BaseModel):
     answer: str
     question_type: str
+
+
+class GenerateAnswersRequest(CVReference):
+    questions: List[str]
+    style: StylePreferences
+    job_description: Optional[str] = None
+    job_id: Optional[str] = None
+    regenerate: bool = False
+    # One entry per question, in the same order
+    fields: Optional[List[AnswerField]] = None
+    # Speculative generation before the user asks: lowest priority, cancelled on disconnect
+    prefetch: bool = False
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        if self.fields is not None and len(self.fields) != len(self.questions):
+            raise ValueError("fields must have one entry per question")
+        return self
+
+
+class BatchAnswerItem(BaseModel):
+    question: str
+    answer: Optional[str] = None
+    question_type: str
+    error: Optional[str] = None
+
+
+class GenerateAnswersResponse(BaseModel):
+    answers: List[BatchAnswerItem]
+
+
+class SuggestAnswersRequest(BaseModel):
+    cv_id: str
+    question: str
+    limit: int = Field(3, ge=1, le=20)
+    # Leave out answers that would not fit the field
+    max_length: Optional[int] = Field(None, gt=0)
+
+
+class AnswerSuggestion(BaseModel):
+    question: str
+    answer: str
+    question_type: str
+    company: Optional[str] = None
+    position: Optional[str] = None
+    # Unix time the answer was last generated
+    created_at: float
+    similarity: float
+
+
+class SuggestAnswersResponse(BaseModel):
+    suggestions: List[AnswerSuggestion]
+
+
+class JobContextRequest(BaseModel):
+    job_description: str
+    condense: bool = False
+
+
+class JobContextResponse(BaseModel):
+    job_id: str
+    condensed: bool
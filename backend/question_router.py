@@ -0,0 +1,195 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Field answers below this confidence go to the LLM instead
+MIN_FIELD_CONFIDENCE = 0.5
+
+# Questions longer than this (words) are unlikely to be plain form labels
+FIELD_LABEL_WORDS = 12
+
+# Field confidence multiplier when the question also matches a question type
+OPEN_QUESTION_PENALTY = 0.4
+
+# (field, patterns) in priority order; a question naming several fields routes
+# to the first one listed, at reduced confidence.
+FIELD_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("first_name", (r"first\s+name", r"given\s+name", r"forename")),
+    ("last_name", (r"last\s+name", r"surname", r"family\s+name")),
+    ("full_name", (r"full\s+name", r"your\s+name", r"^\W*name\W*$", r"^\W*legal\s+name\W*$")),
+    ("email", (r"e-?mail",)),
+    ("phone", (r"phone", r"mobile", r"contact\s+number", r"telephone", r"cell\s+number")),
+    ("linkedin", (r"linked\s*in",)),
+    ("website", (r"website", r"web\s+site", r"personal\s+site", r"portfolio")),
+    ("country", (
+        r"country", r"location", r"where\s+are\s+you\s+(?:currently\s+)?(?:located|based)",
+        r"where\s+do\s+you\s+(?:currently\s+)?live",
+    )),
+    ("years_experience", (
+        # Total experience only; "years of experience with X" is for the LLM
+        r"years\s+of\s+(?:(?:professional|work|relevant|total|industry)\s+)?experience(?!(?:\s+\w+){0,3}\s+(?:with|using|as|in(?!\s+total))\b)",
+        r"total\s+experience",
+    )),
+    ("current_company", (
+        r"(?:current|present|most\s+recent)\s+(?:company|employer)", r"^\W*(?:current\s+)?company(?:\s+name)?\W*$",
+        r"who\s+is\s+your\s+(?:current\s+)?employer",
+    )),
+    ("current_title", (
+        r"(?:current|present|most\s+recent)\s+(?:job\s+)?(?:title|role|position)", r"^\W*(?:job\s+)?title\W*$",
+    )),
+    ("degree", (
+        r"highest\s+(?:level\s+of\s+)?(?:education|degree|qualification)", r"education\s+level",
+        r"level\s+of\s+education", r"^\W*(?:highest\s+)?degree\W*$",
+    )),
+    ("graduation_year", (r"graduation\s+(?:year|date)", r"year\s+of\s+graduation", r"when\s+did\s+you\s+graduate")),
+    ("skills", (
+        r"^\W*(?:key\s+|technical\s+|relevant\s+|core\s+)?skills\W*$",
+        r"list\s+(?:of\s+)?(?:your\s+)?(?:key\s+|technical\s+|relevant\s+|core\s+)?skills",
+    )),
+    # Expected pay only; current salary is not something to answer with a canned reply
+    ("salary", (
+        r"(?:expected|desired|target)\s+(?:salary|compensation|pay)",
+        r"(?:salary|compensation|pay)\s+(?:expectations?|requirements?)",
+    )),
+    ("notice_period", (
+        r"notice\s+period", r"when\s+can\s+you\s+start", r"(?:earliest\s+)?(?:possible\s+)?start\s+date",
+        r"availability\s+to\s+start",
+    )),
+]
+
+# Phrases that look like a field label but ask something the CV cannot answer
+# directly (yes/no questions, work arrangement, relocation); they disable field routing.
+FIELD_BLOCKERS: Tuple[str, ...] = (
+    r"^\W*(?:do|does|did|are|is|have|has|can|could|will|would)(?=\s)",
+    r"relocat\w*", r"on-?site", r"hybrid", r"remote(?:ly)?", r"commut\w*",
+    r"work\s+(?:from|in|at)\s+(?:home|the\s+office|our\s+office)", r"willing\s+to\s+(?:move|travel)",
+    r"sponsor\w*", r"visa", r"authori[sz]\w*",
+)
+
+# (question type, patterns) in priority order; unmatched questions are "general".
+TYPE_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("motivation", (r"why", r"motivat\w*", r"interest(?:ed|s)?", r"want\s+to\s+join", r"excit\w*", r"passion\w*")),
+    ("experience", (r"projects?", r"experiences?", r"worked\s+on", r"tell\s+us\s+about", r"describe")),
+    ("skills", (r"skills?", r"knowledge", r"proficien\w*", r"familiar\s+with", r"expertise")),
+    ("behavioral", (r"challeng\w*", r"conflicts?", r"difficult\w*", r"problems?", r"situations?", r"a\s+time\s+when")),
+]
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a question goes: a CV field to answer directly and/or its question type."""
+    question_type: str
+    field: Optional[str] = None
+    confidence: float = 0.0
+
+    @property
+    def direct(self) -> bool:
+        return self.field is not None and self.confidence >= MIN_FIELD_CONFIDENCE
+
+
+def _compile() -> Tuple["re.Pattern", Dict[str, Tuple[str, Optional[str], int]]]:
+    """
+    Build one alternation regex over every rule. Each pattern gets its own
+    named group, mapped back to (kind, label, priority). Alternatives are
+    factored on their first letter, which makes the scan about four times
+    cheaper than a flat alternation. Patterns are lowercase and matched
+    against lowercased text.
+    """
+    groups: Dict[str, Tuple[str, Optional[str], int]] = {}
+    anchored: List[str] = []
+    by_letter: Dict[str, List[str]] = {}
+
+    def add(kind: str, label: Optional[str], priority: int, pattern: str) -> None:
+        name = f"g{len(groups)}"
+        groups[name] = (kind, label, priority)
+        if pattern[0].isalpha():
+            by_letter.setdefault(pattern[0], []).append(f"(?P<{name}>{pattern[1:]})")
+        else:
+            anchored.append(f"(?P<{name}>{pattern})")
+
+    # Blockers first, so at a shared position they win over field patterns
+    for pattern in FIELD_BLOCKERS:
+        add("blocker", None, 0, pattern)
+    for priority, (field, patterns) in enumerate(FIELD_RULES):
+        for pattern in patterns:
+            add("field", field, priority, pattern)
+    for priority, (question_type, patterns) in enumerate(TYPE_RULES):
+        for pattern in patterns:
+            add("type", question_type, priority, pattern)
+
+    alternatives = anchored + [f"{letter}(?:{'|'.join(rest)})" for letter, rest in by_letter.items()]
+    regex = re.compile(r"(?<![\w-])(?:" + "|".join(alternatives) + r")(?![\w-])")
+    return regex, groups
+
+
+_MATCHER, _GROUPS = _compile()
+
+
+@lru_cache(maxsize=4096)
+def route_question(question: str) -> Route:
+    """
+    Classify a question in a single scan of the compiled rule table.
+
+    Field confidence starts at 1 and is divided among the distinct fields
+    named, then lowered for long questions and for questions that also read
+    as an open-ended prompt (e.g. "Describe a project where you built a website").
+    """
+    text = question.strip().lower()
+    fields: Dict[str, int] = {}
+    types: Dict[str, int] = {}
+    blocked = False
+
+    for match in _MATCHER.finditer(text):
+        kind, label, priority = _GROUPS[match.lastgroup]
+        if kind == "blocker":
+            blocked = True
+        elif kind == "field":
+            fields[label] = priority
+        else:
+            types[label] = priority
+
+    question_type = min(types, key=types.get) if types else "general"
+
+    if blocked or not fields:
+        confidence = 1.0 / len(types) if types else 0.0
+        return Route(question_type=question_type, confidence=confidence)
+
+    confidence = 1.0 / len(fields)
+    words = len(text.split())
+    if words > FIELD_LABEL_WORDS:
+        confidence *= FIELD_LABEL_WORDS / words
+    if types:
+        confidence *= OPEN_QUESTION_PENALTY
+
+    return Route(question_type=question_type, field=min(fields, key=fields.get), confidence=confidence)
+
+
+_BRACKETED_RE = re.compile(r"\[([^\]]+)\]")
+_OPTIONS_RE = re.compile(r"options?:\s*(.+)", re.IGNORECASE)
+
+
+def extract_options(question: str) -> List[str]:
+    """
+    Try to extract dropdown options from the question text, e.g.:
+    - "Options: USA, Canada, UK"
+    - "[USA, Canada, UK]"
+    """
+    collected = []
+    for group in _BRACKETED_RE.findall(question):
+        collected.extend(group.split(","))
+
+    options_match = _OPTIONS_RE.search(question)
+    if options_match:
+        collected.extend(options_match.group(1).split(","))
+
+    # Normalize and dedupe
+    normalized = []
+    seen = set()
+    for opt in collected:
+        clean = opt.strip()
+        if clean and clean.lower() not in seen:
+            seen.add(clean.lower())
+            normalized.append(clean)
+
+    return normalized
@@ -0,0 +1,132 @@
+"""
+Record and replay upstream completions.
+
+With OPENAI_REPLAY_MODE=record, every completion the app makes (plain and
+streamed) is stored with its latency in a SQLite file, keyed by a hash of the
+request: model, messages and sampling settings. With OPENAI_REPLAY_MODE=replay
+the same requests are answered from that file, after the recorded latency
+scaled by OPENAI_REPLAY_LATENCY_SCALE, without an API key or network access.
+A request that was never recorded fails with ReplayMiss, so a prompt change
+shows up as an error rather than as a silent live call.
+
+Only the network call is replaced: scheduling, retries and usage accounting
+run as usual, so profiles and benchmarks of a replayed run cover the whole
+pipeline.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+# off, record or replay
+OPENAI_REPLAY_MODE = os.getenv('OPENAI_REPLAY_MODE', 'off').lower()
+OPENAI_REPLAY_PATH = os.getenv('OPENAI_REPLAY_PATH', 'recordings.sqlite3')
+# Multiplier for recorded latencies on replay (1 = as recorded, 0 = instant)
+OPENAI_REPLAY_LATENCY_SCALE = float(os.getenv('OPENAI_REPLAY_LATENCY_SCALE', '1'))
+OPENAI_REPLAY_MAX_ENTRIES = int(os.getenv('OPENAI_REPLAY_MAX_ENTRIES', '100000'))
+
+# Request arguments that do not change the answer, left out of the key
+UNKEYED_ARGUMENTS = ("timeout", "stream", "extra_body")
+
+_store: Optional[SQLiteCache] = None
+
+replay_totals = {"recorded": 0, "replayed": 0, "misses": 0}
+
+if OPENAI_REPLAY_MODE == "replay":
+    # Imported up front: replayed answers come back before the background
+    # preload of the SDK would finish, and importing it from two threads at
+    # once can leave a module half initialized
+    from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode for a request that has no recording."""
+
+
+def _get_store() -> SQLiteCache:
+    global _store
+    if _store is None:
+        _store = SQLiteCache(path=OPENAI_REPLAY_PATH, table="upstream_recordings", max_entries=OPENAI_REPLAY_MAX_ENTRIES)
+        logger.info("Upstream %s mode | path=%s", OPENAI_REPLAY_MODE, OPENAI_REPLAY_PATH)
+    return _store
+
+
+def request_key(kind: str, request: dict) -> str:
+    """Hash of the parts of a completion request that determine its answer."""
+    keyed = {name: value for name, value in request.items() if name not in UNKEYED_ARGUMENTS}
+    canonical = json.dumps({"kind": kind, "request": keyed}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _load(kind: str, request: dict) -> dict:
+    key = request_key(kind, request)
+    recorded = _get_store().get(key)
+    if recorded is None:
+        replay_totals["misses"] += 1
+        raise ReplayMiss(f"No recorded {kind} completion for model {request.get('model')!r} (key {key[:12]})")
+    replay_totals["replayed"] += 1
+    return json.loads(recorded)
+
+
+def _save(kind: str, request: dict, recording: dict) -> None:
+    _get_store().set(request_key(kind, request), json.dumps({"model": request.get("model"), **recording}))
+    replay_totals["recorded"] += 1
+
+
+async def completion(create: Callable[..., Awaitable[Any]], **request):
+    """
+    Run create(**request) (a chat completion), recording or replaying it
+    according to OPENAI_REPLAY_MODE.
+    """
+    if OPENAI_REPLAY_MODE == "replay":
+        recording = _load("completion", request)
+        await asyncio.sleep(recording["latency"] * OPENAI_REPLAY_LATENCY_SCALE)
+        return ChatCompletion.model_validate(recording["response"])
+
+    started = time.perf_counter()
+    result = await create(**request)
+    if OPENAI_REPLAY_MODE == "record":
+        await asyncio.to_thread(_save, "completion", request, {
+            "latency": time.perf_counter() - started,
+            "response": result.model_dump(mode="json"),
+        })
+    return result
+
+
+async def stream(create: Callable[..., Awaitable[Any]], **request) -> AsyncIterator[Any]:
+    """
+    Yield the chunks of create(**request) (a streamed chat completion). In
+    replay mode chunks arrive at their recorded offsets from the start of the
+    call, scaled; only streams read to the end are recorded.
+    """
+    if OPENAI_REPLAY_MODE == "replay":
+        recording = _load("stream", request)
+        started = time.perf_counter()
+        for offset, chunk in recording["chunks"]:
+            delay = started + offset * OPENAI_REPLAY_LATENCY_SCALE - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield ChatCompletionChunk.model_validate(chunk)
+        return
+
+    started = time.perf_counter()
+    chunks = []
+    async for chunk in await create(**request):
+        if OPENAI_REPLAY_MODE == "record":
+            chunks.append((time.perf_counter() - started, chunk.model_dump(mode="json")))
+        yield chunk
+    if OPENAI_REPLAY_MODE == "record":
+        await asyncio.to_thread(_save, "stream", request, {"latency": time.perf_counter() - started, "chunks": chunks})
+
+
+def replay_stats() -> Optional[dict]:
+    if OPENAI_REPLAY_MODE not in ("record", "replay"):
+        return None
+    return {"mode": OPENAI_REPLAY_MODE, "path": OPENAI_REPLAY_PATH, "stored": len(_get_store()), **replay_totals}
@@ -0,0 +1,250 @@
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Priority lanes, lowest value served first
+INTERACTIVE = 0  # single answers the user is waiting on
+BATCH = 1  # generate-all batches, job context condensing
+PARSE = 2  # CV parsing
+PREFETCH = 3  # speculative answers nobody is waiting on yet
+
+LANE_NAMES = {INTERACTIVE: "interactive", BATCH: "batch", PARSE: "parse", PREFETCH: "prefetch"}
+
+# Work the current task's upstream calls belong to (e.g. an answer cache key),
+# so callers that start waiting on it later can raise its lane (see promote)
+work_tag: ContextVar[Optional[str]] = ContextVar("scheduler_work_tag", default=None)
+
+
+class SchedulerBusy(Exception):
+    """Raised when the upstream queue is full; retry_after is a hint in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Upstream queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Refills at rate_per_minute / 60 per second up to capacity (one minute's
+    worth by default). A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def clamp(self, amount: float) -> float:
+        return min(amount, self.capacity)
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        missing = self.clamp(amount) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        if self.enabled:
+            self.tokens -= self.clamp(amount)
+
+    def adjust(self, amount: float) -> None:
+        """Charge (positive) or refund (negative) the difference once actual usage is known."""
+        if self.enabled:
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class UpstreamScheduler:
+    """
+    Admission control in front of the completions client.
+
+    Callers queue in priority lanes and are granted a slot when a concurrency
+    slot is free and the request and token buckets (RPM/TPM) can cover the
+    request. The head of the queue is served strictly first, so batch work
+    never consumes quota an interactive request is waiting for. When more
+    than max_queue callers are waiting, new ones fail fast with SchedulerBusy.
+
+    The prefetch lane has its own, smaller limits: at most prefetch_concurrency
+    slots, so speculative work leaves room for requests arriving meanwhile, and
+    at most prefetch_queue waiting callers, so it cannot fill the shared queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_queue: int = 256,
+        prefetch_concurrency: Optional[int] = None,
+        prefetch_queue: int = 64
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.prefetch_concurrency = prefetch_concurrency or max(1, max_concurrency // 4)
+        self.prefetch_queue = prefetch_queue
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+        self._active = 0
+        self._active_lanes: Dict[int, int] = {lane: 0 for lane in LANE_NAMES}
+        # (lane, sequence, future, tokens, work tag); the future's result is the granted lane
+        self._queue: List[Tuple[int, int, "asyncio.Future[int]", float, Optional[str]]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+        # Smoothed seconds a slot is held, for Retry-After estimates
+        self._hold_time = 1.0
+
+        self.granted = {lane: 0 for lane in LANE_NAMES}
+        self.rejected = 0
+        self.throttled = 0
+        self.retries = 0
+        self.promoted = 0
+
+    def _wait_time(self, tokens: float, now: float) -> float:
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(tokens, now),
+        )
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._queue and self._active < self.max_concurrency:
+            lane, _, future, tokens, _ = self._queue[0]
+            if future.done():  # cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            # Prefetch is the last lane, so everything still queued is prefetch too
+            if lane == PREFETCH and self._active_lanes[PREFETCH] >= self.prefetch_concurrency:
+                return
+
+            wait = self._wait_time(tokens, time.monotonic())
+            if wait > 0:
+                self.throttled += 1
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self._active += 1
+            self._active_lanes[lane] += 1
+            self.granted[lane] += 1
+            future.set_result(lane)
+
+    def _kick(self) -> None:
+        if self._timer is None:
+            self._dispatch()
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current queue drains."""
+        backlog = len(self._queue) / max(1, self.max_concurrency) * self._hold_time
+        quota = self._wait_time(0, time.monotonic())
+        return max(1, math.ceil(max(backlog, quota)))
+
+    def _queued(self, lane: int) -> int:
+        return sum(1 for queued_lane, _, future, _, _ in self._queue if queued_lane == lane and not future.done())
+
+    def ensure_capacity(self, lane: int = INTERACTIVE) -> None:
+        """Raise SchedulerBusy now if a new caller in lane would be rejected."""
+        if len(self._queue) >= self.max_queue or (lane == PREFETCH and self._queued(PREFETCH) >= self.prefetch_queue):
+            self.rejected += 1
+            raise SchedulerBusy(self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, lane: int = INTERACTIVE, tokens: float = 0) -> AsyncIterator[None]:
+        """Hold one upstream slot for the duration of the block."""
+        self.ensure_capacity(lane)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (lane, next(self._sequence), future, tokens, work_tag.get()))
+        self._kick()
+        try:
+            granted = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(future.result())
+            else:
+                future.cancel()
+                self._discard(future)
+            raise
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_time = 0.8 * self._hold_time + 0.2 * (time.monotonic() - started)
+            self._release(granted)
+
+    def _discard(self, future: "asyncio.Future[int]") -> None:
+        """
+        Drop a cancelled caller's queue entry, so the queue length (capacity
+        checks, Retry-After) only counts callers still waiting.
+        """
+        self._queue = [entry for entry in self._queue if entry[2] is not future]
+        heapq.heapify(self._queue)
+        self._kick()
+
+    def _release(self, lane: int) -> None:
+        self._active -= 1
+        self._active_lanes[lane] -= 1
+        self._kick()
+
+    def promote(self, tag: str, lane: int) -> None:
+        """
+        Move queued callers doing the work tagged tag up to lane, e.g. when a
+        user starts waiting on an answer that was being prefetched.
+        """
+        promoted = False
+        for index, (queued_lane, sequence, future, tokens, queued_tag) in enumerate(self._queue):
+            if queued_tag == tag and queued_lane > lane and not future.done():
+                self._queue[index] = (lane, sequence, future, tokens, queued_tag)
+                promoted = True
+        if promoted:
+            self.promoted += 1
+            heapq.heapify(self._queue)
+            self._kick()
+
+    def settle(self, estimated_tokens: float, actual_tokens: float) -> None:
+        self.tokens.adjust(actual_tokens - estimated_tokens)
+
+    def pause(self, seconds: float) -> None:
+        """Hold all dispatching, e.g. after the provider answered 429 with Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> dict:
+        queued = {name: 0 for name in LANE_NAMES.values()}
+        for lane, _, future, _, _ in self._queue:
+            if not future.done():
+                queued[LANE_NAMES[lane]] += 1
+        return {
+            "active": self._active,
+            "queued": queued,
+            "granted": {LANE_NAMES[lane]: count for lane, count in self.granted.items()},
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "retries": self.retries,
+            "promoted": self.promoted,
+        }
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
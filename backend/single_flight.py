@@ -0,0 +1,81 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the work as its own task; callers that
+    arrive while it runs await the same task instead of starting another.
+    The task is shielded from its callers, so one caller disconnecting does
+    not cancel the result the others are waiting for.
+
+    Speculative work (prefetched answers) can be claimed as abandonable: it is
+    cancelled once every caller waiting in run() has gone away, unless a
+    caller that is not abandonable has joined it in the meantime.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, "asyncio.Future[Any]"] = {}
+        self._abandonable: Set["asyncio.Future[Any]"] = set()
+        self._waiters: Dict["asyncio.Future[Any]", int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def claim(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        abandonable: bool = False
+    ) -> Tuple["asyncio.Future[Any]", bool]:
+        """
+        Return the in-flight task for key and whether this call started it.
+        factory is only called when no task is in flight.
+        """
+        existing = self._calls.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            if not abandonable:
+                self._abandonable.discard(existing)
+            return existing, False
+
+        task = asyncio.ensure_future(factory())
+        self._calls[key] = task
+        if abandonable:
+            self._abandonable.add(task)
+        self.leaders += 1
+        task.add_done_callback(lambda done: self._finish(key, done))
+        return task, True
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]], abandonable: bool = False) -> Any:
+        task, _ = self.claim(key, factory, abandonable)
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and task in self._abandonable and not task.done():
+                self.abandoned += 1
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _finish(self, key: str, task: "asyncio.Future[Any]") -> None:
+        self._abandonable.discard(task)
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the outcome as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,92 @@
+"""
+Plain-text extraction from CV files.
+
+Kept free of app imports so process-pool workers only load pypdf/python-docx.
+Both are imported on first use, so workers that only serve answers never pay
+for them at startup.
+"""
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from docx.table import Table
+
+Source = Union[str, BinaryIO]
+
+
+def extract_pdf_pages(source: Source, start: int = 0, stop: Optional[int] = None) -> Tuple[List[str], int]:
+    """
+    Extract the text of pages [start, stop) of a PDF.
+    Returns the page texts and the document's total page count, so a caller
+    can extract the first pages and schedule the rest in parallel.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(source)
+    total = len(reader.pages)
+    stop = total if stop is None else min(stop, total)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)], total
+
+
+def join_pages(pages: List[str]) -> str:
+    return "".join(f"{page}\n" for page in pages)
+
+
+def extract_text_from_pdf(source: Source) -> str:
+    """Extract text from PDF file."""
+    pages, _ = extract_pdf_pages(source)
+    return join_pages(pages)
+
+
+def _table_lines(table: "Table") -> Iterator[str]:
+    for row in table.rows:
+        cells = []
+        seen = set()
+        for cell in row.cells:
+            # A merged cell is returned once per grid column it spans
+            if id(cell._tc) in seen:
+                continue
+            seen.add(id(cell._tc))
+            text = cell.text.strip()
+            if text:
+                cells.append(text)
+        if cells:
+            yield " | ".join(cells)
+
+
+def _block_lines(container, parent) -> Iterator[str]:
+    """Paragraphs and tables of a body/header/footer, in document order."""
+    from docx.oxml.ns import qn
+    from docx.table import Table
+    from docx.text.paragraph import Paragraph
+
+    for child in container.iterchildren():
+        if child.tag == qn("w:p"):
+            yield Paragraph(child, parent).text
+        elif child.tag == qn("w:tbl"):
+            yield from _table_lines(Table(child, parent))
+
+
+def extract_text_from_docx(source: Source) -> str:
+    """
+    Extract text from DOCX file.
+    Covers body paragraphs and tables in document order, plus headers and
+    footers (often where contact details live), each distinct one once.
+    """
+    from docx import Document
+
+    doc = Document(source)
+
+    headers: List[str] = []
+    footers: List[str] = []
+    seen = set()
+    for section in doc.sections:
+        for part, target in ((section.header, headers), (section.footer, footers)):
+            if part.is_linked_to_previous:
+                continue
+            text = "\n".join(line for line in _block_lines(part._element, part) if line.strip())
+            if text and text not in seen:
+                seen.add(text)
+                target.append(text)
+
+    lines = headers + list(_block_lines(doc.element.body, doc)) + footers
+    return "".join(f"{line}\n" for line in lines)
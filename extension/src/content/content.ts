@@ -73,8 +73,8 @@ function extractPageContext() {
     if (element) {
       const text = element.getAttribute('content') || element.textContent?.trim();
       if (text && text.length > 100) {
-        // Truncate to first 1500 chars to keep it manageable
-        context.jobDescription = text.substring(0, 1500);
+        // Sent once per page via /job_context, which condenses long descriptions
+        context.jobDescription = text.substring(0, 6000);
         break;
       }
     }
@@ -210,6 +210,8 @@ function scanFormFields(): FormField[] {
       element,
       question,
       type: element.tagName.toLowerCase() === 'textarea' ? 'textarea' : 'text',
+      // maxLength is -1 when the attribute is absent
+      maxLength: element.maxLength > 0 ? element.maxLength : undefined,
     });
 
     // Mark element with our ID for later retrieval
@@ -254,8 +256,10 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
         id: f.id,
         question: f.question,
         type: f.type,
+        maxLength: f.maxLength,
       })),
       pageContext, // Include extracted page context
+      pageUrl: location.href,
     });
     return true;
   }
@@ -287,12 +291,52 @@ chrome.runtime.onMessage.addListener((message, sender, sendResponse) => {
   }
 });
 
+/**
+ * Tell the side panel when a page with long-form fields is ready and when it
+ * is left, so answers can be prefetched and the prefetch cancelled.
+ * Nothing is listening while the side panel is closed.
+ */
+function notifySidePanel(message: { type: 'FORM_DETECTED' | 'PAGE_LEFT'; pageUrl: string }) {
+  chrome.runtime.sendMessage(message).catch(() => {});
+}
+
+let announcedUrl = '';
+let formAnnounced = false;
+let checkTimer: number | undefined;
+
+function checkPage() {
+  // Single-page apps change the URL without unloading the content script
+  if (location.href !== announcedUrl) {
+    if (announcedUrl) {
+      notifySidePanel({ type: 'PAGE_LEFT', pageUrl: announcedUrl });
+    }
+    announcedUrl = location.href;
+    formAnnounced = false;
+  }
+
+  if (!formAnnounced) {
+    const textareas = Array.from(document.querySelectorAll<HTMLTextAreaElement>('textarea'));
+    if (textareas.some(isRelevantField)) {
+      formAnnounced = true;
+      notifySidePanel({ type: 'FORM_DETECTED', pageUrl: announcedUrl });
+    }
+  }
+}
+
+window.addEventListener('pagehide', () => {
+  notifySidePanel({ type: 'PAGE_LEFT', pageUrl: location.href });
+});
+
 // Watch for dynamically added form fields
 const observer = new MutationObserver(() => {
   // Debounce: only rescan if significant DOM changes occur
   // This prevents excessive scanning on dynamic pages
+  window.clearTimeout(checkTimer);
+  checkTimer = window.setTimeout(checkPage, 500);
 });
 
+checkPage();
+
 observer.observe(document.body, {
   childList: true,
   subtree: true,
@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
-import { ParsedCV, StylePreferences, FormField } from '../types';
-import { getCVData, getStylePreferences } from './storage';
+import { ParsedCV, StylePreferences, FormField, PrefetchSettings } from '../types';
+import { getCVData, getStylePreferences, getPrefetchSettings } from './storage';
+import { cancelPrefetch } from './prefetch';
 import Onboarding from './components/Onboarding';
 import Settings from './components/Settings';
 import QuestionList from './components/QuestionList';
@@ -13,6 +14,8 @@ function App() {
     personality: 'balanced',
   });
   const [fields, setFields] = useState<FormField[]>([]);
+  const [pageUrl, setPageUrl] = useState<string | null>(null);
+  const [prefetchSettings, setPrefetchSettings] = useState<PrefetchSettings>({ enabled: false, budget: 8 });
   const [currentView, setCurrentView] = useState<'onboarding' | 'questions' | 'settings'>('onboarding');
   const [isScanning, setIsScanning] = useState(false);
 
@@ -21,25 +24,41 @@ function App() {
     loadData();
   }, []);
 
+  // With prefetch on, scan forms as soon as the content script reports one;
+  // stop prefetching when the page is left
+  useEffect(() => {
+    const listener = (message: { type: string; pageUrl?: string }, sender: chrome.runtime.MessageSender) => {
+      if (message.type === 'PAGE_LEFT') {
+        cancelPrefetch(message.pageUrl);
+      } else if (message.type === 'FORM_DETECTED' && prefetchSettings.enabled && cvData && sender.tab?.active) {
+        scanFormFields(true);
+      }
+    };
+    chrome.runtime.onMessage.addListener(listener);
+    return () => chrome.runtime.onMessage.removeListener(listener);
+  }, [prefetchSettings.enabled, cvData]);
+
   async function loadData() {
     const cv = await getCVData();
     const prefs = await getStylePreferences();
 
     setCvData(cv);
     setStylePreferences(prefs);
+    setPrefetchSettings(await getPrefetchSettings());
 
     if (cv) {
       setCurrentView('questions');
     }
   }
 
-  async function scanFormFields() {
+  // silent: triggered by form detection rather than the Scan button, so no alerts
+  async function scanFormFields(silent = false) {
     setIsScanning(true);
     try {
       const [tab] = await chrome.tabs.query({ active: true, currentWindow: true });
 
       if (!tab.id) {
-        alert('No active tab found');
+        if (!silent) alert('No active tab found');
         return;
       }
 
@@ -47,13 +66,14 @@ function App() {
 
       if (response.success) {
         setFields(response.fields);
-        if (response.fields.length === 0) {
+        setPageUrl(response.pageUrl);
+        if (response.fields.length === 0 && !silent) {
           alert('No form fields detected on this page. Make sure you are on a job application form.');
         }
       }
     } catch (error) {
       console.error('Error scanning fields:', error);
-      alert('Failed to scan form fields. Make sure you are on a webpage with a form.');
+      if (!silent) alert('Failed to scan form fields. Make sure you are on a webpage with a form.');
     } finally {
       setIsScanning(false);
     }
@@ -113,7 +133,9 @@ function App() {
             cvData={cvData}
             stylePreferences={stylePreferences}
             fields={fields}
-            onScanFields={scanFormFields}
+            pageUrl={pageUrl}
+            prefetchSettings={prefetchSettings}
+            onScanFields={() => scanFormFields()}
             isScanning={isScanning}
           />
         )}
@@ -124,6 +146,8 @@ function App() {
             stylePreferences={stylePreferences}
             onStyleChanged={handleStyleChanged}
             onCVReuploaded={handleCVUploaded}
+            prefetchSettings={prefetchSettings}
+            onPrefetchChanged={setPrefetchSettings}
           />
         )}
       </div>
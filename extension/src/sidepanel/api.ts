@@ -1,10 +1,21 @@
 import {
+  AnswerSuggestion,
   ParsedCV,
+  CVSession,
   GenerateAnswerRequest,
   GenerateAnswerResponse,
+  GenerateAnswersRequest,
+  GenerateAnswersResponse,
+  JobContextResponse,
+  SuggestAnswersResponse,
 } from '../types';
+import { getCVSession, saveCVSession } from './storage';
 
 const DEFAULT_API_URL = 'http://localhost:8000';
+// Longest Retry-After the side panel waits out before retrying once
+const MAX_RETRY_AFTER_SECONDS = 10;
+// JSON bodies at least this large are sent gzip-compressed
+const COMPRESS_MIN_BYTES = 1024;
 
 /**
  * Get the configured API URL from storage.
@@ -14,13 +25,46 @@ async function getApiUrl(): Promise<string> {
   return result.apiUrl || DEFAULT_API_URL;
 }
 
+/**
+ * Encode a JSON request body, gzip-compressed when it is large enough to
+ * matter (CVs, job descriptions) and the browser supports CompressionStream.
+ * Responses are decompressed by the browser on its own.
+ */
+async function jsonBody(value: unknown): Promise<{ body: BodyInit; headers: Record<string, string> }> {
+  const json = JSON.stringify(value);
+  if (json.length < COMPRESS_MIN_BYTES || typeof CompressionStream === 'undefined') {
+    return { body: json, headers: { 'Content-Type': 'application/json' } };
+  }
+  const compressed = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+  return {
+    body: await new Response(compressed).blob(),
+    headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' },
+  };
+}
+
+/**
+ * Remember the server-side CV session returned in response headers.
+ */
+async function storeSessionFromHeaders(response: Response): Promise<void> {
+  const cvId = response.headers.get('X-CV-Id');
+  const etag = response.headers.get('ETag');
+  if (cvId && etag) {
+    await saveCVSession({ cvId, version: etag.replace(/"/g, '') });
+  }
+}
+
 /**
  * Upload and parse a CV file.
+ * Re-uploads replace the CV of the existing server-side session.
  */
 export async function uploadCV(file: File): Promise<ParsedCV> {
   const apiUrl = await getApiUrl();
+  const session = await getCVSession();
   const formData = new FormData();
   formData.append('file', file);
+  if (session) {
+    formData.append('cv_id', session.cvId);
+  }
 
   const response = await fetch(`${apiUrl}/upload_cv`, {
     method: 'POST',
@@ -32,6 +76,141 @@ export async function uploadCV(file: File): Promise<ParsedCV> {
     throw new Error(error.detail || 'Failed to parse CV');
   }
 
+  await storeSessionFromHeaders(response);
+  return response.json();
+}
+
+/**
+ * Push an edited CV to its server-side session (or open a new session).
+ */
+export async function syncCV(cvData: ParsedCV): Promise<CVSession> {
+  const apiUrl = await getApiUrl();
+  const session = await getCVSession();
+
+  const { body, headers } = await jsonBody(cvData);
+
+  let response: Response | null = null;
+  if (session) {
+    response = await fetch(`${apiUrl}/cv/${session.cvId}`, {
+      method: 'PUT',
+      headers: {
+        ...headers,
+        'If-Match': `"${session.version}"`,
+      },
+      body,
+    });
+  }
+
+  // Unknown or concurrently edited session: start a fresh one
+  if (!response || response.status === 404 || response.status === 412) {
+    response = await fetch(`${apiUrl}/cv`, {
+      method: 'PUT',
+      headers,
+      body,
+    });
+  }
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to save CV');
+  }
+
+  const result = await response.json();
+  const newSession = { cvId: result.cv_id, version: result.version };
+  await saveCVSession(newSession);
+  return newSession;
+}
+
+/**
+ * POST an answer request with the smallest body the server accepts:
+ * the CV session id instead of the whole CV, and the job id instead of the
+ * page context when one was registered. If the server no longer knows either
+ * id, the full data is sent again (re-registering the CV).
+ */
+async function postAnswerRequest(
+  path: string,
+  request: { cv_data: ParsedCV; job_description?: string; job_id?: string },
+  headers: Record<string, string> = {},
+  signal?: AbortSignal
+): Promise<Response> {
+  const apiUrl = await getApiUrl();
+
+  const send = async (body: object) => {
+    const encoded = await jsonBody(body);
+    return fetch(`${apiUrl}${path}`, {
+      method: 'POST',
+      headers: {
+        ...encoded.headers,
+        ...headers,
+      },
+      body: encoded.body,
+      signal,
+    });
+  };
+
+  const { cv_data, job_description, ...rest } = request;
+  const body: Record<string, unknown> = { ...rest };
+
+  const session = await getCVSession();
+  if (session) {
+    body.cv_id = session.cvId;
+  } else {
+    body.cv_data = cv_data;
+  }
+  if (!request.job_id) {
+    body.job_description = job_description;
+  }
+
+  let response = await send(body);
+
+  // At most one retry per unknown id
+  for (let attempt = 0; attempt < 2 && response.status === 404; attempt++) {
+    const error = await response.clone().json().catch(() => ({}));
+    if (error.detail === 'Unknown cv_id') {
+      const newSession = await syncCV(cv_data);
+      body.cv_id = newSession.cvId;
+    } else if (error.detail === 'Unknown job_id') {
+      delete body.job_id;
+      body.job_description = job_description;
+    } else {
+      break;
+    }
+    response = await send(body);
+  }
+
+  // Server queue full: wait as told by Retry-After, then try once more
+  if (response.status === 429) {
+    const retryAfter = Number(response.headers.get('Retry-After')) || 1;
+    await new Promise((resolve) => setTimeout(resolve, Math.min(retryAfter, MAX_RETRY_AFTER_SECONDS) * 1000));
+    response = await send(body);
+  }
+
+  return response;
+}
+
+/**
+ * Register the page's job context once and get an id for answer requests.
+ * With `condense`, the server summarizes a long description with one LLM
+ * call before answering, so only ask for it off the critical path.
+ */
+export async function registerJobContext(
+  jobDescription: string,
+  condense = false
+): Promise<JobContextResponse> {
+  const apiUrl = await getApiUrl();
+
+  const { body, headers } = await jsonBody({ job_description: jobDescription, condense });
+  const response = await fetch(`${apiUrl}/job_context`, {
+    method: 'POST',
+    headers,
+    body,
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to register job context');
+  }
+
   return response.json();
 }
 
@@ -41,24 +220,119 @@ export async function uploadCV(file: File): Promise<ParsedCV> {
 export async function generateAnswer(
   request: GenerateAnswerRequest
 ): Promise<GenerateAnswerResponse> {
-  const apiUrl = await getApiUrl();
+  const response = await postAnswerRequest('/generate_answer', request);
 
-  const response = await fetch(`${apiUrl}/generate_answer`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-    },
-    body: JSON.stringify(request),
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to generate answer');
+  }
+
+  return response.json();
+}
+
+/**
+ * Generate an answer as a stream of Server-Sent Events.
+ * `onToken` receives the answer text accumulated so far on every token;
+ * the promise resolves with the final answer and question type.
+ */
+export async function generateAnswerStream(
+  request: GenerateAnswerRequest,
+  onToken: (partialAnswer: string) => void
+): Promise<GenerateAnswerResponse> {
+  const response = await postAnswerRequest('/generate_answer/stream', request, {
+    Accept: 'text/event-stream',
   });
 
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({}));
+    throw new Error(error.detail || 'Failed to generate answer');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let partialAnswer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line; keep any incomplete tail in the buffer
+    const events = buffer.split('\n\n');
+    buffer = events.pop() || '';
+
+    for (const rawEvent of events) {
+      const dataLine = rawEvent.split('\n').find(line => line.startsWith('data: '));
+      if (!dataLine) continue;
+
+      const event = JSON.parse(dataLine.slice(6));
+      if (event.type === 'token') {
+        partialAnswer += event.content;
+        onToken(partialAnswer);
+      } else if (event.type === 'done') {
+        return { answer: event.answer, question_type: event.question_type };
+      } else if (event.type === 'error') {
+        throw new Error(event.detail || 'Failed to generate answer');
+      }
+    }
+  }
+
+  throw new Error('Answer stream ended unexpectedly');
+}
+
+/**
+ * Generate answers for many questions in a single request.
+ * Aborting `signal` drops the request; for prefetch batches the server then
+ * cancels the generations nobody else is waiting for.
+ */
+export async function generateAnswers(
+  request: GenerateAnswersRequest,
+  signal?: AbortSignal
+): Promise<GenerateAnswersResponse> {
+  const response = await postAnswerRequest('/generate_answers', request, {}, signal);
+
   if (!response.ok) {
     const error = await response.json();
-    throw new Error(error.detail || 'Failed to generate answer');
+    throw new Error(error.detail || 'Failed to generate answers');
   }
 
   return response.json();
 }
 
+/**
+ * Answers previously generated for this CV session that fit the question,
+ * best match first, to offer before generating a new one. Empty without a
+ * server-side CV session or when the lookup fails.
+ */
+export async function suggestAnswers(
+  question: string,
+  maxLength?: number,
+  limit = 3
+): Promise<AnswerSuggestion[]> {
+  const session = await getCVSession();
+  if (!session) {
+    return [];
+  }
+
+  try {
+    const apiUrl = await getApiUrl();
+    const response = await fetch(`${apiUrl}/suggest_answers`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ cv_id: session.cvId, question, limit, max_length: maxLength }),
+    });
+    if (!response.ok) {
+      return [];
+    }
+    const result: SuggestAnswersResponse = await response.json();
+    return result.suggestions;
+  } catch {
+    return [];
+  }
+}
+
 /**
  * Check if the backend is healthy.
  */
@@ -1,6 +1,7 @@
 import { useState } from 'react';
 import { ParsedCV } from '../../types';
-import { saveCVData } from '../storage';
+import { clearCVSession, saveCVData } from '../storage';
+import { syncCV } from '../api';
 
 interface CVEditorProps {
   cvData: ParsedCV;
@@ -15,6 +16,14 @@ function CVEditor({ cvData, onCVUpdated }: CVEditorProps) {
     setIsSaving(true);
     try {
       await saveCVData(editedCV);
+      try {
+        await syncCV(editedCV);
+      } catch (error) {
+        // The server still holds the previous CV under this session; drop it so
+        // answer requests send the edited CV inline instead
+        console.warn('Could not sync CV with backend:', error);
+        await clearCVSession();
+      }
       onCVUpdated(editedCV);
       alert('CV data saved successfully!');
     } catch (error) {
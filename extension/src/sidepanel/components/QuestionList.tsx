@@ -1,27 +1,50 @@
-import { useState } from 'react';
-import { ParsedCV, StylePreferences, FormField } from '../../types';
-import { generateAnswer } from '../api';
+import { useEffect, useState } from 'react';
+import { ParsedCV, StylePreferences, FormField, PrefetchSettings, AnswerSuggestion } from '../../types';
+import { generateAnswerStream, generateAnswers, registerJobContext, suggestAnswers } from '../api';
+import { startPrefetch, takePrefetched } from '../prefetch';
+
+// Descriptions longer than this are condensed server-side, in the background
+const CONDENSE_MIN_CHARS = 1500;
 
 interface QuestionListProps {
   cvData: ParsedCV;
   stylePreferences: StylePreferences;
   fields: FormField[];
+  pageUrl: string | null;
+  prefetchSettings: PrefetchSettings;
   onScanFields: () => void;
   isScanning: boolean;
 }
 
+interface JobReference {
+  job_id?: string;
+  job_description?: string;
+}
+
 interface FieldWithAnswer extends FormField {
   answer?: string;
   isGenerating?: boolean;
   questionType?: string;
+  // Earlier answers to similar questions, loaded when the field is opened
+  suggestions?: AnswerSuggestion[];
 }
 
-function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanning }: QuestionListProps) {
+function QuestionList({
+  cvData,
+  stylePreferences,
+  fields,
+  pageUrl,
+  prefetchSettings,
+  onScanFields,
+  isScanning,
+}: QuestionListProps) {
   const [fieldsWithAnswers, setFieldsWithAnswers] = useState<FieldWithAnswer[]>([]);
   const [expandedFields, setExpandedFields] = useState<Set<string>>(new Set());
   const [lastScanResult, setLastScanResult] = useState<string | null>(null);
   const [showScanSuccess, setShowScanSuccess] = useState(false);
-  const [pageContext, setPageContext] = useState<any>(null);
+  // Both are kept with the page they were read for, and reused only on that page
+  const [pageContext, setPageContext] = useState<{ pageUrl: string | null; context: any } | null>(null);
+  const [jobReference, setJobReference] = useState<{ pageUrl: string | null; reference: JobReference } | null>(null);
 
   // Update fields when new ones are scanned
   useState(() => {
@@ -61,34 +84,115 @@ function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanni
     }
   });
 
-  const handleGenerateAnswer = async (field: FieldWithAnswer) => {
+  const getPageContext = async () => {
+    // Get page context if we don't have it yet for this page
+    if (pageContext && pageContext.pageUrl === pageUrl) {
+      return pageContext.context;
+    }
+
+    try {
+      const [tab] = await chrome.tabs.query({ active: true, currentWindow: true });
+      if (tab.id) {
+        const contextResponse = await chrome.tabs.sendMessage(tab.id, { type: 'GET_PAGE_CONTEXT' });
+        setPageContext({ pageUrl, context: contextResponse.pageContext });
+        return contextResponse.pageContext;
+      }
+    } catch (error) {
+      console.warn('Could not get page context:', error);
+    }
+
+    return null;
+  };
+
+  const getJobReference = async (): Promise<JobReference> => {
+    // Register the page's job context once; later requests only send its id
+    if (jobReference && jobReference.pageUrl === pageUrl) {
+      return jobReference.reference;
+    }
+
+    const contextToUse = await getPageContext();
+    if (!contextToUse) {
+      return {};
+    }
+
+    const job_description = JSON.stringify(contextToUse);
+    try {
+      // Registering as is needs no LLM call, so the first answers do not wait
+      const { job_id } = await registerJobContext(job_description);
+      const reference = { job_id, job_description };
+      setJobReference({ pageUrl, reference });
+
+      // Long descriptions: switch to the condensed context once it is ready
+      if ((contextToUse.jobDescription?.length ?? 0) > CONDENSE_MIN_CHARS) {
+        registerJobContext(job_description, true)
+          .then(({ job_id: condensedId, condensed }) => {
+            // Dropped if the user has moved to another page in the meantime
+            if (!condensed) return;
+            setJobReference(current =>
+              current && current.pageUrl === pageUrl
+                ? { pageUrl, reference: { job_id: condensedId, job_description } }
+                : current
+            );
+          })
+          .catch(error => console.warn('Could not condense job context:', error));
+      }
+      return reference;
+    } catch (error) {
+      console.warn('Could not register job context:', error);
+      return { job_description };
+    }
+  };
+
+  // Answer the page's long-form fields in the background when prefetch is on
+  useEffect(() => {
+    if (!prefetchSettings.enabled || !pageUrl || fields.length === 0) return;
+
+    getJobReference().then(jobRef => {
+      startPrefetch(pageUrl, fields, { cv_data: cvData, style: stylePreferences, ...jobRef }, prefetchSettings.budget);
+    });
+  }, [fields, pageUrl, prefetchSettings.enabled]);
+
+  const handleGenerateAnswer = async (field: FieldWithAnswer, regenerate = false) => {
+    if (!regenerate && pageUrl) {
+      const prefetched = await takePrefetched(pageUrl, field);
+      if (prefetched?.answer) {
+        setFieldsWithAnswers(prev =>
+          prev.map(f =>
+            f.id === field.id ? { ...f, answer: prefetched.answer, questionType: prefetched.question_type } : f
+          )
+        );
+        setExpandedFields(prev => new Set(prev).add(field.id));
+        return;
+      }
+    }
+
     // Mark as generating
     setFieldsWithAnswers(prev =>
       prev.map(f => (f.id === field.id ? { ...f, isGenerating: true } : f))
     );
 
     try {
-      // Get page context if we don't have it yet
-      let contextToUse = pageContext;
-      if (!contextToUse) {
-        try {
-          const [tab] = await chrome.tabs.query({ active: true, currentWindow: true });
-          if (tab.id) {
-            const contextResponse = await chrome.tabs.sendMessage(tab.id, { type: 'GET_PAGE_CONTEXT' });
-            contextToUse = contextResponse.pageContext;
-            setPageContext(contextToUse);
-          }
-        } catch (error) {
-          console.warn('Could not get page context:', error);
-        }
-      }
+      const jobRef = await getJobReference();
 
-      const response = await generateAnswer({
-        question: field.question,
-        cv_data: cvData,
-        style: stylePreferences,
-        job_description: contextToUse ? JSON.stringify(contextToUse) : undefined,
-      });
+      // Auto-expand the field so the answer renders as it streams in
+      setExpandedFields(prev => new Set(prev).add(field.id));
+
+      const response = await generateAnswerStream(
+        {
+          question: field.question,
+          cv_data: cvData,
+          style: stylePreferences,
+          ...jobRef,
+          regenerate,
+          field_type: field.type,
+          max_length: field.maxLength,
+        },
+        partialAnswer => {
+          setFieldsWithAnswers(prev =>
+            prev.map(f => (f.id === field.id ? { ...f, answer: partialAnswer } : f))
+          );
+        }
+      );
 
       setFieldsWithAnswers(prev =>
         prev.map(f =>
@@ -97,9 +201,6 @@ function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanni
             : f
         )
       );
-
-      // Auto-expand the field to show the answer
-      setExpandedFields(prev => new Set(prev).add(field.id));
     } catch (error) {
       console.error('Failed to generate answer:', error);
       alert('Failed to generate answer. Make sure the backend is running.');
@@ -158,14 +259,78 @@ function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanni
   };
 
   const handleGenerateAll = async () => {
-    for (const field of fieldsWithAnswers) {
-      if (!field.answer) {
-        await handleGenerateAnswer(field);
-      }
+    const pendingFields = fieldsWithAnswers.filter(f => !f.answer);
+    if (pendingFields.length === 0) return;
+
+    const pendingIds = new Set(pendingFields.map(f => f.id));
+    setFieldsWithAnswers(prev =>
+      prev.map(f => (pendingIds.has(f.id) ? { ...f, isGenerating: true } : f))
+    );
+
+    try {
+      const jobRef = await getJobReference();
+
+      // One round trip for the whole form instead of one request per field
+      const response = await generateAnswers({
+        questions: pendingFields.map(f => f.question),
+        cv_data: cvData,
+        style: stylePreferences,
+        ...jobRef,
+        fields: pendingFields.map(f => ({ field_type: f.type, max_length: f.maxLength })),
+      });
+
+      const answersById = new Map(
+        pendingFields.map((f, index) => [f.id, response.answers[index]])
+      );
+
+      setFieldsWithAnswers(prev =>
+        prev.map(f => {
+          const result = answersById.get(f.id);
+          if (!result) return f;
+          return result.answer
+            ? { ...f, answer: result.answer, questionType: result.question_type, isGenerating: false }
+            : { ...f, isGenerating: false };
+        })
+      );
+
+      setExpandedFields(prev => {
+        const next = new Set(prev);
+        answersById.forEach((result, id) => {
+          if (result?.answer) next.add(id);
+        });
+        return next;
+      });
+    } catch (error) {
+      console.error('Failed to generate answers:', error);
+      alert('Failed to generate answers. Make sure the backend is running.');
+      setFieldsWithAnswers(prev =>
+        prev.map(f => (pendingIds.has(f.id) ? { ...f, isGenerating: false } : f))
+      );
     }
   };
 
+  const loadSuggestions = async (field: FieldWithAnswer) => {
+    const suggestions = await suggestAnswers(field.question, field.maxLength);
+    setFieldsWithAnswers(prev =>
+      prev.map(f => (f.id === field.id ? { ...f, suggestions } : f))
+    );
+  };
+
+  const handleUseSuggestion = (field: FieldWithAnswer, suggestion: AnswerSuggestion) => {
+    setFieldsWithAnswers(prev =>
+      prev.map(f =>
+        f.id === field.id ? { ...f, answer: suggestion.answer, questionType: suggestion.question_type } : f
+      )
+    );
+  };
+
   const toggleField = (fieldId: string) => {
+    // Look up earlier answers the first time an unanswered field is opened
+    const field = fieldsWithAnswers.find(f => f.id === fieldId);
+    if (field && !expandedFields.has(fieldId) && !field.answer && field.suggestions === undefined) {
+      loadSuggestions(field);
+    }
+
     setExpandedFields(prev => {
       const next = new Set(prev);
       if (next.has(fieldId)) {
@@ -315,10 +480,11 @@ function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanni
                         </div>
                         <div className="flex gap-2">
                           <button
-                            onClick={() => handleGenerateAnswer(field)}
-                            className="px-4 py-2 bg-blue-600 text-white rounded-md hover:bg-blue-700 transition text-sm"
+                            onClick={() => handleGenerateAnswer(field, true)}
+                            disabled={field.isGenerating}
+                            className="px-4 py-2 bg-blue-600 text-white rounded-md hover:bg-blue-700 transition text-sm disabled:bg-gray-400 disabled:cursor-not-allowed"
                           >
-                            Regenerate
+                            {field.isGenerating ? 'Generating...' : 'Regenerate'}
                           </button>
                           <button
                             onClick={() => handleFillField(field)}
@@ -329,13 +495,39 @@ function QuestionList({ cvData, stylePreferences, fields, onScanFields, isScanni
                         </div>
                       </>
                     ) : (
-                      <button
-                        onClick={() => handleGenerateAnswer(field)}
-                        disabled={field.isGenerating}
-                        className="w-full px-4 py-2 bg-blue-600 text-white rounded-md hover:bg-blue-700 transition disabled:bg-gray-400 disabled:cursor-not-allowed"
-                      >
-                        {field.isGenerating ? 'Generating...' : 'Generate Answer'}
-                      </button>
+                      <>
+                        {field.suggestions && field.suggestions.length > 0 && (
+                          <div className="mb-4">
+                            <p className="block text-sm font-medium text-gray-700 mb-2">
+                              Previous answers:
+                            </p>
+                            <div className="space-y-2">
+                              {field.suggestions.map((suggestion, index) => (
+                                <div key={index} className="p-3 bg-white border border-gray-200 rounded-md">
+                                  <p className="text-xs text-gray-500 mb-1">
+                                    {suggestion.question}
+                                    {suggestion.company && ` (${suggestion.company})`}
+                                  </p>
+                                  <p className="text-sm text-gray-800 line-clamp-3 mb-2">{suggestion.answer}</p>
+                                  <button
+                                    onClick={() => handleUseSuggestion(field, suggestion)}
+                                    className="px-3 py-1 bg-green-600 text-white rounded-md hover:bg-green-700 transition text-xs"
+                                  >
+                                    Use this answer
+                                  </button>
+                                </div>
+                              ))}
+                            </div>
+                          </div>
+                        )}
+                        <button
+                          onClick={() => handleGenerateAnswer(field)}
+                          disabled={field.isGenerating}
+                          className="w-full px-4 py-2 bg-blue-600 text-white rounded-md hover:bg-blue-700 transition disabled:bg-gray-400 disabled:cursor-not-allowed"
+                        >
+                          {field.isGenerating ? 'Generating...' : 'Generate Answer'}
+                        </button>
+                      </>
                     )}
                   </div>
                 )}
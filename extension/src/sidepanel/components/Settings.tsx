@@ -1,6 +1,6 @@
 import { useState } from 'react';
-import { ParsedCV, StylePreferences } from '../../types';
-import { saveStylePreferences, saveCVData, getApiUrl, saveApiUrl } from '../storage';
+import { ParsedCV, StylePreferences, PrefetchSettings } from '../../types';
+import { saveStylePreferences, saveCVData, getApiUrl, saveApiUrl, savePrefetchSettings } from '../storage';
 import { uploadCV } from '../api';
 import CVEditor from './CVEditor';
 
@@ -9,9 +9,18 @@ interface SettingsProps {
   stylePreferences: StylePreferences;
   onStyleChanged: (style: StylePreferences) => void;
   onCVReuploaded: (cv: ParsedCV) => void;
+  prefetchSettings: PrefetchSettings;
+  onPrefetchChanged: (settings: PrefetchSettings) => void;
 }
 
-function Settings({ cvData, stylePreferences, onStyleChanged, onCVReuploaded }: SettingsProps) {
+function Settings({
+  cvData,
+  stylePreferences,
+  onStyleChanged,
+  onCVReuploaded,
+  prefetchSettings,
+  onPrefetchChanged,
+}: SettingsProps) {
   const [localStyle, setLocalStyle] = useState(stylePreferences);
   const [apiUrl, setApiUrl] = useState('');
   const [isUploading, setIsUploading] = useState(false);
@@ -30,6 +39,12 @@ function Settings({ cvData, stylePreferences, onStyleChanged, onCVReuploaded }:
     onStyleChanged(newStyle);
   };
 
+  const handlePrefetchChange = async (updates: Partial<PrefetchSettings>) => {
+    const settings = { ...prefetchSettings, ...updates };
+    await savePrefetchSettings(settings);
+    onPrefetchChanged(settings);
+  };
+
   const handleApiUrlSave = async () => {
     await saveApiUrl(apiUrl);
     alert('API URL saved successfully');
@@ -170,6 +185,36 @@ function Settings({ cvData, stylePreferences, onStyleChanged, onCVReuploaded }:
         </div>
       </section>
 
+      {/* Prefetch */}
+      <section className="bg-white rounded-lg shadow-md p-6 mb-6">
+        <h3 className="text-lg font-semibold text-gray-800 mb-4">Prefetch Answers</h3>
+        <label className="flex items-center gap-2 mb-4">
+          <input
+            type="checkbox"
+            checked={prefetchSettings.enabled}
+            onChange={(e) => handlePrefetchChange({ enabled: e.target.checked })}
+          />
+          <span className="text-sm text-gray-700">
+            Start writing long-form answers as soon as a form is detected
+          </span>
+        </label>
+        <div>
+          <label className="block text-sm font-medium text-gray-700 mb-2">Answers per page</label>
+          <input
+            type="number"
+            min={1}
+            max={30}
+            value={prefetchSettings.budget}
+            disabled={!prefetchSettings.enabled}
+            onChange={(e) => handlePrefetchChange({ budget: Math.max(1, Number(e.target.value) || 1) })}
+            className="w-full border border-gray-300 rounded-md px-3 py-2 focus:outline-none focus:ring-2 focus:ring-blue-500 disabled:bg-gray-100"
+          />
+          <p className="text-xs text-gray-500 mt-1">
+            Prefetched answers use your OpenAI quota even if you never open them.
+          </p>
+        </div>
+      </section>
+
       {/* API Configuration */}
       <section className="bg-white rounded-lg shadow-md p-6">
         <h3 className="text-lg font-semibold text-gray-800 mb-4">API Configuration</h3>
@@ -0,0 +1,93 @@
+import { BatchAnswerItem, FormField, GenerateAnswersRequest } from '../types';
+import { generateAnswers } from './api';
+
+/**
+ * Speculative answers for long-form fields (opt-in, see Settings).
+ *
+ * When a form is detected, its textareas are answered in the background with
+ * one low-priority batch request, and the answers are kept for that page so
+ * clicking Generate shows them at once. At most `budget` answers are
+ * prefetched per page, and leaving the page aborts whatever is still running.
+ */
+
+type PrefetchBase = Omit<GenerateAnswersRequest, 'questions' | 'fields' | 'prefetch'>;
+
+interface PagePrefetch {
+  pageUrl: string;
+  controller: AbortController;
+  // Pending or finished answers by field (see fieldKey); null when prefetching failed
+  answers: Map<string, Promise<BatchAnswerItem | null>>;
+  spent: number;
+}
+
+let page: PagePrefetch | null = null;
+
+function fieldKey(field: FormField): string {
+  return `${field.type}|${field.maxLength ?? ''}|${field.question.trim().toLowerCase()}`;
+}
+
+/**
+ * Prefetch answers for the long-form fields of a page, within its budget.
+ * Fields already prefetched for the page are skipped, so rescans are cheap.
+ */
+export function startPrefetch(pageUrl: string, fields: FormField[], base: PrefetchBase, budget: number): void {
+  if (!page || page.pageUrl !== pageUrl) {
+    cancelPrefetch();
+    page = { pageUrl, controller: new AbortController(), answers: new Map(), spent: 0 };
+  }
+  const current = page;
+
+  const seen = new Set<string>();
+  const selected = fields
+    .filter(field => field.type === 'textarea')
+    .filter(field => {
+      const key = fieldKey(field);
+      if (current.answers.has(key) || seen.has(key)) return false;
+      seen.add(key);
+      return true;
+    })
+    .slice(0, Math.max(0, budget - current.spent));
+  if (selected.length === 0) return;
+
+  current.spent += selected.length;
+  const batch = generateAnswers(
+    {
+      ...base,
+      questions: selected.map(field => field.question),
+      fields: selected.map(field => ({ field_type: field.type, max_length: field.maxLength })),
+      prefetch: true,
+    },
+    current.controller.signal
+  );
+
+  selected.forEach((field, index) => {
+    current.answers.set(
+      fieldKey(field),
+      batch
+        .then(response => (response.answers[index]?.answer ? response.answers[index] : null))
+        .catch(() => null)
+    );
+  });
+}
+
+/**
+ * The prefetched answer for a field, if it has already arrived. Pending
+ * prefetches are not waited for: the caller asks the server, which picks up
+ * the prefetch in flight and moves it to the front of the queue.
+ */
+export async function takePrefetched(pageUrl: string, field: FormField): Promise<BatchAnswerItem | null> {
+  const pending = page?.pageUrl === pageUrl ? page.answers.get(fieldKey(field)) : undefined;
+  if (!pending) return null;
+  const settled = await Promise.race([pending, Promise.resolve(undefined)]);
+  return settled ?? null;
+}
+
+/**
+ * Abort the current page's prefetch and forget its answers.
+ * Pass the page being left to only cancel if it is the one prefetched.
+ */
+export function cancelPrefetch(pageUrl?: string): void {
+  if (!page || (pageUrl && page.pageUrl !== pageUrl)) return;
+  page.controller.abort();
+  page = null;
+}
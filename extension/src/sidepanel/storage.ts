@@ -1,4 +1,4 @@
-import { ParsedCV, StylePreferences } from '../types';
+import { ParsedCV, StylePreferences, CVSession, PrefetchSettings } from '../types';
 
 /**
  * Storage utilities for chrome.storage.local
@@ -13,6 +13,23 @@ export async function getCVData(): Promise<ParsedCV | null> {
   return result.cvData || null;
 }
 
+export async function saveCVSession(cvSession: CVSession): Promise<void> {
+  await chrome.storage.local.set({ cvSession });
+}
+
+/**
+ * Forget the server-side CV session, so answer requests send the full CV
+ * until a new session is opened.
+ */
+export async function clearCVSession(): Promise<void> {
+  await chrome.storage.local.remove('cvSession');
+}
+
+export async function getCVSession(): Promise<CVSession | null> {
+  const result = await chrome.storage.local.get('cvSession');
+  return result.cvSession || null;
+}
+
 export async function saveStylePreferences(style: StylePreferences): Promise<void> {
   await chrome.storage.local.set({ stylePreferences: style });
 }
@@ -26,6 +43,15 @@ export async function getStylePreferences(): Promise<StylePreferences> {
   };
 }
 
+export async function savePrefetchSettings(settings: PrefetchSettings): Promise<void> {
+  await chrome.storage.local.set({ prefetchSettings: settings });
+}
+
+export async function getPrefetchSettings(): Promise<PrefetchSettings> {
+  const result = await chrome.storage.local.get('prefetchSettings');
+  return result.prefetchSettings || { enabled: false, budget: 8 };
+}
+
 export async function saveApiUrl(apiUrl: string): Promise<void> {
   await chrome.storage.local.set({ apiUrl });
 }
@@ -38,14 +38,25 @@ export interface FormField {
   element: HTMLInputElement | HTMLTextAreaElement;
   question: string;
   type: 'text' | 'textarea';
+  maxLength?: number;
   answer?: string;
 }
 
+export interface CVSession {
+  cvId: string;
+  version: string;
+}
+
 export interface GenerateAnswerRequest {
   question: string;
   cv_data: ParsedCV;
+  cv_id?: string;
   style: StylePreferences;
   job_description?: string;
+  job_id?: string;
+  regenerate?: boolean;
+  field_type?: 'text' | 'textarea';
+  max_length?: number;
 }
 
 export interface GenerateAnswerResponse {
@@ -53,8 +64,65 @@ export interface GenerateAnswerResponse {
   question_type: string;
 }
 
+export interface GenerateAnswersRequest {
+  questions: string[];
+  cv_data: ParsedCV;
+  cv_id?: string;
+  style: StylePreferences;
+  job_description?: string;
+  job_id?: string;
+  // One entry per question, in the same order
+  fields?: AnswerField[];
+  // Speculative generation: lowest priority on the server, dropped on disconnect
+  prefetch?: boolean;
+}
+
+export interface AnswerField {
+  field_type?: 'text' | 'textarea';
+  max_length?: number;
+}
+
+export interface BatchAnswerItem {
+  question: string;
+  answer?: string;
+  question_type: string;
+  error?: string;
+}
+
+export interface GenerateAnswersResponse {
+  answers: BatchAnswerItem[];
+}
+
+export interface AnswerSuggestion {
+  question: string;
+  answer: string;
+  question_type: string;
+  company?: string;
+  position?: string;
+  // Unix time (seconds) the answer was last generated
+  created_at: number;
+  // Share of content words the two questions have in common (0-1)
+  similarity: number;
+}
+
+export interface SuggestAnswersResponse {
+  suggestions: AnswerSuggestion[];
+}
+
+export interface PrefetchSettings {
+  enabled: boolean;
+  // Most long-form answers generated ahead of time per page
+  budget: number;
+}
+
+export interface JobContextResponse {
+  job_id: string;
+  condensed: boolean;
+}
+
 export interface StorageData {
   cvData?: ParsedCV;
+  cvSession?: CVSession;
   stylePreferences?: StylePreferences;
   apiUrl?: string;
 }